@@ -0,0 +1,51 @@
+"""
+Microbenchmark for cache key generation.
+
+Compares the previous json.dumps + MD5 key against LocalCache._generate_key
+for typical query parameter dicts. Run with:
+
+    python benchmarks/bench_cache_key.py
+"""
+import hashlib
+import json
+import sys
+import timeit
+from pathlib import Path
+
+# Import the package from this checkout when it is not installed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from service_client.cache import AsyncLocalCache, CacheConfig
+
+SERVICE = "property-service"
+ENDPOINT = "/properties"
+METHOD = "GET"
+
+PARAMS = {
+    "empty": {},
+    "small": {"page": 2, "limit": 50},
+    "typical": {"page": 2, "limit": 50, "status": "active", "sort": "-created_at", "city": "Dubai"},
+    "nested": {"filters": {"bedrooms": [2, 3], "price": {"min": 1000000}}, "page": 1},
+}
+
+
+def legacy_key(service, endpoint, method, params):
+    key_data = {"service": service, "endpoint": endpoint, "method": method, "params": params}
+    key_string = json.dumps(key_data, sort_keys=True)
+    return f"service:{service}:endpoint:{endpoint}:{hashlib.md5(key_string.encode()).hexdigest()}"
+
+
+def main(number: int = 200_000):
+    cache = AsyncLocalCache(CacheConfig())
+    print(f"{'params':<10}{'legacy (us)':>14}{'current (us)':>15}{'speedup':>10}")
+    for name, params in PARAMS.items():
+        legacy = timeit.timeit(lambda: legacy_key(SERVICE, ENDPOINT, METHOD, params), number=number)
+        current = timeit.timeit(lambda: cache._generate_key(SERVICE, ENDPOINT, METHOD, params), number=number)
+        print(
+            f"{name:<10}{legacy / number * 1e6:>14.3f}{current / number * 1e6:>15.3f}"
+            f"{legacy / current:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
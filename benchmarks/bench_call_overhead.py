@@ -0,0 +1,61 @@
+"""
+Microbenchmark for the client's own per-call overhead.
+
+Drives ServiceClient.call against an InMemoryTransport, so the timings
+cover retries, circuit breaking, metrics, caching and (de)serialization
+without any network. Run with:
+
+    python benchmarks/bench_call_overhead.py
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Import the package from this checkout when it is not installed
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from service_client.cache import CacheConfig
+from service_client.client import ServiceClient, ServiceClientConfig
+from service_client.transport import InMemoryTransport
+
+SERVICE = "property-service"
+ENDPOINT = "/properties"
+BODY = {"items": [{"id": index, "name": f"Property {index}", "status": "active"} for index in range(20)], "total": 20}
+
+SCENARIOS = {
+    "no cache": dict(cache=CacheConfig(enabled=False), use_circuit_breaker=False),
+    "breaker": dict(cache=CacheConfig(enabled=False), use_circuit_breaker=True),
+    "l1 hit": dict(cache=CacheConfig(l1_enabled=True), use_circuit_breaker=True),
+}
+
+
+async def measure(cache: CacheConfig, use_circuit_breaker: bool, number: int) -> float:
+    transport = InMemoryTransport()
+    transport.add_response(f"/gateway/{SERVICE}{ENDPOINT}", BODY)
+    config = ServiceClientConfig(
+        gateway_url="http://gateway",
+        service_name="bench",
+        service_token="token",
+        cache=cache,
+        hot_key_capacity=0,
+    )
+    async with ServiceClient(config, transport=transport) as client:
+        params = {"page": 1, "limit": 20}
+        # Untimed first call: fills the cache and runs the breaker's periodic Gateway sync
+        await client.call(SERVICE, ENDPOINT, params=params, use_circuit_breaker=use_circuit_breaker)
+        start = time.perf_counter()
+        for _ in range(number):
+            await client.call(SERVICE, ENDPOINT, params=params, use_circuit_breaker=use_circuit_breaker)
+        return time.perf_counter() - start
+
+
+def main(number: int = 20_000):
+    print(f"{'scenario':<12}{'per call (us)':>15}{'calls/s':>12}")
+    for name, options in SCENARIOS.items():
+        elapsed = asyncio.run(measure(number=number, **options))
+        print(f"{name:<12}{elapsed / number * 1e6:>15.1f}{number / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
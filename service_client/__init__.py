@@ -6,9 +6,15 @@ Provides circuit breaker, retry logic, caching, metrics, and Gateway integration
 """
 
 from .client import ServiceClient, ServiceClientConfig
-from .cache import LocalCache, CacheConfig
+from .cache import LocalCache, AsyncLocalCache, MemoryCache, DiskCache, CacheConfig, CacheEntry, CacheInvalidation, InvalidationBus
+from .invalidation import InvalidationRule
+from .sharding import HashRing, ShardedRedis
+from .warming import WarmKey, HotKeyTracker
+from .serializers import SerializerType, CompressionType
 from .circuit_breaker import LocalCircuitBreaker, CircuitBreakerConfig, CircuitState
 from .retry import RetryHandler, RetryConfig, BackoffStrategy
+from .connection import ConnectionPoolConfig
+from .transport import Transport, TransportType, AiohttpTransport, Http2Transport, UnixSocketTransport, InMemoryTransport
 from .metrics import MetricsCollector
 from .exceptions import (
     ServiceClientError,
@@ -32,13 +38,33 @@ __all__ = [
     
     # Components
     "LocalCache",
+    "AsyncLocalCache",
+    "MemoryCache",
+    "DiskCache",
     "CacheConfig",
+    "CacheEntry",
+    "CacheInvalidation",
+    "InvalidationBus",
+    "InvalidationRule",
+    "HashRing",
+    "ShardedRedis",
+    "WarmKey",
+    "HotKeyTracker",
+    "SerializerType",
+    "CompressionType",
     "LocalCircuitBreaker", 
     "CircuitBreakerConfig",
     "CircuitState",
     "RetryHandler",
     "RetryConfig",
     "BackoffStrategy",
+    "ConnectionPoolConfig",
+    "Transport",
+    "TransportType",
+    "AiohttpTransport",
+    "Http2Transport",
+    "UnixSocketTransport",
+    "InMemoryTransport",
     "MetricsCollector",
     
     # Exceptions
@@ -1,83 +1,778 @@
+import asyncio
+import contextlib
+import functools
 import hashlib
 import json
-from typing import Any, Optional, Dict, Union
+import math
+import os
+import random
+import sqlite3
+import struct
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Dict, Iterable, List, Sequence, Set, Tuple, Union
 from pydantic import BaseModel, Field
 import redis
+import redis.asyncio as aioredis
+from redis.asyncio.cluster import RedisCluster
+from .exceptions import ServiceClientError, GatewayErrorResponse
+from .metrics import MetricsCollector
+from .sharding import ShardedRedis, aggregate_info
+from .serializers import (
+    SerializerType, CompressionType, get_serializer, get_compressor, loads_for_format,
+    decompress_for_codec, FORMAT_JSON, COMPRESSION_NONE
+)
+
+@functools.lru_cache(maxsize=4096)
+def _hashed_key(service: str, endpoint: str, method: str, items: Tuple) -> str:
+    """Memoized key for flat params; items are sorted (name, type, value) triples"""
+    digest = hashlib.blake2b(repr((service, endpoint, method, items)).encode(), digest_size=16).hexdigest()
+    return f"service:{service}:endpoint:{endpoint}:{digest}"
+
+# Canonical JSON for params that cannot go through _hashed_key; built once
+# because json.dumps creates a new encoder whenever options are passed
+_KEY_ENCODER = json.JSONEncoder(sort_keys=True, separators=(",", ":"), default=str)
+
+# Stored entry layout: compression codec, body format, metadata length,
+# JSON metadata, then the (possibly compressed) body
+_ENTRY_HEADER = struct.Struct(">BBH")
+
+# Sorted sets indexing cache keys per service, per endpoint and per tag,
+# scored by expiry time, plus a set of every service with cached entries and
+# a per-service set of endpoint names (all scored 0, so ordered lexically for
+# prefix lookups). Invalidation reads these instead of scanning the keyspace.
+_INDEX_PREFIX = "cache-index"
+_SERVICES_INDEX = f"{_INDEX_PREFIX}:services"
+# Keys deleted per round trip when invalidating
+_INVALIDATION_BATCH = 500
+
+def _key_service(key: str) -> str:
+    """Target service encoded in a cache key"""
+    return key.split(":", 2)[1] if key.startswith("service:") else ""
+
+def _key_endpoint(key: str, service: str) -> Optional[str]:
+    """Endpoint encoded in a cache key of service, None for keys of another form"""
+    prefix = f"service:{service}:endpoint:"
+    if not key.startswith(prefix):
+        return None
+    endpoint, separator, _ = key[len(prefix):].rpartition(":")
+    return endpoint if separator else None
+
+def _key_group(key: str) -> str:
+    """Everything before the digest: the service and endpoint of a cache key"""
+    return key.rpartition(":")[0]
+
+def _prefix_end(prefix: str) -> str:
+    """The least string greater than every string starting with prefix"""
+    last = ord(prefix[-1]) + 1
+    if last > 0x10FFFF:
+        return _prefix_end(prefix[:-1])
+    if 0xD800 <= last < 0xE000:
+        # Surrogates cannot be encoded; the next encodable code point follows them
+        last = 0xE000
+    return prefix[:-1] + chr(last)
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """Split a Cache-Control header into lower-cased directives and their values"""
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip().strip('"') or None
+    return directives
+
+def _directive_seconds(directives: Dict[str, Optional[str]], *names: str) -> Optional[int]:
+    """The first of the named directives carrying a valid delta-seconds value"""
+    for name in names:
+        try:
+            return max(0, int(directives[name]))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return None
 
 class CacheConfig(BaseModel):
     enabled: bool = Field(default=True)
     ttl_seconds: int = Field(default=60, description="Cache TTL in seconds")
     max_size_mb: int = Field(default=100, description="Maximum cache size in MB (for local cache)")
     redis_url: Optional[str] = Field(default=None, description="Redis connection URL, e.g., redis://localhost:6379/0")
+    max_connections: int = Field(default=50, description="Maximum pooled Redis connections (async cache)")
+    redis_urls: List[str] = Field(default_factory=list, description="Shard the cache over these Redis nodes by consistent hashing (async cache), overrides redis_url")
+    virtual_nodes: int = Field(default=160, description="Points per Redis node on the consistent hash ring")
+    redis_cluster: bool = Field(default=False, description="Connect to redis_url as a Redis Cluster (async cache)")
+    redis_socket_timeout_seconds: Optional[float] = Field(default=1.0, description="Longest wait for a Redis reply before the lookup counts as a miss, None waits indefinitely")
+    redis_connect_timeout_seconds: Optional[float] = Field(default=1.0, description="Longest wait to connect to a Redis node, None uses the OS TCP timeout")
+    redis_node_cooldown_seconds: float = Field(default=10.0, description="Skip a Redis shard this long after it times out or refuses connections (redis_urls)")
+    l1_enabled: bool = Field(default=False, description="Keep an in-process LRU tier (bounded by max_size_mb) in front of Redis")
+    l1_ttl_seconds: Optional[int] = Field(default=None, description="TTL for in-process entries, defaults to the hard TTL")
+    l1_share_objects: bool = Field(default=False, description="Hand every L1 hit the same decoded objects instead of decoding a private copy; faster, but callers must never mutate responses")
+    disk_cache_path: Optional[str] = Field(default=None, description="SQLite file for a persistent local tier behind L1, used alone when Redis is not configured")
+    disk_cache_max_mb: int = Field(default=512, description="Maximum size of the disk tier in MB")
+    soft_ttl_seconds: Optional[int] = Field(default=None, description="Seconds an entry is served as fresh, defaults to ttl_seconds")
+    hard_ttl_seconds: Optional[int] = Field(default=None, description="Seconds an entry is kept for stale serving, defaults to ttl_seconds")
+    stale_while_revalidate: bool = Field(default=True, description="Serve stale entries immediately and refresh them in the background")
+    stale_if_error: bool = Field(default=True, description="Serve stale entries when the upstream call fails")
+    max_stale_seconds: Optional[int] = Field(default=None, description="Longest an entry may have been stale to be served when the upstream call fails, defaults to its whole stale window")
+    early_refresh_beta: float = Field(default=1.0, description="XFetch beta for probabilistic early refresh, 0 disables it")
+    ttl_jitter: float = Field(default=0.0, description="Randomize entry TTLs by up to this fraction, e.g. 0.1 for +/-10%")
+    serializer: SerializerType = Field(default=SerializerType.JSON, description="Payload codec, falls back to json if not installed")
+    cache_raw_responses: bool = Field(default=False, description="Store gateway response bytes as-is instead of re-encoding them")
+    compression: CompressionType = Field(default=CompressionType.NONE, description="Codec for large entries, falls back to zlib if not installed")
+    compression_threshold_bytes: int = Field(default=4096, description="Compress entries whose body is at least this large")
+    honor_cache_headers: bool = Field(default=False, description="Take entry TTLs from Cache-Control and revalidate expired entries with ETag/Last-Modified")
+    revalidation_window_seconds: int = Field(default=300, description="Keep entries with an ETag or Last-Modified this long past their stale window for revalidation")
+    invalidation_bus: bool = Field(default=False, description="Broadcast invalidations over Redis pub/sub so every client evicts its in-process entries")
+    invalidation_channel: str = Field(default="service-client:cache-invalidation", description="Pub/sub channel for the invalidation bus")
+    invalidation_flush_ms: int = Field(default=50, description="Coalesce outgoing invalidations for this long before publishing them as one batch")
+    negative_cache: bool = Field(default=False, description="Cache not-found errors and empty results so they are replayed without a gateway call")
+    negative_ttl_seconds: int = Field(default=10, description="TTL for negative entries")
+    negative_status_codes: List[int] = Field(default_factory=lambda: [404, 410], description="Error status codes cached as negative entries")
+
+class CacheInvalidation(BaseModel):
+    """
+    Entries to invalidate: those stored with tag, else those of service
+    (optionally only one endpoint, or endpoints starting with
+    endpoint_prefix). With no fields set, every entry.
+    """
+    service: Optional[str] = None
+    endpoint: Optional[str] = None
+    endpoint_prefix: Optional[str] = None
+    tag: Optional[str] = None
+
+    class Config:
+        frozen = True
+
+    @property
+    def key_prefix(self) -> str:
+        """Prefix shared by the cache keys this invalidation covers (tags aside)"""
+        if not self.service:
+            return ""
+        if self.endpoint:
+            # Keys end with ":<digest>" after the endpoint
+            return f"service:{self.service}:endpoint:{self.endpoint}:"
+        if self.endpoint_prefix:
+            return f"service:{self.service}:endpoint:{self.endpoint_prefix}"
+        return f"service:{self.service}:"
+
+class CacheEntry:
+    """
+    A cached response with the wall-clock time it was stored, how long it
+    stays fresh, how long it may be served stale, how long the upstream
+    fetch took (the XFetch delta), the validators the gateway sent and the
+    tags it was stored with.
+
+    A negative entry records a not-found outcome instead of a response:
+    data is None for an empty result, or a description of the error.
+    """
+    __slots__ = (
+        "data", "stored_at", "ttl", "delta", "stale_ttl", "etag", "last_modified", "tags", "negative", "size"
+    )
+
+    def __init__(
+        self,
+        data: Any,
+        stored_at: Optional[float] = None,
+        ttl: Optional[float] = None,
+        delta: float = 0.0,
+        stale_ttl: Optional[float] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        tags: Sequence[str] = (),
+        negative: bool = False
+    ):
+        self.data = data
+        self.stored_at = time.time() if stored_at is None else stored_at
+        self.ttl = ttl
+        self.delta = delta
+        self.stale_ttl = stale_ttl
+        self.etag = etag
+        self.last_modified = last_modified
+        self.tags = tuple(tags)
+        self.negative = negative
+        # Uncompressed size in bytes, known once the entry is encoded or decoded
+        self.size = 0
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.stored_at
+
+    def replay(self) -> Any:
+        """Outcome of a negative entry: None for an empty result, otherwise raises the cached error"""
+        if self.data is None:
+            return None
+        if self.data.get("error_type") is not None:
+            raise GatewayErrorResponse(
+                error_type=self.data["error_type"],
+                message=self.data["message"],
+                correlation_id=self.data.get("correlation_id"),
+                error_code=self.data.get("error_code")
+            )
+        raise ServiceClientError(self.data["message"], error_code=self.data.get("error_code"))
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Request headers that revalidate this entry instead of re-downloading it"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class CacheStats:
+    """
+    Counters kept by the cache itself, per target service: lookups by
+    outcome, writes, capacity evictions from the local tiers, entries deleted by
+    invalidation, encoded bytes read and written, and time spent
+    serializing and waiting on Redis. Each event is also reported to the
+    MetricsCollector, when given, for Prometheus.
+    """
+    _COUNTERS = (
+        "hits", "stale_hits", "negative_hits", "misses", "sets", "evictions", "invalidations", "bytes_read",
+        "bytes_written", "serialization_seconds", "redis_calls", "redis_seconds"
+    )
+    # Lookup outcome -> its counter
+    _LOOKUPS = {"hit": "hits", "stale_hit": "stale_hits", "negative_hit": "negative_hits", "miss": "misses"}
+
+    def __init__(self, metrics: Optional[MetricsCollector] = None):
+        self.metrics = metrics
+        self._services: Dict[str, Dict[str, float]] = {}
+
+    def _counters(self, service: str) -> Dict[str, float]:
+        counters = self._services.get(service)
+        if counters is None:
+            counters = self._services[service] = dict.fromkeys(self._COUNTERS, 0)
+        return counters
+
+    def record_lookup(self, service: str, outcome: str):
+        """outcome is hit (fresh), stale_hit, negative_hit or miss; see _BaseCache.lookup_outcome()"""
+        self._counters(service)[self._LOOKUPS[outcome]] += 1
+        if self.metrics:
+            self.metrics.record_cache_operation(service, outcome)
+
+    def record_read(self, service: str, size: int, decode_seconds: float):
+        """An encoded entry read from the disk tier or Redis and decoded"""
+        counters = self._counters(service)
+        counters["bytes_read"] += size
+        counters["serialization_seconds"] += decode_seconds
+        if self.metrics:
+            self.metrics.record_cache_bytes(service, "read", size)
+            self.metrics.record_cache_serialization(service, "decode", decode_seconds)
+
+    def record_set(self, service: str, size: int, encode_seconds: float):
+        counters = self._counters(service)
+        counters["sets"] += 1
+        counters["bytes_written"] += size
+        counters["serialization_seconds"] += encode_seconds
+        if self.metrics:
+            self.metrics.record_cache_operation(service, "set")
+            self.metrics.record_cache_bytes(service, "written", size)
+            self.metrics.record_cache_serialization(service, "encode", encode_seconds)
+
+    def record_eviction(self, key: str):
+        """A local tier dropped key to stay within its size cap"""
+        service = _key_service(key)
+        self._counters(service)["evictions"] += 1
+        if self.metrics:
+            self.metrics.record_cache_operation(service, "eviction")
+
+    def record_invalidation(self, key: str):
+        service = _key_service(key)
+        self._counters(service)["invalidations"] += 1
+        if self.metrics:
+            self.metrics.record_cache_operation(service, "invalidation")
+
+    def record_redis(self, services: Iterable[str], operation: str, seconds: float):
+        """One Redis round trip, counted against every service it served"""
+        for service in services:
+            counters = self._counters(service)
+            counters["redis_calls"] += 1
+            counters["redis_seconds"] += seconds
+            if self.metrics:
+                self.metrics.record_cache_redis_latency(service, operation, seconds)
+
+    @staticmethod
+    def _summary(counters: Dict[str, float]) -> Dict[str, Union[int, float]]:
+        summary = {
+            name: counters[name]
+            for name in ("hits", "stale_hits", "negative_hits", "misses", "sets", "evictions", "invalidations")
+        }
+        lookups = sum(counters[name] for name in CacheStats._LOOKUPS.values())
+        summary.update(
+            hit_rate=counters["hits"] / lookups if lookups else 0,
+            bytes_read=counters["bytes_read"],
+            bytes_written=counters["bytes_written"],
+            serialization_ms=counters["serialization_seconds"] * 1000,
+            redis_calls=counters["redis_calls"],
+            redis_latency_avg_ms=(
+                counters["redis_seconds"] / counters["redis_calls"] * 1000 if counters["redis_calls"] else 0
+            ),
+        )
+        return summary
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Totals over all services, with a per-service breakdown under services"""
+        totals = dict.fromkeys(self._COUNTERS, 0)
+        for counters in self._services.values():
+            for name, value in counters.items():
+                totals[name] += value
+        return {
+            **self._summary(totals),
+            "services": {service: self._summary(counters) for service, counters in self._services.items()},
+        }
 
-class LocalCache:
-    """A Redis-based cache for service responses."""
-    def __init__(self, config: CacheConfig):
+class _BaseCache:
+    """Behaviour shared by the sync and async Redis caches."""
+    def __init__(self, config: CacheConfig, metrics: Optional[MetricsCollector] = None):
         self.config = config
+        self.metrics = metrics
+        self.stats = CacheStats(metrics)
+        self.serializer = get_serializer(config.serializer)
+        self.compressor = get_compressor(config.compression)
+        self._compressed_entries = 0
+        self._compression_bytes_in = 0
+        self._compression_bytes_out = 0
+
+    @property
+    def soft_ttl(self) -> int:
+        """Seconds an entry is served as fresh"""
+        return self.config.soft_ttl_seconds or self.config.ttl_seconds
+
+    @property
+    def hard_ttl(self) -> int:
+        """Seconds an entry is kept; it is stale between soft_ttl and hard_ttl"""
+        return max(self.config.hard_ttl_seconds or self.config.ttl_seconds, self.soft_ttl)
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age < (self.soft_ttl if entry.ttl is None else entry.ttl)
+
+    def lookup_outcome(self, entry: Optional[CacheEntry]) -> str:
+        """How a lookup that found entry is counted: only fresh positive entries are hits"""
+        if entry is None:
+            return "miss"
+        if entry.negative:
+            return "negative_hit" if self.is_fresh(entry) else "miss"
+        return "hit" if self.is_fresh(entry) else "stale_hit"
+
+    def fresh_until(self, entry: CacheEntry) -> float:
+        """Time at which entry becomes stale"""
+        return entry.stored_at + (self.soft_ttl if entry.ttl is None else entry.ttl)
+
+    def can_serve_stale(self, entry: CacheEntry) -> bool:
+        """Whether an expired entry is still within its stale window"""
+        return entry.age < (self.hard_ttl if entry.stale_ttl is None else entry.stale_ttl)
+
+    def remaining_lifetime(self, entry: CacheEntry) -> float:
+        """Seconds until entry leaves storage: its stale window, plus the revalidation window if it has validators"""
+        lifetime = self.hard_ttl if entry.stale_ttl is None else entry.stale_ttl
+        if entry.etag or entry.last_modified:
+            lifetime += self.config.revalidation_window_seconds
+        return lifetime - entry.age
+
+    def can_serve_on_error(self, entry: CacheEntry) -> bool:
+        """Whether entry may stand in for a failed upstream call"""
+        if entry.negative:
+            return False
+        if self.is_fresh(entry):
+            return True
+        if not self.config.stale_if_error or not self.can_serve_stale(entry):
+            return False
+        max_stale = self.config.max_stale_seconds
+        return max_stale is None or time.time() - self.fresh_until(entry) <= max_stale
+
+    def should_refresh_early(self, entry: CacheEntry) -> bool:
+        """
+        XFetch: decide to refresh a fresh entry ahead of expiry, with a
+        probability that grows as expiry nears and with the fetch duration
+        """
+        beta = self.config.early_refresh_beta
+        if beta <= 0 or not entry.delta:
+            return False
+        expires_at = self.fresh_until(entry)
+        # 1 - random() lies in (0, 1], so the log is always defined
+        return time.time() - entry.delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+    def _new_entry(
+        self,
+        data: Any,
+        fetch_duration: float,
+        headers: Optional[Dict[str, str]] = None,
+        tags: Sequence[str] = ()
+    ) -> Optional[Tuple[CacheEntry, int]]:
+        """
+        Build an entry with jittered TTLs; returns it with its storage TTL, or
+        None when the response must not be stored.
+
+        With honor_cache_headers, s-maxage/max-age (0 for no-cache) replace the
+        soft TTL and stale-while-revalidate sets the stale window. Entries with
+        an ETag or Last-Modified are kept revalidation_window_seconds longer so
+        an expired entry can be refreshed by a 304.
+        """
+        soft_ttl, hard_ttl = self.soft_ttl, self.hard_ttl
+        etag = last_modified = None
+        if headers and self.config.honor_cache_headers:
+            directives = parse_cache_control(headers.get("Cache-Control", ""))
+            if "no-store" in directives:
+                return None
+            max_age = 0 if "no-cache" in directives else _directive_seconds(directives, "s-maxage", "max-age")
+            if max_age is not None:
+                stale_window = _directive_seconds(directives, "stale-while-revalidate")
+                if stale_window is None:
+                    stale_window = self.hard_ttl - self.soft_ttl
+                soft_ttl, hard_ttl = max_age, max_age + stale_window
+            etag = headers.get("ETag")
+            last_modified = headers.get("Last-Modified")
+
+        jitter = random.uniform(-self.config.ttl_jitter, self.config.ttl_jitter) if self.config.ttl_jitter else 0.0
+        soft_ttl = soft_ttl * (1 + jitter)
+        hard_ttl = max(hard_ttl * (1 + jitter), soft_ttl)
+        storage_ttl = hard_ttl
+        if etag or last_modified:
+            storage_ttl += self.config.revalidation_window_seconds
+        if storage_ttl <= 0:
+            # Expires immediately and cannot be revalidated
+            return None
+
+        entry = CacheEntry(
+            data,
+            ttl=soft_ttl,
+            delta=fetch_duration,
+            stale_ttl=hard_ttl,
+            etag=etag,
+            last_modified=last_modified,
+            tags=tags
+        )
+        return entry, max(1, math.ceil(storage_ttl))
+
+    def is_negative_cacheable(self, error: Exception) -> bool:
+        """Whether a failed lookup should be remembered as a negative entry"""
+        return (
+            self.config.negative_cache
+            and isinstance(error, ServiceClientError)
+            and error.error_code in self.config.negative_status_codes
+        )
+
+    def _negative_entry(self, error: Optional[ServiceClientError]) -> Tuple[CacheEntry, int]:
+        """Build a negative entry and its storage TTL; error None records an empty result"""
+        data = None
+        if error is not None:
+            data = {"message": str(error), "error_code": error.error_code}
+            if isinstance(error, GatewayErrorResponse):
+                data.update(
+                    error_type=error.error_type,
+                    message=error.message,
+                    correlation_id=error.correlation_id
+                )
+        ttl = self.config.negative_ttl_seconds
+        # Never served stale: a refetch may well find the entity by now
+        return CacheEntry(data, ttl=ttl, stale_ttl=ttl, negative=True), max(1, ttl)
+
+    def _encode_entry(self, entry: CacheEntry, raw_body: Optional[bytes] = None) -> bytes:
+        """
+        Serialize an entry. With cache_raw_responses, the gateway's JSON body
+        is stored verbatim so it never has to be re-encoded.
+        """
+        if raw_body is not None and self.config.cache_raw_responses:
+            body_format, body = FORMAT_JSON, raw_body
+        else:
+            body_format, body = self.serializer.format_id, self.serializer.dumps(entry.data)
+        entry.size = len(body)
+
+        codec = COMPRESSION_NONE
+        if self.compressor is not None and len(body) >= self.config.compression_threshold_bytes:
+            compressed = self.compressor.compress(body)
+            # Keep the original when compression does not pay off
+            if len(compressed) < len(body):
+                self._compressed_entries += 1
+                self._compression_bytes_in += len(body)
+                self._compression_bytes_out += len(compressed)
+                codec, body = self.compressor.codec_id, compressed
+
+        meta = {"t": entry.stored_at, "l": entry.ttl, "d": entry.delta}
+        if entry.stale_ttl is not None:
+            meta["s"] = entry.stale_ttl
+        if entry.etag:
+            meta["e"] = entry.etag
+        if entry.last_modified:
+            meta["m"] = entry.last_modified
+        if entry.tags:
+            meta["g"] = entry.tags
+        if entry.negative:
+            meta["n"] = 1
+        meta = json.dumps(meta, separators=(",", ":")).encode()
+        return _ENTRY_HEADER.pack(codec, body_format, len(meta)) + meta + body
+
+    @staticmethod
+    def _decode_entry(cached_data: bytes) -> Optional[CacheEntry]:
+        try:
+            codec, body_format, meta_length = _ENTRY_HEADER.unpack_from(cached_data)
+            body_start = _ENTRY_HEADER.size + meta_length
+            meta = json.loads(cached_data[_ENTRY_HEADER.size:body_start])
+            body = decompress_for_codec(codec, cached_data[body_start:])
+            entry = CacheEntry(
+                loads_for_format(body_format)(body),
+                meta["t"],
+                meta.get("l"),
+                meta.get("d") or 0.0,
+                meta.get("s"),
+                meta.get("e"),
+                meta.get("m"),
+                meta.get("g") or (),
+                bool(meta.get("n"))
+            )
+        except (struct.error, ValueError, TypeError, KeyError):
+            # Handle cases where data in Redis is corrupted or written in another format
+            return None
+        entry.size = len(body)
+        return entry
+
+    def _compression_stats(self) -> Dict[str, Union[str, int, float]]:
+        return {
+            "compression": self.compressor.name if self.compressor else CompressionType.NONE.value,
+            "compressed_entries": self._compressed_entries,
+            "compression_ratio": (
+                self._compression_bytes_in / self._compression_bytes_out if self._compression_bytes_out else 1.0
+            ),
+        }
+
+    def _generate_key(self, service: str, endpoint: str, method: str, params: Dict) -> str:
+        """Generate cache key from request parameters"""
+        # Flat params are canonicalized by sorting; value types are part of
+        # the key so 1, 1.0 and "1" never collide
+        items = []
+        for name, value in params.items():
+            if isinstance(value, (dict, list)):
+                break
+            items.append((name, value.__class__, value))
+        else:
+            try:
+                return _hashed_key(service, endpoint, method, tuple(sorted(items)))
+            except TypeError:
+                pass
+        # Nested or otherwise unhashable values: canonical JSON
+        key_string = repr((service, endpoint, method, _KEY_ENCODER.encode(params)))
+        digest = hashlib.blake2b(key_string.encode(), digest_size=16).hexdigest()
+        return f"service:{service}:endpoint:{endpoint}:{digest}"
+
+    @staticmethod
+    def _service_index(service: str) -> str:
+        return f"{_INDEX_PREFIX}:service:{service}"
+
+    @staticmethod
+    def _tag_index(tag: str) -> str:
+        return f"{_INDEX_PREFIX}:tag:{tag}"
+
+    @staticmethod
+    def _endpoint_index(service: str, endpoint: str) -> str:
+        return f"{_INDEX_PREFIX}:endpoint:{service}:{endpoint}"
+
+    @staticmethod
+    def _endpoint_names_index(service: str) -> str:
+        return f"{_INDEX_PREFIX}:endpoints:{service}"
+
+    def _queue_write(
+        self,
+        pipe,
+        key: str,
+        service: str,
+        serialized_data: bytes,
+        ttl: int,
+        tags: Sequence[str] = ()
+    ):
+        """Queue an entry write and its index updates on a (sync or async) pipeline"""
+        now = time.time()
+        pipe.setex(key, ttl, serialized_data)
+        pipe.sadd(_SERVICES_INDEX, service)
+        self._queue_index_expiry(pipe, _SERVICES_INDEX, ttl)
+        index_keys = [self._service_index(service), *(self._tag_index(tag) for tag in tags)]
+        endpoint = _key_endpoint(key, service)
+        if endpoint is not None:
+            index_keys.append(self._endpoint_index(service, endpoint))
+            pipe.zadd(self._endpoint_names_index(service), {endpoint: 0})
+            self._queue_index_expiry(pipe, self._endpoint_names_index(service), ttl)
+        for index_key in index_keys:
+            pipe.zadd(index_key, {key: now + ttl})
+            # Prune members whose entries have already expired
+            pipe.zremrangebyscore(index_key, "-inf", now)
+            self._queue_index_expiry(pipe, index_key, ttl)
+
+    @staticmethod
+    def _queue_index_expiry(pipe, index_key: str, ttl: int):
+        """
+        Keep an index alive as long as its longest-lived entry and no longer,
+        so indexes that stop receiving writes (per-entity tags) expire too
+        """
+        # NX sets the first expiry and GT only ever extends it; GT alone
+        # never applies to a key without one (needs Redis 7.0)
+        pipe.expire(index_key, ttl, nx=True)
+        pipe.expire(index_key, ttl, gt=True)
+
+    @property
+    def _timeouts(self) -> Dict[str, Optional[float]]:
+        """Socket timeouts for Redis connections, so an unresponsive node cannot stall lookups"""
+        return {
+            "socket_timeout": self.config.redis_socket_timeout_seconds,
+            "socket_connect_timeout": self.config.redis_connect_timeout_seconds,
+        }
+
+    def _disabled_stats(self) -> Dict[str, Union[int, float]]:
+        return {
+            "total_entries": 0,
+            "used_memory_mb": 0,
+            "hit_rate": 0,
+            "enabled": False
+        }
+
+    @staticmethod
+    def _stats_from_info(info: Dict) -> Dict[str, Union[int, float]]:
+        """Server-wide figures; they include memory used by other Redis users"""
+        return {"used_memory_mb": info.get("used_memory", 0) / (1024 * 1024)}
+
+    def _encode_timed(self, service: str, entry: CacheEntry, raw_body: Optional[bytes] = None) -> bytes:
+        started = time.perf_counter()
+        serialized_data = self._encode_entry(entry, raw_body)
+        self.stats.record_set(service, len(serialized_data), time.perf_counter() - started)
+        return serialized_data
+
+    def _decode_timed(self, service: str, cached_data: bytes) -> Optional[CacheEntry]:
+        started = time.perf_counter()
+        entry = self._decode_entry(cached_data)
+        self.stats.record_read(service, len(cached_data), time.perf_counter() - started)
+        return entry
+
+class LocalCache(_BaseCache):
+    """A Redis-based cache for service responses (synchronous client)."""
+    def __init__(self, config: CacheConfig, metrics: Optional[MetricsCollector] = None):
+        super().__init__(config, metrics)
         self.redis_client: Optional[redis.Redis] = None
         if self.config.enabled and self.config.redis_url:
             try:
-                self.redis_client = redis.from_url(self.config.redis_url, decode_responses=True)
+                self.redis_client = redis.from_url(self.config.redis_url, **self._timeouts)
                 self.redis_client.ping()
-            except redis.exceptions.ConnectionError as e:
+            except (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError) as e:
                 # You might want to log this warning instead of printing
                 print(f"Warning: Redis connection failed: {e}. Caching will be disabled.")
                 self.config.enabled = False
 
-    def _generate_key(self, service: str, endpoint: str, method: str, params: Dict) -> str:
-        """Generate cache key from request parameters"""
-        # Sort params for consistent key generation
-        key_data = {"service": service, "endpoint": endpoint, "method": method, "params": params}
-        key_string = json.dumps(key_data, sort_keys=True)
-        return f"service:{service}:endpoint:{endpoint}:{hashlib.md5(key_string.encode()).hexdigest()}"
-
-    def get(self, service: str, endpoint: str, method: str, params: Dict) -> Optional[Any]:
+    def get(self, service: str, endpoint: str, method: str, params: Dict, key: Optional[str] = None) -> Optional[Any]:
         """Get cached response"""
         if not self.config.enabled or not self.redis_client:
             return None
 
-        key = self._generate_key(service, endpoint, method, params)
+        key = key or self._generate_key(service, endpoint, method, params)
+        started = time.perf_counter()
         cached_data = self.redis_client.get(key)
+        self.stats.record_redis((service,), "get", time.perf_counter() - started)
 
-        if cached_data:
-            try:
-                return json.loads(cached_data)
-            except json.JSONDecodeError:
-                # Handle cases where data in Redis is corrupted
-                return None
+        entry = self._decode_timed(service, cached_data) if cached_data else None
+        self.stats.record_lookup(service, self.lookup_outcome(entry))
+        if entry is not None and not entry.negative and self.is_fresh(entry):
+            return entry.data
         return None
 
-    def set(self, service: str, endpoint: str, method: str, params: Dict, data: Any):
-        """Cache response data"""
-        if not self.config.enabled or not self.redis_client:
+    def set(
+        self,
+        service: str,
+        endpoint: str,
+        method: str,
+        params: Dict,
+        data: Any,
+        fetch_duration: float = 0.0,
+        key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        tags: Sequence[str] = ()
+    ):
+        """
+        Cache response data; headers are the response's caching headers and
+        tags label the entry for invalidate_tags()
+        """
+        if not self.config.enabled or not self.redis_client or data is None:
             return
 
-        key = self._generate_key(service, endpoint, method, params)
+        key = key or self._generate_key(service, endpoint, method, params)
+        new_entry = self._new_entry(data, fetch_duration, headers, tags)
+        if new_entry is None:
+            return
+        entry, ttl = new_entry
         try:
-            # Serialize data to a JSON string
-            serialized_data = json.dumps(data)
-            self.redis_client.setex(key, self.config.ttl_seconds, serialized_data)
-        except (TypeError, redis.exceptions.RedisError) as e:
-            # Log the error, data might not be JSON serializable or Redis error
+            self._write(key, service, self._encode_timed(service, entry), ttl, tags)
+        except (TypeError, ValueError, redis.exceptions.RedisError) as e:
+            # Log the error, data might not be serializable or Redis error
             print(f"Warning: Could not cache data for key {key}: {e}")
 
+    def set_negative(
+        self,
+        service: str,
+        endpoint: str,
+        method: str,
+        params: Dict,
+        error: Optional[ServiceClientError] = None,
+        key: Optional[str] = None
+    ):
+        """Remember a not-found error, or an empty result when error is None, for negative_ttl_seconds"""
+        if not self.config.enabled or not self.config.negative_cache or not self.redis_client:
+            return
+
+        key = key or self._generate_key(service, endpoint, method, params)
+        entry, ttl = self._negative_entry(error)
+        try:
+            self._write(key, service, self._encode_timed(service, entry), ttl)
+        except (TypeError, ValueError, redis.exceptions.RedisError) as e:
+            print(f"Warning: Could not cache negative entry for key {key}: {e}")
+
+    def _write(self, key: str, service: str, serialized_data: bytes, ttl: int, tags: Sequence[str] = ()):
+        """Store an encoded entry and index it"""
+        started = time.perf_counter()
+        try:
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                self._queue_write(pipe, key, service, serialized_data, ttl, tags)
+                pipe.execute()
+        finally:
+            self.stats.record_redis((service,), "write", time.perf_counter() - started)
+
     def _delete_key(self, key: str):
         """Remove key from cache and update size"""
         if self.redis_client:
             self.redis_client.delete(key)
 
     def clear(self, service: Optional[str] = None):
-        """Clear cache, optionally for specific service only"""
+        """
+        Clear cache, optionally for specific service only. Only keys written
+        by this cache are removed, found through the service indexes.
+        """
         if not self.config.enabled or not self.redis_client:
             return
 
         if service:
-            # Use scan_iter to avoid blocking Redis with a large KEYS command
-            keys_to_remove = list(self.redis_client.scan_iter(f"service:{service}:*"))
-            if keys_to_remove:
-                self.redis_client.delete(*keys_to_remove)
-        else:
-            self.redis_client.flushdb()
+            self._invalidate_index(self._service_index(service))
+            return
+
+        for indexed_service in self.redis_client.smembers(_SERVICES_INDEX):
+            self._invalidate_index(self._service_index(indexed_service.decode()))
+        self.redis_client.delete(_SERVICES_INDEX)
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry stored with any of the tags; returns the number deleted"""
+        if not self.config.enabled or not self.redis_client:
+            return 0
+        return sum(self._invalidate_index(self._tag_index(tag)) for tag in tags)
+
+    def _invalidate_index(self, index_key: str) -> int:
+        """Delete the entries listed in an index, one batch per round trip"""
+        deleted = 0
+        while True:
+            keys = self.redis_client.zrange(index_key, 0, _INVALIDATION_BATCH - 1)
+            if not keys:
+                return deleted
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.unlink(key)
+                pipe.zrem(index_key, *keys)
+                results = pipe.execute()
+            for key, unlinked in zip(keys, results):
+                if unlinked:
+                    deleted += 1
+                    self.stats.record_invalidation(key.decode())
     
     def invalidate_gateway_transition(self):
         """Invalidate all cache entries during Gateway transition"""
@@ -85,23 +780,1068 @@ class LocalCache:
             return
         
         # Clear all cache entries to ensure fresh data with new routing
-        self.redis_client.flushdb()
+        self.clear()
         print("Cache invalidated for Gateway transition")
 
-    def get_stats(self) -> Dict[str, Union[int, float]]:
+    def get_stats(self) -> Dict[str, Union[str, int, float]]:
         """Get cache statistics"""
         if not self.config.enabled or not self.redis_client:
-            return {
-                "total_entries": 0,
-                "used_memory_mb": 0,
-                "hit_rate": 0,
-                "enabled": False
-            }
+            return self._disabled_stats()
 
         info = self.redis_client.info()
         return {
-            "total_entries": info.get("db0", {}).get("keys", 0),
-            "used_memory_mb": info.get("used_memory", 0) / (1024 * 1024),
-            "hit_rate": info.get("keyspace_hits", 0) / (info.get("keyspace_hits", 0) + info.get("keyspace_misses", 1)),
-            "enabled": True
-        }
\ No newline at end of file
+            "enabled": True,
+            **self.stats.snapshot(),
+            "total_entries": self._count_entries(),
+            **self._stats_from_info(info),
+            **self._compression_stats()
+        }
+
+    def _count_entries(self) -> int:
+        """Unexpired entries written by this cache, counted in the service indexes"""
+        services = [service.decode() for service in self.redis_client.smembers(_SERVICES_INDEX)]
+        now = time.time()
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for service in services:
+                pipe.zcount(self._service_index(service), now, "+inf")
+            counts = pipe.execute()
+        # Services whose entries have all expired leave the services index
+        expired = [service for service, count in zip(services, counts) if count == 0]
+        if expired:
+            self.redis_client.srem(_SERVICES_INDEX, *expired)
+        return sum(counts)
+
+
+class MemoryCache:
+    """
+    In-process LRU cache used as the L1 tier in front of Redis.
+
+    Bounded by the total serialized size of its entries; every entry carries
+    its own expiry. Values are returned as stored: AsyncLocalCache stores
+    encoded entries and decodes each hit, unless l1_share_objects is set.
+    on_evict is called with each key dropped to stay within the size cap.
+
+    Keys are grouped by everything before their last ":" (the service and
+    endpoint of a cache key), so invalidating an endpoint or prefix visits
+    only the matching groups rather than every key.
+    """
+    def __init__(self, max_size_bytes: int, on_evict: Optional[Callable[[str], None]] = None):
+        self.max_size_bytes = max_size_bytes
+        self.on_evict = on_evict
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (value, expires_at, size_bytes, tags), least recently used first
+        self._entries: "OrderedDict[str, Tuple[Any, float, int, Tuple[str, ...]]]" = OrderedDict()
+        # tag -> keys stored with it
+        self._tags: Dict[str, Set[str]] = {}
+        # key group -> keys in it
+        self._groups: Dict[str, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, record: bool = True) -> Optional[Any]:
+        """
+        Return the live value for key, or None on miss/expiry. With
+        record=False the lookup is neither counted nor marks key as recently used.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            if record:
+                self.misses += 1
+            return None
+
+        value, expires_at, _, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            if record:
+                self.misses += 1
+            return None
+
+        if record:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: float, size_bytes: int, tags: Sequence[str] = ()):
+        """Store value, evicting least recently used entries to stay within budget"""
+        if size_bytes > self.max_size_bytes:
+            # Never let a single oversized payload flush the whole tier
+            self.delete(key)
+            return
+
+        self.delete(key)
+        self._entries[key] = (value, time.monotonic() + ttl_seconds, size_bytes, tuple(tags))
+        self.size_bytes += size_bytes
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self._groups.setdefault(_key_group(key), set()).add(key)
+
+        while self.size_bytes > self.max_size_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+            if self.on_evict:
+                self.on_evict(oldest_key)
+
+    def delete(self, key: str):
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self, prefix: Optional[str] = None):
+        """Remove all entries, or only those whose key starts with prefix"""
+        if not prefix:
+            self._entries.clear()
+            self._tags.clear()
+            self._groups.clear()
+            self.size_bytes = 0
+            return
+
+        for group, keys in list(self._groups.items()):
+            if (group + ":").startswith(prefix):
+                matching = list(keys)
+            elif prefix.startswith(group + ":"):
+                matching = [key for key in keys if key.startswith(prefix)]
+            else:
+                continue
+            for key in matching:
+                self._remove(key)
+
+    def delete_group(self, group: str):
+        """Remove every entry whose key is in group, e.g. one endpoint's entries"""
+        for key in list(self._groups.get(group, ())):
+            self._remove(key)
+
+    def delete_tag(self, tag: str):
+        """Remove every entry stored with tag"""
+        for key in list(self._tags.get(tag, ())):
+            self._remove(key)
+
+    def _remove(self, key: str):
+        _, _, size_bytes, tags = self._entries.pop(key)
+        self.size_bytes -= size_bytes
+        for tag in tags:
+            keys = self._tags[tag]
+            keys.discard(key)
+            if not keys:
+                del self._tags[tag]
+        group = _key_group(key)
+        keys = self._groups[group]
+        keys.discard(key)
+        if not keys:
+            del self._groups[group]
+
+    def get_stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "l1_entries": len(self._entries),
+            "l1_used_memory_mb": self.size_bytes / (1024 * 1024),
+            "l1_hit_rate": self.hits / lookups if lookups else 0,
+            "l1_evictions": self.evictions,
+        }
+
+
+class DiskCache:
+    """
+    Persistent local tier backed by a SQLite file.
+
+    Stores encoded entries (the same bytes as Redis) with an expiry time, so
+    it survives restarts and can stand in for Redis in jobs without one.
+    Bounded by max_size_bytes: expired entries go first, then those closest
+    to expiry. The total size is kept in the database, updated in the same
+    transaction as each write, so the cap holds across every process sharing
+    the file. Lookups read the stored blob through a memory map and hand it
+    to the decoder as-is. on_evict is called with each unexpired key dropped
+    for space.
+
+    Calls block on SQLite; AsyncLocalCache makes them on a thread of their own.
+    """
+    # Tags are stored as "\x1ftag1\x1ftag2\x1f" so one can be matched with instr()
+    _TAG_SEPARATOR = "\x1f"
+
+    def __init__(self, path: str, max_size_bytes: int, on_evict: Optional[Callable[[str], None]] = None):
+        self.path = path
+        self.max_size_bytes = max_size_bytes
+        self.on_evict = on_evict
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        # Map the file (with room for page overhead) so reads skip a copy through read()
+        self._db.execute(f"PRAGMA mmap_size={2 * max_size_bytes}")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, size INTEGER NOT NULL, tags TEXT)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (id INTEGER PRIMARY KEY CHECK (id = 0), size INTEGER NOT NULL)")
+        self._db.execute("INSERT OR IGNORE INTO meta (id, size) SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the stored bytes for key, or None on miss/expiry"""
+        row = self._db.execute(
+            "SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def get_many(self, keys: Sequence[str], record: bool = True) -> Dict[str, bytes]:
+        """Stored bytes for the live keys among keys; record=False leaves the hit and miss counts alone"""
+        found: Dict[str, bytes] = {}
+        # Stay well below SQLite's bound parameter limit
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(batch))}) AND expires_at > ?",
+                (*batch, time.time())
+            ).fetchall()
+            found.update(rows)
+        if record:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def set(self, key: str, value: bytes, ttl_seconds: float, tags: Sequence[str] = ()):
+        """Store value, evicting entries to stay within the size cap"""
+        if len(value) > self.max_size_bytes:
+            self.delete(key)
+            return
+        tag_field = self._TAG_SEPARATOR + self._TAG_SEPARATOR.join(tags) + self._TAG_SEPARATOR if tags else None
+        with self._write():
+            previous = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, size, tags) VALUES (?, ?, ?, ?, ?)",
+                (key, value, time.time() + ttl_seconds, len(value), tag_field)
+            )
+            self._add_size(len(value) - (previous[0] if previous else 0))
+        if self.size_bytes > self.max_size_bytes:
+            self._evict()
+
+    @property
+    def size_bytes(self) -> int:
+        """Bytes stored by every process using the file"""
+        return self._db.execute("SELECT size FROM meta").fetchone()[0]
+
+    @contextlib.contextmanager
+    def _write(self):
+        """A write transaction, taking the lock up front so concurrent writers wait instead of failing"""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _add_size(self, delta: int):
+        if delta:
+            self._db.execute("UPDATE meta SET size = size + ?", (delta,))
+
+    def delete(self, key: str):
+        self._delete_where("key = ?", (key,))
+
+    def delete_many(self, keys: Sequence[str]):
+        for start in range(0, len(keys), 500):
+            batch = keys[start:start + 500]
+            self._delete_where(f"key IN ({','.join('?' * len(batch))})", tuple(batch))
+
+    def delete_tag(self, tag: str):
+        """Remove every entry stored with tag"""
+        self._delete_where("instr(tags, ?) > 0", (self._TAG_SEPARATOR + tag + self._TAG_SEPARATOR,))
+
+    def clear(self, prefix: Optional[str] = None):
+        """Remove all entries, or only those whose key starts with prefix"""
+        if not prefix:
+            with self._write():
+                self._db.execute("DELETE FROM entries")
+                self._db.execute("UPDATE meta SET size = 0")
+            return
+        # A key range, so SQLite searches the primary key index instead of scanning
+        self._delete_where("key >= ? AND key < ?", (prefix, _prefix_end(prefix)))
+
+    def _delete_where(self, condition: str, params: Tuple):
+        with self._write():
+            freed = self._db.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM entries WHERE {condition}", params
+            ).fetchone()[0]
+            self._db.execute(f"DELETE FROM entries WHERE {condition}", params)
+            self._add_size(-freed)
+
+    def _evict(self):
+        """Drop expired entries, then those expiring soonest, until under the cap"""
+        self._delete_where("expires_at <= ?", (time.time(),))
+        while True:
+            evicted = []
+            with self._write():
+                excess = self.size_bytes - self.max_size_bytes
+                if excess <= 0:
+                    break
+                rows = self._db.execute("SELECT key, size FROM entries ORDER BY expires_at LIMIT 100").fetchall()
+                if not rows:
+                    # Only the size total was off; nothing is left to evict
+                    self._db.execute("UPDATE meta SET size = 0")
+                    break
+                freed = 0
+                for key, size in rows:
+                    if freed >= excess:
+                        break
+                    self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                    freed += size
+                    evicted.append(key)
+                self._add_size(-freed)
+            self._record_evictions(evicted)
+
+    def _record_evictions(self, keys: List[str]):
+        self.evictions += len(keys)
+        if self.on_evict:
+            for key in keys:
+                self.on_evict(key)
+
+    def close(self):
+        self._db.close()
+
+    def get_stats(self) -> Dict[str, Union[int, float]]:
+        lookups = self.hits + self.misses
+        return {
+            "disk_entries": self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0],
+            "disk_used_memory_mb": self.size_bytes / (1024 * 1024),
+            "disk_hit_rate": self.hits / lookups if lookups else 0,
+            "disk_evictions": self.evictions,
+        }
+
+
+class InvalidationBus:
+    """
+    Fans cache invalidations out to every client over Redis pub/sub.
+
+    Outgoing invalidations are de-duplicated and published as one batch per
+    flush interval; incoming batches from other clients are handed to apply
+    by a background listener, so no request ever waits on the bus.
+    """
+    def __init__(
+        self,
+        redis_client: aioredis.Redis,
+        channel: str,
+        apply: Callable[[List[CacheInvalidation]], None],
+        flush_interval: float
+    ):
+        self.redis_client = redis_client
+        self.channel = channel
+        self.apply = apply
+        self.flush_interval = flush_interval
+        # Lets the listener skip batches this client published itself
+        self.sender_id = uuid.uuid4().hex
+        self._pending: Dict[CacheInvalidation, None] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self._pubsub = None
+
+    async def start(self, subscribe: bool = True):
+        """Start listening for other clients' invalidations; publish-only clients pass subscribe=False"""
+        if not subscribe:
+            return
+        self._pubsub = self.redis_client.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._listen_task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Publish what is still pending and stop listening"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+        if self._listen_task:
+            self._listen_task.cancel()
+            self._listen_task = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    def publish(self, invalidations: Iterable[CacheInvalidation]):
+        """Queue invalidations for the next batch"""
+        for invalidation in invalidations:
+            self._pending[invalidation] = None
+        if self._pending and self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.flush_interval)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self):
+        """Publish all pending invalidations as one message"""
+        if not self._pending:
+            return
+        batch = self._coalesce(list(self._pending))
+        self._pending.clear()
+        message = json.dumps({
+            "sender": self.sender_id,
+            "invalidations": [invalidation.model_dump(exclude_none=True) for invalidation in batch],
+        })
+        try:
+            await self.redis_client.publish(self.channel, message)
+        except redis.exceptions.RedisError as e:
+            print(f"Warning: Could not publish {len(batch)} cache invalidations: {e}")
+
+    @staticmethod
+    def _coalesce(invalidations: List[CacheInvalidation]) -> List[CacheInvalidation]:
+        """Drop endpoint invalidations already covered by a whole-service or full one"""
+        if CacheInvalidation() in invalidations:
+            return [CacheInvalidation()]
+        whole_services = {i.service for i in invalidations if i.service and i.key_prefix == f"service:{i.service}:"}
+        return [
+            i for i in invalidations
+            if i.tag or not (i.endpoint or i.endpoint_prefix) or i.service not in whole_services
+        ]
+
+    async def _listen(self):
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except redis.exceptions.RedisError as e:
+                # The pub/sub connection re-subscribes when it reconnects
+                print(f"Warning: Cache invalidation bus lost its connection: {e}")
+                await asyncio.sleep(1.0)
+                continue
+            if message is None:
+                continue
+            try:
+                self._handle(message["data"])
+            except Exception as e:
+                # One failed eviction must not stop the listener
+                print(f"Warning: Could not apply cache invalidations from the bus: {e}")
+
+    def _handle(self, data: bytes):
+        try:
+            payload = json.loads(data)
+            if payload.get("sender") == self.sender_id:
+                return
+            invalidations = [CacheInvalidation(**fields) for fields in payload["invalidations"]]
+        except (ValueError, TypeError, KeyError, AttributeError):
+            print("Warning: Ignoring malformed cache invalidation message")
+            return
+        self.apply(invalidations)
+
+
+class AsyncLocalCache(_BaseCache):
+    """
+    A Redis-based cache for service responses built on ``redis.asyncio``.
+
+    All Redis commands go through a pooled asyncio client, so cache lookups
+    issued from ``ServiceClient.call`` never block the event loop. Call
+    ``connect()`` before use and ``close()`` on shutdown.
+
+    With ``redis_urls``, keys are spread over several nodes by consistent
+    hashing (see ``ShardedRedis``); with ``redis_cluster``, ``redis_url`` is
+    a Redis Cluster node. Failed nodes read as misses either way.
+
+    When ``CacheConfig.l1_enabled`` is set, an in-process ``MemoryCache``
+    bounded by ``max_size_mb`` answers hot keys without a Redis round trip.
+    With ``invalidation_bus`` set, invalidations are broadcast so the local
+    tiers of other clients drop the same entries; clients without a local
+    tier only publish.
+
+    With ``disk_cache_path``, a ``DiskCache`` sits between L1 and Redis and
+    keeps entries across restarts; without Redis it is the shared tier for
+    everything running on the host. Its SQLite calls run on a dedicated
+    thread: lookups are awaited, writes and evictions are queued behind them.
+    """
+    def __init__(self, config: CacheConfig, metrics: Optional[MetricsCollector] = None):
+        super().__init__(config, metrics)
+        self.redis_client: Optional[aioredis.Redis] = None
+        self._pool: Optional[aioredis.ConnectionPool] = None
+        self.l1: Optional[MemoryCache] = None
+        if self.config.l1_enabled:
+            self.l1 = MemoryCache(self.config.max_size_mb * 1024 * 1024, self.stats.record_eviction)
+        self.bus: Optional[InvalidationBus] = None
+        self.disk: Optional[DiskCache] = None
+        self._disk_executor: Optional[ThreadPoolExecutor] = None
+        self._disk_loop: Optional[asyncio.AbstractEventLoop] = None
+        if self.config.enabled and self.config.disk_cache_path:
+            try:
+                self.disk = DiskCache(
+                    self.config.disk_cache_path, self.config.disk_cache_max_mb * 1024 * 1024, self._disk_evicted
+                )
+            except (sqlite3.Error, OSError) as e:
+                print(f"Warning: Could not open disk cache {self.config.disk_cache_path}: {e}. It will not be used.")
+
+    @property
+    def _l1_ttl(self) -> float:
+        return min(self.config.l1_ttl_seconds or self.hard_ttl, self.hard_ttl)
+
+    @property
+    def _has_local_tier(self) -> bool:
+        return self.l1 is not None or self.disk is not None
+
+    @property
+    def has_storage(self) -> bool:
+        """Whether entries are stored anywhere, i.e. caching is on with Redis or a local tier"""
+        return self.config.enabled and (
+            self._has_local_tier or self.redis_client is not None or bool(self.config.redis_url or self.config.redis_urls)
+        )
+
+    async def connect(self):
+        """Create the connection pool(s) and verify Redis is reachable"""
+        if not self.config.enabled or not (self.config.redis_url or self.config.redis_urls) or self.redis_client:
+            return
+
+        if self.config.redis_urls:
+            client = ShardedRedis(
+                self.config.redis_urls,
+                self.config.max_connections,
+                self.config.virtual_nodes,
+                cooldown=self.config.redis_node_cooldown_seconds,
+                **self._timeouts
+            )
+        elif self.config.redis_cluster:
+            client = RedisCluster.from_url(
+                self.config.redis_url, max_connections=self.config.max_connections, **self._timeouts
+            )
+        else:
+            self._pool = aioredis.ConnectionPool.from_url(
+                self.config.redis_url,
+                max_connections=self.config.max_connections,
+                **self._timeouts
+            )
+            client = aioredis.Redis(connection_pool=self._pool)
+        try:
+            await client.ping()
+        except (redis.exceptions.RedisError, OSError) as e:
+            await client.aclose()
+            if self._pool:
+                await self._pool.aclose()
+                self._pool = None
+            if self._has_local_tier:
+                print(f"Warning: Redis connection failed: {e}. Only the local cache tiers will be used.")
+            else:
+                print(f"Warning: Redis connection failed: {e}. Caching will be disabled.")
+                self.config.enabled = False
+            return
+        self.redis_client = client
+
+        if self.config.invalidation_bus and self.config.redis_cluster:
+            print("Warning: The cache invalidation bus does not support Redis Cluster and is disabled.")
+        elif self.config.invalidation_bus:
+            # Every writer publishes; only clients with a local tier have anything to evict
+            self.bus = InvalidationBus(
+                client,
+                self.config.invalidation_channel,
+                self._evict_local,
+                self.config.invalidation_flush_ms / 1000
+            )
+            await self.bus.start(subscribe=self._has_local_tier)
+
+    async def close(self):
+        """Release pooled Redis connections"""
+        if self.bus is not None:
+            await self.bus.stop()
+            self.bus = None
+        if self.redis_client:
+            await self.redis_client.aclose()
+            self.redis_client = None
+        if self._pool:
+            await self._pool.aclose()
+            self._pool = None
+        if self.disk is not None:
+            # Queued after every pending write, so those are flushed first
+            await self._on_disk(self.disk.close)
+            self.disk = None
+        if self._disk_executor is not None:
+            self._disk_executor.shutdown(wait=False)
+            self._disk_executor = None
+
+    async def get(self, service: str, endpoint: str, method: str, params: Dict, key: Optional[str] = None) -> Optional[Any]:
+        """Get cached response if it is still fresh"""
+        entry = await self.get_entry(service, endpoint, method, params, key=key)
+        if entry is not None and not entry.negative and self.is_fresh(entry):
+            return entry.data
+        return None
+
+    async def get_entry(
+        self,
+        service: str,
+        endpoint: str,
+        method: str,
+        params: Dict,
+        key: Optional[str] = None,
+        record: bool = True
+    ) -> Optional[CacheEntry]:
+        """
+        Get the cached entry, fresh or stale, until it expires from the cache.
+        Pass key when the caller has already generated it. record=False
+        leaves hit and miss counts alone, for the client's own bookkeeping
+        reads rather than callers' lookups.
+        """
+        if not self.config.enabled:
+            return None
+
+        key = key or self._generate_key(service, endpoint, method, params)
+        entry = self._l1_get(key, service, record)
+        if entry is None and self.disk is not None:
+            entry = self._load_entry(key, service, (await self._on_disk(self._disk_get_many, [key], record)).get(key))
+        if entry is None and self.redis_client:
+            started = time.perf_counter()
+            try:
+                cached_data = await self.redis_client.get(key)
+            except redis.exceptions.RedisError as e:
+                # A failing cache should degrade to a miss, not fail the request
+                print(f"Warning: Could not read cache key {key}: {e}")
+                cached_data = None
+            self.stats.record_redis((service,), "get", time.perf_counter() - started)
+            entry = self._load_entry(key, service, cached_data, from_redis=True)
+
+        if record:
+            self.stats.record_lookup(service, self.lookup_outcome(entry))
+        return entry
+
+    async def get_entries(self, keys: Dict[str, str]) -> Dict[str, Optional[CacheEntry]]:
+        """
+        Look up many entries at once; keys maps each cache key to its target
+        service. L1 and the disk tier answer what they can and the rest is
+        fetched with one MGET.
+        """
+        entries: Dict[str, Optional[CacheEntry]] = {key: None for key in keys}
+        if not self.config.enabled:
+            return entries
+
+        remaining = []
+        for key, service in keys.items():
+            entries[key] = self._l1_get(key, service)
+            if entries[key] is None:
+                remaining.append(key)
+
+        if remaining and self.disk is not None:
+            for key, cached_data in (await self._on_disk(self._disk_get_many, remaining)).items():
+                entries[key] = self._load_entry(key, keys[key], cached_data)
+            remaining = [key for key in remaining if entries[key] is None]
+
+        if remaining and self.redis_client:
+            started = time.perf_counter()
+            try:
+                if self.config.redis_cluster:
+                    # Keys hash to different slots, which one MGET cannot span
+                    values = await self.redis_client.mget_nonatomic(remaining)
+                else:
+                    values = await self.redis_client.mget(remaining)
+            except redis.exceptions.RedisError as e:
+                print(f"Warning: Could not read {len(remaining)} cache keys: {e}")
+                values = []
+            self.stats.record_redis({keys[key] for key in remaining}, "mget", time.perf_counter() - started)
+            for key, cached_data in zip(remaining, values):
+                entries[key] = self._load_entry(key, keys[key], cached_data, from_redis=True)
+
+        for key, service in keys.items():
+            self.stats.record_lookup(service, self.lookup_outcome(entries[key]))
+        return entries
+
+    def _l1_get(self, key: str, service: str, record: bool = True) -> Optional[CacheEntry]:
+        if self.l1 is None:
+            return None
+        entry = self.l1.get(key, record)
+        if isinstance(entry, bytes):
+            entry = self._decode_timed(service, entry)
+        if self.metrics and record:
+            if entry is not None:
+                self.metrics.record_l1_cache_hit(service)
+            else:
+                self.metrics.record_l1_cache_miss(service)
+        return entry
+
+    def _l1_set(self, key: str, entry: CacheEntry, serialized_data: bytes, ttl: float):
+        """
+        Store the encoded entry, so each hit decodes objects of its own and a
+        caller mutating a response cannot change what others read
+        """
+        value = entry if self.config.l1_share_objects else serialized_data
+        self.l1.set(key, value, ttl, entry.size, entry.tags)
+
+    def _on_disk(self, operation: Callable, *args) -> asyncio.Future:
+        """
+        Run a blocking DiskCache call on the tier's own thread. One thread
+        keeps calls in submission order, so a lookup sees every write queued
+        before it; writes need not be awaited.
+        """
+        if self._disk_executor is None:
+            self._disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="service-client-disk")
+        self._disk_loop = asyncio.get_running_loop()
+        return self._disk_loop.run_in_executor(self._disk_executor, operation, *args)
+
+    # The _disk_* helpers run on the disk thread, after close() possibly
+
+    def _disk_evicted(self, key: str):
+        """Count a disk tier eviction on the event loop, which owns the stats counters"""
+        try:
+            self._disk_loop.call_soon_threadsafe(self.stats.record_eviction, key)
+        except RuntimeError:
+            # The loop closed while queued writes were still evicting
+            pass
+
+    def _disk_get_many(self, keys: List[str], record: bool = True) -> Dict[str, bytes]:
+        try:
+            return self.disk.get_many(keys, record) if self.disk is not None else {}
+        except sqlite3.Error as e:
+            print(f"Warning: Could not read disk cache: {e}")
+            return {}
+
+    def _disk_set(self, key: str, serialized_data: bytes, ttl: float, tags: Sequence[str]):
+        try:
+            if self.disk is not None:
+                self.disk.set(key, serialized_data, ttl, tags)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not write disk cache key {key}: {e}")
+
+    def _disk_delete(self, keys: List[str]):
+        try:
+            if self.disk is not None:
+                self.disk.delete_many(keys)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not delete {len(keys)} disk cache keys: {e}")
+
+    def _disk_evict(self, invalidations: Sequence[CacheInvalidation]):
+        try:
+            for invalidation in invalidations:
+                if self.disk is None:
+                    return
+                if invalidation.tag:
+                    self.disk.delete_tag(invalidation.tag)
+                else:
+                    self.disk.clear(invalidation.key_prefix)
+        except sqlite3.Error as e:
+            print(f"Warning: Could not evict disk cache entries: {e}")
+
+    def _load_entry(
+        self,
+        key: str,
+        service: str,
+        cached_data: Optional[bytes],
+        from_redis: bool = False
+    ) -> Optional[CacheEntry]:
+        """Decode a stored value and promote it into the tiers in front of where it was found"""
+        if not cached_data:
+            return None
+        entry = self._decode_timed(service, cached_data)
+        if entry is None:
+            return None
+        remaining = self.remaining_lifetime(entry)
+        if remaining <= 0:
+            return entry
+        if self.l1 is not None:
+            self._l1_set(key, entry, cached_data, min(self._l1_ttl, remaining))
+        if from_redis and self.disk is not None:
+            self._on_disk(self._disk_set, key, cached_data, remaining, entry.tags)
+        return entry
+
+    async def set(
+        self,
+        service: str,
+        endpoint: str,
+        method: str,
+        params: Dict,
+        data: Any,
+        fetch_duration: float = 0.0,
+        raw_body: Optional[bytes] = None,
+        key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        tags: Sequence[str] = ()
+    ):
+        """
+        Cache response data, recording how long the upstream fetch took.
+        raw_body is the undecoded gateway response, stored as-is when
+        cache_raw_responses is enabled; headers are its caching headers
+        (Cache-Control, ETag, Last-Modified). tags label the entry for
+        invalidate_tags().
+        """
+        if not self.config.enabled or not (self.redis_client or self._has_local_tier) or data is None:
+            return
+
+        key = key or self._generate_key(service, endpoint, method, params)
+        prepared = self._prepare_write(key, service, data, fetch_duration, raw_body, headers, tags)
+        if prepared is not None:
+            await self._write(key, service, *prepared, tags)
+
+    async def set_negative(
+        self,
+        service: str,
+        endpoint: str,
+        method: str,
+        params: Dict,
+        error: Optional[ServiceClientError] = None,
+        key: Optional[str] = None
+    ):
+        """Remember a not-found error, or an empty result when error is None, for negative_ttl_seconds"""
+        if not self.config.enabled or not self.config.negative_cache or not (self.redis_client or self._has_local_tier):
+            return
+
+        key = key or self._generate_key(service, endpoint, method, params)
+        prepared = self._prepare_entry(key, service, *self._negative_entry(error))
+        if prepared is not None:
+            await self._write(key, service, *prepared)
+
+    async def _write(self, key: str, service: str, serialized_data: bytes, ttl: int, tags: Sequence[str] = ()):
+        """Store an encoded entry and index it"""
+        if not self.redis_client:
+            return
+        started = time.perf_counter()
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                self._queue_write(pipe, key, service, serialized_data, ttl, tags)
+                await pipe.execute()
+        except redis.exceptions.RedisError as e:
+            print(f"Warning: Could not cache data for key {key}: {e}")
+        self.stats.record_redis((service,), "write", time.perf_counter() - started)
+
+    async def set_many(
+        self,
+        items: List[Tuple[str, str, Any, float, Optional[bytes], Optional[Dict[str, str]], Sequence[str]]]
+    ):
+        """
+        Cache many responses with one pipelined round of writes. Each item is
+        (key, service, data, fetch_duration, raw_body, headers, tags).
+        """
+        if not self.config.enabled or not (self.redis_client or self._has_local_tier):
+            return
+
+        writes = []
+        for key, service, data, fetch_duration, raw_body, headers, tags in items:
+            if data is None:
+                continue
+            prepared = self._prepare_write(key, service, data, fetch_duration, raw_body, headers, tags)
+            if prepared is not None:
+                writes.append((key, service, *prepared, tags))
+
+        if not writes or not self.redis_client:
+            return
+
+        started = time.perf_counter()
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, service, serialized_data, ttl, tags in writes:
+                    self._queue_write(pipe, key, service, serialized_data, ttl, tags)
+                await pipe.execute()
+        except redis.exceptions.RedisError as e:
+            print(f"Warning: Could not cache {len(writes)} entries: {e}")
+        self.stats.record_redis({write[1] for write in writes}, "write", time.perf_counter() - started)
+
+    def _prepare_write(
+        self,
+        key: str,
+        service: str,
+        data: Any,
+        fetch_duration: float,
+        raw_body: Optional[bytes],
+        headers: Optional[Dict[str, str]] = None,
+        tags: Sequence[str] = ()
+    ) -> Optional[Tuple[bytes, int]]:
+        """Encode a new entry and store it in L1; returns the Redis payload and TTL"""
+        new_entry = self._new_entry(data, fetch_duration, headers, tags)
+        if new_entry is None:
+            return None
+        return self._prepare_entry(key, service, *new_entry, raw_body)
+
+    def _prepare_entry(
+        self,
+        key: str,
+        service: str,
+        entry: CacheEntry,
+        ttl: int,
+        raw_body: Optional[bytes] = None
+    ) -> Optional[Tuple[bytes, int]]:
+        """Encode a built entry and store it in the local tiers; returns the Redis payload and TTL"""
+        try:
+            serialized_data = self._encode_timed(service, entry, raw_body)
+        except (TypeError, ValueError) as e:
+            print(f"Warning: Could not cache data for key {key}: {e}")
+            return None
+
+        if self.l1 is not None:
+            self._l1_set(key, entry, serialized_data, min(self._l1_ttl, ttl))
+        if self.disk is not None:
+            self._on_disk(self._disk_set, key, serialized_data, ttl, entry.tags)
+        return serialized_data, ttl
+
+    async def _delete_key(self, key: str):
+        """Remove key from cache"""
+        if self.l1 is not None:
+            self.l1.delete(key)
+        if self.disk is not None:
+            self._on_disk(self._disk_delete, [key])
+        if self.redis_client:
+            await self.redis_client.delete(key)
+
+    async def clear(self, service: Optional[str] = None):
+        """
+        Clear cache, optionally for specific service only. Only keys written
+        by this cache are removed, found through the service indexes.
+        """
+        await self.invalidate(CacheInvalidation(service=service))
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Delete every entry stored with any of the tags; returns the number deleted"""
+        return await self.invalidate(*[CacheInvalidation(tag=tag) for tag in tags])
+
+    async def invalidate(self, *invalidations: CacheInvalidation) -> int:
+        """
+        Delete the matching entries from Redis and from the in-process tier,
+        and broadcast the invalidations to other clients when the bus is on.
+        Returns the number of Redis entries deleted.
+        """
+        if not self.config.enabled or not invalidations:
+            return 0
+
+        # Mutating calls often repeat a target, e.g. through overlapping rules
+        invalidations = tuple(dict.fromkeys(invalidations))
+        self._evict_local(invalidations)
+        if self.bus is not None:
+            self.bus.publish(invalidations)
+        if not self.redis_client:
+            return 0
+
+        # Each target reads its own index, so they run concurrently and the
+        # calling write waits for the slowest rather than for their sum
+        results = await asyncio.gather(
+            *(self._invalidate_redis(invalidation) for invalidation in invalidations), return_exceptions=True
+        )
+        deleted = 0
+        for result in results:
+            if isinstance(result, redis.exceptions.RedisError):
+                print(f"Warning: Could not invalidate cache entries: {result}")
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                deleted += result
+        return deleted
+
+    async def _invalidate_redis(self, invalidation: CacheInvalidation) -> int:
+        """Delete the Redis entries one invalidation covers"""
+        if invalidation.tag:
+            return await self._invalidate_index(self._tag_index(invalidation.tag))
+        if invalidation.endpoint and invalidation.service:
+            return await self._invalidate_index(self._endpoint_index(invalidation.service, invalidation.endpoint))
+        if invalidation.endpoint_prefix and invalidation.service:
+            return await self._invalidate_endpoint_prefix(invalidation.service, invalidation.endpoint_prefix)
+        if invalidation.service:
+            return await self._invalidate_index(self._service_index(invalidation.service))
+        deleted = 0
+        for indexed_service in await self.redis_client.smembers(_SERVICES_INDEX):
+            deleted += await self._invalidate_index(self._service_index(indexed_service.decode()))
+        await self.redis_client.delete(_SERVICES_INDEX)
+        return deleted
+
+    def _evict_local(self, invalidations: Sequence[CacheInvalidation]):
+        """Drop matching entries from the local tiers; also applies invalidations from the bus"""
+        if self.l1 is not None:
+            for invalidation in invalidations:
+                if invalidation.tag:
+                    self.l1.delete_tag(invalidation.tag)
+                elif invalidation.endpoint and invalidation.service:
+                    self.l1.delete_group(_key_group(invalidation.key_prefix))
+                else:
+                    self.l1.clear(invalidation.key_prefix)
+        if self.disk is not None:
+            self._on_disk(self._disk_evict, list(invalidations))
+
+    async def _invalidate_endpoint_prefix(self, service: str, prefix: str) -> int:
+        """Delete a service's entries for every endpoint starting with prefix, found by lexical range"""
+        names_key = self._endpoint_names_index(service)
+        low = b"[" + prefix.encode()
+        # 0xff never occurs in UTF-8, so this bounds every name starting with prefix
+        high = low + b"\xff"
+        deleted = 0
+        while True:
+            endpoints = await self.redis_client.zrangebylex(names_key, low, high, start=0, num=_INVALIDATION_BATCH)
+            if not endpoints:
+                return deleted
+            # Dropped first, so an endpoint written again meanwhile is listed anew
+            await self.redis_client.zrem(names_key, *endpoints)
+            for endpoint in endpoints:
+                deleted += await self._invalidate_index(self._endpoint_index(service, endpoint.decode()))
+
+    async def _invalidate_index(self, index_key: str) -> int:
+        """Delete the entries listed in an index, one batch per round trip"""
+        deleted = 0
+        while True:
+            keys = await self.redis_client.zrange(index_key, 0, _INVALIDATION_BATCH - 1)
+            if not keys:
+                return deleted
+            deleted += await self._delete_batch(index_key, keys)
+
+    async def _delete_batch(self, index_key: str, keys: List[bytes]) -> int:
+        """Delete indexed keys and drop them from their index in one round trip"""
+        by_service: Dict[str, List[bytes]] = {}
+        for key in keys:
+            by_service.setdefault(_key_service(key.decode()), []).append(key)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            # One UNLINK per key, since keys may live on different shards or slots
+            for key in keys:
+                pipe.unlink(key)
+            pipe.zrem(index_key, *keys)
+            # Service indexes are what get_stats() counts
+            for service, service_keys in by_service.items():
+                if service and self._service_index(service) != index_key:
+                    pipe.zrem(self._service_index(service), *service_keys)
+            results = await pipe.execute()
+        deleted = 0
+        keys = [key.decode() for key in keys]
+        for key, unlinked in zip(keys, results):
+            if self.l1 is not None:
+                self.l1.delete(key)
+            # Keys on a failed shard come back as None
+            if unlinked:
+                deleted += 1
+                self.stats.record_invalidation(key)
+        if self.disk is not None:
+            self._on_disk(self._disk_delete, keys)
+        return deleted
+
+    async def _count_entries(self) -> int:
+        """Unexpired entries written by this cache, counted in the service indexes"""
+        services = [service.decode() for service in await self.redis_client.smembers(_SERVICES_INDEX)]
+        if not services:
+            return 0
+        now = time.time()
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for service in services:
+                pipe.zcount(self._service_index(service), now, "+inf")
+            counts = await pipe.execute()
+        # Services whose entries have all expired leave the services index;
+        # counts from a failed shard come back as None and are skipped
+        expired = [service for service, count in zip(services, counts) if count == 0]
+        if expired:
+            await self.redis_client.srem(_SERVICES_INDEX, *expired)
+        return sum(count or 0 for count in counts)
+
+    async def invalidate_gateway_transition(self):
+        """Invalidate all cache entries during Gateway transition"""
+        if not self.config.enabled:
+            return
+
+        # Clear all cache entries to ensure fresh data with new routing
+        await self.clear()
+        print("Cache invalidated for Gateway transition")
+
+    async def get_stats(self) -> Dict[str, Union[str, int, float]]:
+        """Get cache statistics"""
+        if not self.config.enabled or not (self.redis_client or self._has_local_tier):
+            return self._disabled_stats()
+
+        stats = {"enabled": True, **self.stats.snapshot()}
+        if self.redis_client:
+            stats["total_entries"] = await self._count_entries()
+            stats.update(self._stats_from_info(aggregate_info(await self.redis_client.info())))
+        stats.update(self._compression_stats())
+        if self.l1 is not None:
+            stats.update(self.l1.get_stats())
+        if self.disk is not None:
+            stats.update(await self._on_disk(self.disk.get_stats))
+        return stats
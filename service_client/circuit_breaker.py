@@ -19,11 +19,20 @@ class CircuitBreakerConfig(BaseModel):
 
 
 class LocalCircuitBreaker:
-    def __init__(self, name: str, config: CircuitBreakerConfig, gateway_url: str = None, service_token: str = None):
+    def __init__(
+        self,
+        name: str,
+        config: CircuitBreakerConfig,
+        gateway_url: str = None,
+        service_token: str = None,
+        socket_path: str = None
+    ):
         self.name = name
         self.config = config
         self.gateway_url = gateway_url
         self.service_token = service_token
+        # Unix socket of a sidecar Gateway, queried instead of gateway_url's host
+        self.socket_path = socket_path
         self.state = CircuitState.CLOSED
         self.failure_count = 0
         self.success_count = 0
@@ -107,7 +116,8 @@ class LocalCircuitBreaker:
         try:
             # Use shorter timeout for Gateway circuit breaker queries
             timeout = aiohttp.ClientTimeout(total=3, connect=1)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            connector = aiohttp.UnixConnector(path=self.socket_path) if self.socket_path else None
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
                 headers = {
                     "X-Service-Token": self.service_token,
                     "Content-Type": "application/json"
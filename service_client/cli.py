@@ -0,0 +1,92 @@
+"""
+Command line entry points.
+
+    service-client-warm --manifest hot-keys.json --redis-url redis://cache:6379/0
+
+Warms the shared cache tiers (Redis or the disk tier) from a manifest
+written by ServiceClient.export_hot_keys(), e.g. from an init container
+before the service starts. Connection and TTL settings default to the
+SERVICE_CLIENT_* environment variables; the TTLs should match those of the
+service that reads the entries.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+from typing import List, Optional
+
+from .cache import CacheConfig
+from .client import ServiceClient, ServiceClientConfig
+from .exceptions import InvalidConfigurationError
+
+
+def _parser() -> argparse.ArgumentParser:
+    env = os.environ.get
+    parser = argparse.ArgumentParser(prog="service-client-warm", description="Prefetch GET responses into the cache")
+    parser.add_argument("--manifest", help="Manifest of keys written by ServiceClient.export_hot_keys()")
+    parser.add_argument(
+        "--key", nargs="+", action="append", default=[], metavar=("SERVICE ENDPOINT", "PARAMS_JSON"),
+        help="A GET to warm: service, endpoint and optional JSON params; may be repeated"
+    )
+    parser.add_argument("--gateway-url", default=env("SERVICE_CLIENT_GATEWAY_URL"))
+    parser.add_argument("--service-name", default=env("SERVICE_CLIENT_SERVICE_NAME", "cache-warmer"))
+    parser.add_argument("--service-token", default=env("SERVICE_CLIENT_SERVICE_TOKEN"))
+    parser.add_argument("--redis-url", default=env("SERVICE_CLIENT_REDIS_URL"))
+    parser.add_argument("--disk-cache-path", default=env("SERVICE_CLIENT_DISK_CACHE_PATH"))
+    parser.add_argument("--ttl-seconds", type=int, default=env("SERVICE_CLIENT_CACHE_TTL_SECONDS", 60))
+    parser.add_argument("--soft-ttl-seconds", type=int, default=env("SERVICE_CLIENT_CACHE_SOFT_TTL_SECONDS"))
+    parser.add_argument("--hard-ttl-seconds", type=int, default=env("SERVICE_CLIENT_CACHE_HARD_TTL_SECONDS"))
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--strict", action="store_true", help="Exit with status 1 if any key fails to warm")
+    return parser
+
+
+async def _warm(args: argparse.Namespace) -> dict:
+    keys = []
+    for key in args.key:
+        if len(key) not in (2, 3):
+            raise SystemExit(f"--key takes SERVICE ENDPOINT [PARAMS_JSON], got {' '.join(key)}")
+        keys.append((key[0], key[1], json.loads(key[2]) if len(key) == 3 else {}))
+
+    config = ServiceClientConfig(
+        gateway_url=args.gateway_url,
+        service_name=args.service_name,
+        service_token=args.service_token,
+        cache=CacheConfig(
+            redis_url=args.redis_url,
+            disk_cache_path=args.disk_cache_path,
+            ttl_seconds=args.ttl_seconds,
+            soft_ttl_seconds=args.soft_ttl_seconds,
+            hard_ttl_seconds=args.hard_ttl_seconds,
+        ),
+        hot_key_capacity=0,
+    )
+    async with ServiceClient(config) as client:
+        return await client.warm_cache(keys, manifest=args.manifest, concurrency=args.concurrency)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parser().parse_args(argv)
+    if not args.gateway_url or not args.service_token:
+        print("Error: --gateway-url and --service-token (or SERVICE_CLIENT_* variables) are required", file=sys.stderr)
+        return 2
+    if not args.manifest and not args.key:
+        print("Error: nothing to warm, pass --manifest or --key", file=sys.stderr)
+        return 2
+    if not args.redis_url and not args.disk_cache_path:
+        print("Error: nothing to warm into, pass --redis-url or --disk-cache-path", file=sys.stderr)
+        return 2
+
+    try:
+        summary = asyncio.run(_warm(args))
+    except InvalidConfigurationError as e:
+        # Redis was unreachable and there is no disk tier
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(f"Warmed {summary['warmed']} keys, {summary['failed']} failed")
+    return 1 if args.strict and summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
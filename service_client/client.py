@@ -1,19 +1,25 @@
 import aiohttp
 import asyncio
+import random
 import uuid
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Iterable, Optional, List, Sequence, Tuple, Union
 # ServiceDiscovery removed - routing through Gateway
 from .circuit_breaker import LocalCircuitBreaker, CircuitBreakerConfig
 from .retry import RetryHandler, RetryConfig
-from .cache import LocalCache, CacheConfig
+from .connection import ConnectionPoolConfig, split_gateway_url
+from .transport import Transport, TransportType, create_transport
+from .cache import AsyncLocalCache, CacheConfig, CacheEntry, CacheInvalidation
+from .invalidation import InvalidationRule
 from .metrics import MetricsCollector
+from .warming import HotKeyTracker, WarmKey, load_manifest, save_manifest
+from .serializers import fastest_json_loads
 from .exceptions import *
 from pydantic import BaseModel, Field
 
 class ServiceClientConfig(BaseModel):
     # API Gateway connection
-    gateway_url: str = Field(..., description="API Gateway base URL")
+    gateway_url: str = Field(..., description="API Gateway base URL, or unix:///path/to.sock for a sidecar gateway")
     gateway_timeout: int = Field(default=30, description="Gateway timeout in seconds")
     
     # Service identification
@@ -24,43 +30,139 @@ class ServiceClientConfig(BaseModel):
     circuit_breaker: CircuitBreakerConfig = Field(default_factory=CircuitBreakerConfig)
     retry: RetryConfig = Field(default_factory=RetryConfig)
     cache: CacheConfig = Field(default_factory=CacheConfig)
+    connection_pool: ConnectionPoolConfig = Field(default_factory=ConnectionPoolConfig)
+    transport: TransportType = Field(default=TransportType.AIOHTTP, description="HTTP transport to the gateway: aiohttp (HTTP/1.1), http2 or unix")
+    gateway_socket_path: Optional[str] = Field(default=None, description="Unix domain socket of a sidecar gateway, for the unix transport")
     
     # Service-specific overrides
     service_timeouts: Dict[str, int] = Field(default_factory=dict)
     circuit_breakers: Dict[str, CircuitBreakerConfig] = Field(default_factory=dict)
+    service_coalescing: Dict[str, bool] = Field(default_factory=dict)
+    
+    # Write-through invalidation of cached GETs by mutating calls
+    invalidation_rules: List[InvalidationRule] = Field(default_factory=list)
+    
+    # Request coalescing
+    coalesce_requests: bool = Field(default=True, description="Share one upstream request between identical concurrent GETs")
+    
+    # Cache warming
+    warm_concurrency: int = Field(default=10, description="Maximum concurrent requests made by warm_cache()")
+    hot_key_capacity: int = Field(default=1000, description="Distinct GETs counted for export_hot_keys(), 0 disables tracking")
+    
+    # Refresh-ahead of registered hot keys
+    refresh_ahead_ratio: float = Field(default=0.8, description="Refresh a registered key once this fraction of its fresh TTL has passed")
+    refresh_ahead_jitter: float = Field(default=0.1, description="Refresh up to this fraction of the TTL earlier, at random, to spread refreshes")
+    refresh_ahead_concurrency: int = Field(default=4, description="Maximum concurrent refresh-ahead requests")
     
     class Config:
         env_prefix = "SERVICE_CLIENT_"
         case_sensitive = False
 
+# Marks a cache lookup that has not been performed yet
+_NOT_LOOKED_UP = object()
+
+# Response headers that drive HTTP caching
+_CACHE_HEADERS = ("Cache-Control", "ETag", "Last-Modified")
+
+class _CacheableResponse:
+    """
+    Decoded gateway response together with what the cache needs from the raw
+    response: the body bytes it was parsed from and its caching headers.
+    not_modified marks a 304 answered with the revalidated entry's data.
+    """
+    __slots__ = ("data", "body", "headers", "not_modified")
+    
+    def __init__(
+        self,
+        data: Any,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        not_modified: bool = False
+    ):
+        self.data = data
+        self.body = body
+        self.headers = headers
+        self.not_modified = not_modified
+
+# Delay before retrying a failed refresh-ahead, doubled per consecutive failure up to the maximum
+_REFRESH_AHEAD_RETRY_SECONDS = 1.0
+_REFRESH_AHEAD_MAX_RETRY_SECONDS = 300.0
+
+class _RefreshAheadKey:
+    """A GET kept fresh by the refresh-ahead scheduler"""
+    __slots__ = ("target_service", "endpoint", "params", "cache_tags", "next_refresh", "stored_at", "failures")
+    
+    def __init__(self, target_service: str, endpoint: str, params: Optional[Dict], cache_tags: Sequence[str]):
+        self.target_service = target_service
+        self.endpoint = endpoint
+        self.params = params
+        self.cache_tags = tuple(cache_tags)
+        # Due immediately, so the first read already finds it cached
+        self.next_refresh = 0.0
+        # stored_at of the entry next_refresh was computed from
+        self.stored_at = 0.0
+        # Consecutive refreshes that failed or came back empty
+        self.failures = 0
+
+def _unwrap_response(response: Any) -> Tuple[Any, Optional[bytes], Optional[Dict[str, str]], bool]:
+    """Split a response into (data, raw body, caching headers, not modified)"""
+    if isinstance(response, _CacheableResponse):
+        return response.data, response.body, response.headers, response.not_modified
+    return response, None, None, False
+
 class ServiceClient:
     """
     Main client for service-to-service communication in ThinkRealty microservices
     """
     
-    def __init__(self, config: ServiceClientConfig):
+    def __init__(self, config: ServiceClientConfig, transport: Optional[Transport] = None):
+        """transport replaces the one selected by config, e.g. an InMemoryTransport in tests"""
         self.config = config
         self.service_name = config.service_name
         self.service_token = config.service_token
+        # A unix:// gateway URL selects the unix transport, with requests sent to a placeholder host
+        self.gateway_url, socket_path = split_gateway_url(config.gateway_url)
+        self._transport_type = config.transport
+        if socket_path is not None and self._transport_type != TransportType.UNIX:
+            if self._transport_type != TransportType.AIOHTTP:
+                print(f"Warning: The {self._transport_type.value} transport does not support unix:// gateway URLs. Using the unix transport.")
+            self._transport_type = TransportType.UNIX
+        # Socket the gateway listens on, None when it is reached over TCP
+        self.gateway_socket_path = (
+            (socket_path or config.gateway_socket_path) if self._transport_type == TransportType.UNIX else None
+        )
         
         # Initialize components
         # Note: Service discovery removed as we route through Gateway
         self.retry_handler = RetryHandler(config.retry)
-        self.cache = LocalCache(config.cache)
         self.metrics = MetricsCollector(config.service_name)
+        self.cache = AsyncLocalCache(config.cache, metrics=self.metrics)
+        self._json_loads = fastest_json_loads()
+        self.hot_keys = HotKeyTracker(config.hot_key_capacity) if config.hot_key_capacity > 0 else None
         
         # Circuit breakers per target service
         self._circuit_breakers: Dict[str, LocalCircuitBreaker] = {}
-        self._http_session: Optional[aiohttp.ClientSession] = None
+        self.transport: Optional[Transport] = transport
         
         # Request tracking
         self._active_requests: Dict[str, asyncio.Task] = {}
+        # In-flight GETs by cache key, awaited by identical concurrent calls
+        self._inflight_requests: Dict[str, asyncio.Future] = {}
+        # Background refreshes of stale cache entries, by cache key
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+        # GETs refreshed before they expire, by cache key, and their scheduler
+        self._refresh_ahead_keys: Dict[str, _RefreshAheadKey] = {}
+        self._refresh_ahead_task: Optional[asyncio.Task] = None
+        self._refresh_ahead_wakeup: Optional[asyncio.Event] = None
         
         # Gateway availability tracking
         self._gateway_available: bool = True
         self._last_gateway_check: float = 0
         self._gateway_check_interval: float = 30.0  # Check every 30 seconds
         
+        # Set once start() has finished, including connection warm-up
+        self.ready: bool = False
+        
     async def __aenter__(self):
         await self.start()
         return self
@@ -70,18 +172,48 @@ class ServiceClient:
         
     async def start(self):
         """Initialize the client"""
-        self._http_session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=self.config.gateway_timeout)
-        )
+        if self.transport is None:
+            self.transport = create_transport(
+                self._transport_type,
+                self.config.connection_pool,
+                self.config.gateway_timeout,
+                self.gateway_socket_path,
+                self.gateway_url
+            )
+        await self.transport.start()
+        self.metrics.register_connection_pool(self.get_connection_pool_stats)
+        await self.cache.connect()
+        if self.config.connection_pool.warmup_connections > 0:
+            await self._warm_connections(self.config.connection_pool.warmup_connections)
+        self._start_refresh_ahead()
+        self.ready = True
+        
+    async def _warm_connections(self, count: int):
+        """
+        Open keep-alive connections to the gateway ahead of the first
+        requests, paying the TCP and TLS handshakes here. Concurrent health
+        checks each need their own connection, which returns to the pool.
+        """
+        results = await asyncio.gather(*(self._check_gateway_health() for _ in range(count)))
+        if not all(results):
+            print(f"Warning: Only {sum(results)} of {count} gateway connections could be pre-warmed")
         
     async def close(self):
         """Cleanup resources"""
-        if self._http_session:
-            await self._http_session.close()
+        self.ready = False
+        if self._refresh_ahead_task:
+            self._refresh_ahead_task.cancel()
+            self._refresh_ahead_task = None
+        self.metrics.unregister_connection_pool()
+        if self.transport:
+            await self.transport.close()
+        await self.cache.close()
             
         # Cancel any active requests
         for task in self._active_requests.values():
             task.cancel()
+        for task in list(self._refresh_tasks.values()):
+            task.cancel()
             
     def _get_circuit_breaker(self, target_service: str) -> LocalCircuitBreaker:
         """Get or create circuit breaker for target service"""
@@ -94,11 +226,18 @@ class ServiceClient:
             self._circuit_breakers[target_service] = LocalCircuitBreaker(
                 name=f"{target_service}-circuit",
                 config=circuit_config,
-                gateway_url=self.config.gateway_url,
-                service_token=self.service_token
+                gateway_url=self.gateway_url,
+                service_token=self.service_token,
+                socket_path=self.gateway_socket_path
             )
         return self._circuit_breakers[target_service]
     
+    def _should_coalesce(self, target_service: str, coalesce: Optional[bool]) -> bool:
+        """Resolve coalescing from the per-call flag, service override, then default"""
+        if coalesce is not None:
+            return coalesce
+        return self.config.service_coalescing.get(target_service, self.config.coalesce_requests)
+    
     async def call(
         self,
         target_service: str,
@@ -110,13 +249,65 @@ class ServiceClient:
         timeout: Optional[int] = None,
         use_cache: bool = True,
         use_circuit_breaker: bool = True,
-        use_retry: bool = True
+        use_retry: bool = True,
+        coalesce: Optional[bool] = None,
+        cache_tags: Sequence[str] = (),
+        invalidate: Sequence[CacheInvalidation] = ()
     ) -> Any:
         """
-        Main method to call another service
+        Main method to call another service.
+        cache_tags label a cached GET response for invalidate_cache_tags();
+        invalidate lists cache entries a successful call makes outdated, in
+        addition to those from config.invalidation_rules; they are dropped
+        here and, with the invalidation bus, on every other client.
+        """
+        return await self._call(
+            target_service,
+            endpoint,
+            method=method,
+            data=data,
+            params=params,
+            headers=headers,
+            timeout=timeout,
+            use_cache=use_cache,
+            use_circuit_breaker=use_circuit_breaker,
+            use_retry=use_retry,
+            coalesce=coalesce,
+            cache_tags=cache_tags,
+            invalidate=invalidate
+        )
+    
+    async def _call(
+        self,
+        target_service: str,
+        endpoint: str,
+        method: str = "GET",
+        data: Optional[Any] = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[int] = None,
+        use_cache: bool = True,
+        use_circuit_breaker: bool = True,
+        use_retry: bool = True,
+        coalesce: Optional[bool] = None,
+        cache_tags: Sequence[str] = (),
+        invalidate: Sequence[CacheInvalidation] = (),
+        cache_key: Optional[str] = None,
+        cached_entry: Any = _NOT_LOOKED_UP,
+        cache_writes: Optional[List[Tuple]] = None,
+        cache_invalidations: Optional[List[CacheInvalidation]] = None
+    ) -> Any:
+        """
+        Implementation of call(). batch_call passes the cache key and the entry
+        it already fetched, and collects cache writes and invalidations in
+        cache_writes and cache_invalidations to apply them together.
         """
         request_id = str(uuid.uuid4())
         start_time = time.time()
+        # True when this call awaited another caller's identical in-flight request
+        shared_request = False
+        # True while replaying a cached not-found error, which is not a failure
+        replaying_negative = False
         
         try:
             self.metrics.record_request(target_service, endpoint, method)
@@ -128,70 +319,409 @@ class ServiceClient:
                     self.metrics.record_circuit_open(circuit_breaker.name)
                     raise CircuitOpenError(target_service, circuit_breaker.name)
             
+            request_kwargs = dict(
+                target_service=target_service,
+                endpoint=endpoint,
+                method=method,
+                data=data,
+                params=params,
+                headers=headers,
+                timeout=timeout,
+                request_id=request_id,
+                raw_body=use_cache and method.upper() == "GET" and self.config.cache.cache_raw_responses,
+                capture_headers=use_cache and method.upper() == "GET" and self.config.cache.honor_cache_headers
+            )
+            # Generated once per GET and reused for lookup, coalescing, store and fallback
+            if method.upper() == "GET" and cache_key is None:
+                cache_key = self.cache._generate_key(target_service, endpoint, method, params or {})
+            
             # Step 2: Check local cache (for GET requests)
             if use_cache and method.upper() == "GET":
-                cached_response = self.cache.get(target_service, endpoint, method, params or {})
-                if cached_response is not None:
-                    self.metrics.record_cache_hit(target_service)
-                    return cached_response
+                if self.hot_keys is not None:
+                    self.hot_keys.record(cache_key, target_service, endpoint, params)
+                if cached_entry is _NOT_LOOKED_UP:
+                    cached_entry = await self.cache.get_entry(
+                        target_service, endpoint, method, params or {}, key=cache_key
+                    )
+                if cached_entry is not None and cached_entry.negative:
+                    if self.cache.is_fresh(cached_entry):
+                        self.metrics.record_cache_hit(target_service)
+                        self.metrics.record_negative_hit(target_service)
+                        replaying_negative = True
+                        return cached_entry.replay()
+                    cached_entry = None
+                if cached_entry is not None:
+                    if self.config.cache.honor_cache_headers and (cached_entry.etag or cached_entry.last_modified):
+                        # Ask the gateway whether the entry changed instead of re-downloading it
+                        request_kwargs["revalidate"] = cached_entry
+                    if self.cache.is_fresh(cached_entry):
+                        self.metrics.record_cache_hit(target_service)
+                        if self.cache.should_refresh_early(cached_entry):
+                            # Probabilistic early refresh spreads expiry across instances
+                            self._schedule_refresh(
+                                cache_key,
+                                use_retry,
+                                circuit_breaker if use_circuit_breaker else None,
+                                cache_tags,
+                                **request_kwargs
+                            )
+                        return cached_entry.data
+                    if self.config.cache.stale_while_revalidate and self.cache.can_serve_stale(cached_entry):
+                        # Serve stale data now, refresh it off the request path
+                        self.metrics.record_cache_hit(target_service)
+                        self.metrics.record_stale_hit(target_service)
+                        self._schedule_refresh(
+                            cache_key,
+                            use_retry,
+                            circuit_breaker if use_circuit_breaker else None,
+                            cache_tags,
+                            **request_kwargs
+                        )
+                        return cached_entry.data
                 self.metrics.record_cache_miss(target_service)
             
-            # Step 3: Execute with retry logic
-            if use_retry:
-                response = await self.retry_handler.execute_with_retry(
-                    operation=self._execute_request,
-                    operation_name=target_service,
-                    target_service=target_service,
-                    endpoint=endpoint,
-                    method=method,
-                    data=data,
-                    params=params,
-                    headers=headers,
-                    timeout=timeout,
-                    request_id=request_id
-                )
+            # Step 3: Execute with retry logic, sharing one upstream request
+            # between identical concurrent GETs
+            coalesce_key = None
+            if cache_key and self._should_coalesce(target_service, coalesce):
+                coalesce_key = cache_key
+            fetch_start = time.time()
+            
+            inflight = self._inflight_requests.get(coalesce_key) if coalesce_key else None
+            if inflight is not None:
+                shared_request = True
+                self.metrics.record_coalesced_request(target_service)
+                try:
+                    response = await asyncio.shield(inflight)
+                except asyncio.CancelledError:
+                    if not inflight.cancelled():
+                        raise
+                    # The leading call was cancelled; issue our own request
+                    shared_request = False
+                    response = await self._send_request(use_retry, **request_kwargs)
             else:
-                response = await self._execute_request(
-                    target_service=target_service,
-                    endpoint=endpoint,
-                    method=method,
-                    data=data,
-                    params=params,
-                    headers=headers,
-                    timeout=timeout,
-                    request_id=request_id
-                )
+                response = await self._send_request(use_retry, coalesce_key, **request_kwargs)
+            response, raw_body, response_headers, not_modified = _unwrap_response(response)
             
-            # Step 4: Record success
-            if use_circuit_breaker:
+            # Step 4: Record success (the leading call records for shared requests)
+            if use_circuit_breaker and not shared_request:
                 await circuit_breaker.record_success()
                 
             latency = time.time() - start_time
             self.metrics.record_success(target_service, endpoint, latency, method)
             
             # Step 5: Cache successful GET responses
-            if use_cache and method.upper() == "GET":
-                self.cache.set(target_service, endpoint, method, params or {}, response)
+            if use_cache and method.upper() == "GET" and not shared_request:
+                fetch_duration = time.time() - fetch_start
+                if "revalidate" in request_kwargs:
+                    self.metrics.record_revalidation(target_service, not_modified)
+                if response is None:
+                    # Empty results are only kept as negative entries
+                    await self.cache.set_negative(target_service, endpoint, method, params or {}, key=cache_key)
+                elif cache_writes is not None:
+                    # batch_call stores all of its writes in one pipeline
+                    cache_writes.append(
+                        (cache_key, target_service, response, fetch_duration, raw_body, response_headers, cache_tags)
+                    )
+                else:
+                    await self.cache.set(
+                        target_service, endpoint, method, params or {}, response,
+                        fetch_duration=fetch_duration,
+                        raw_body=raw_body,
+                        key=cache_key,
+                        headers=response_headers,
+                        tags=cache_tags
+                    )
+            
+            # Step 6: Drop cache entries this call made outdated
+            invalidations = list(invalidate)
+            if method.upper() != "GET":
+                for rule in self.config.invalidation_rules:
+                    invalidations.extend(rule.invalidations_for(target_service, method, endpoint))
+            if invalidations:
+                if cache_invalidations is not None:
+                    cache_invalidations.extend(invalidations)
+                else:
+                    await self.cache.invalidate(*invalidations)
             
             return response
             
         except Exception as e:
+            if replaying_negative:
+                raise
+            
             # Record failure
             latency = time.time() - start_time
             self.metrics.record_failure(target_service, endpoint, str(e), method)
             
-            if use_circuit_breaker:
+            if use_circuit_breaker and not shared_request:
                 await circuit_breaker.record_failure()
                 
-            # If we have a cached response and the service is failing, return it
+            # Remember not-found errors so repeated lookups skip the gateway
+            if use_cache and method.upper() == "GET" and self.cache.is_negative_cacheable(e):
+                if not shared_request:
+                    await self.cache.set_negative(target_service, endpoint, method, params or {}, error=e, key=cache_key)
+                raise
+            
+            # If we have a cached response and the service is failing, return it.
+            # The entry found before the call is reused; it is only looked up
+            # here when the call failed before reaching the cache.
             if use_cache and method.upper() == "GET":
-                cached_response = self.cache.get(target_service, endpoint, method, params or {})
-                if cached_response is not None:
+                if cached_entry is _NOT_LOOKED_UP:
+                    cached_entry = await self.cache.get_entry(
+                        target_service, endpoint, method, params or {},
+                        key=cache_key or self.cache._generate_key(target_service, endpoint, method, params or {})
+                    )
+                if cached_entry is not None and self.cache.can_serve_on_error(cached_entry):
                     print(f"Returning cached response due to error: {e}")
-                    return cached_response
+                    return cached_entry.data
                     
             raise
     
+    def _schedule_refresh(
+        self,
+        cache_key: str,
+        use_retry: bool,
+        circuit_breaker: Optional[LocalCircuitBreaker],
+        cache_tags: Sequence[str],
+        **request_kwargs
+    ):
+        """Refresh a stale cache entry in the background, at most once per key"""
+        if cache_key in self._refresh_tasks:
+            return
+        
+        request_kwargs["request_id"] = str(uuid.uuid4())
+        task = asyncio.create_task(
+            self._refresh_entry(cache_key, use_retry, circuit_breaker, cache_tags, **request_kwargs)
+        )
+        self._refresh_tasks[cache_key] = task
+        
+        def _forget(finished: asyncio.Task):
+            if self._refresh_tasks.get(cache_key) is finished:
+                del self._refresh_tasks[cache_key]
+        
+        task.add_done_callback(_forget)
+    
+    async def _refresh_entry(
+        self,
+        cache_key: str,
+        use_retry: bool,
+        circuit_breaker: Optional[LocalCircuitBreaker],
+        cache_tags: Sequence[str],
+        **request_kwargs
+    ):
+        """Fetch a fresh response and store it; the stale entry stays on failure"""
+        target_service = request_kwargs["target_service"]
+        endpoint = request_kwargs["endpoint"]
+        coalesce_key = cache_key if self._should_coalesce(target_service, None) else None
+        inflight = self._inflight_requests.get(coalesce_key) if coalesce_key else None
+        if inflight is not None:
+            # A caller is already fetching this key and stores the response itself
+            try:
+                await asyncio.shield(inflight)
+                return
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leading call was cancelled; refresh with a request of our own
+            except Exception:
+                # The leading call handles its failure
+                return
+        
+        fetch_start = time.time()
+        try:
+            response = await self._send_request(use_retry, coalesce_key, **request_kwargs)
+        except Exception as e:
+            if circuit_breaker:
+                await circuit_breaker.record_failure()
+            if self.cache.is_negative_cacheable(e):
+                # The entity is gone; stop serving the stale entry
+                await self.cache.set_negative(
+                    target_service, endpoint, request_kwargs["method"], request_kwargs["params"] or {},
+                    error=e,
+                    key=cache_key
+                )
+                return
+            print(f"Background refresh failed for {target_service}{endpoint}: {e}")
+            return
+        
+        if circuit_breaker:
+            await circuit_breaker.record_success()
+        response, raw_body, response_headers, not_modified = _unwrap_response(response)
+        if "revalidate" in request_kwargs:
+            self.metrics.record_revalidation(target_service, not_modified)
+        if response is None:
+            # As on the request path, empty results are only kept as negative entries
+            await self.cache.set_negative(
+                target_service, endpoint, request_kwargs["method"], request_kwargs["params"] or {}, key=cache_key
+            )
+            return
+        await self.cache.set(
+            target_service, endpoint, request_kwargs["method"], request_kwargs["params"] or {}, response,
+            fetch_duration=time.time() - fetch_start,
+            raw_body=raw_body,
+            key=cache_key,
+            headers=response_headers,
+            tags=cache_tags
+        )
+    
+    def register_refresh_ahead(
+        self,
+        target_service: str,
+        endpoint: str,
+        params: Optional[Dict] = None,
+        cache_tags: Sequence[str] = ()
+    ) -> str:
+        """
+        Keep a GET in the cache by refreshing it in the background before it
+        expires, so reads of it never wait on the gateway. Meant for config
+        and lookup endpoints read on nearly every request. The first refresh
+        runs right away; returns the cache key. Needs a cache tier (Redis, L1
+        or disk) to keep the refreshed response in.
+        """
+        if not self.cache.has_storage:
+            raise InvalidConfigurationError(
+                "cache", "no storage tier", "Refresh-ahead needs caching enabled with Redis, l1_enabled or disk_cache_path"
+            )
+        cache_key = self.cache._generate_key(target_service, endpoint, "GET", params or {})
+        if cache_key not in self._refresh_ahead_keys:
+            self._refresh_ahead_keys[cache_key] = _RefreshAheadKey(target_service, endpoint, params, cache_tags)
+            if self._refresh_ahead_wakeup is not None:
+                self._refresh_ahead_wakeup.set()
+        if self.transport is not None:
+            self._start_refresh_ahead()
+        return cache_key
+    
+    def unregister_refresh_ahead(self, target_service: str, endpoint: str, params: Optional[Dict] = None):
+        """Stop refreshing a GET registered with register_refresh_ahead()"""
+        cache_key = self.cache._generate_key(target_service, endpoint, "GET", params or {})
+        self._refresh_ahead_keys.pop(cache_key, None)
+    
+    def _start_refresh_ahead(self):
+        if self._refresh_ahead_keys and self._refresh_ahead_task is None:
+            self._refresh_ahead_task = asyncio.create_task(self._run_refresh_ahead())
+    
+    async def _run_refresh_ahead(self):
+        """Refresh registered keys as they come due, sleeping until the next one"""
+        semaphore = asyncio.Semaphore(self.config.refresh_ahead_concurrency)
+        self._refresh_ahead_wakeup = asyncio.Event()
+        while True:
+            self._refresh_ahead_wakeup.clear()
+            now = time.time()
+            due = [
+                (cache_key, registration) for cache_key, registration in self._refresh_ahead_keys.items()
+                if registration.next_refresh <= now
+            ]
+            if due:
+                await asyncio.gather(*(
+                    self._refresh_ahead(cache_key, registration, semaphore) for cache_key, registration in due
+                ))
+                continue
+            
+            next_refresh = min(
+                (registration.next_refresh for registration in self._refresh_ahead_keys.values()), default=None
+            )
+            timeout = None if next_refresh is None else max(next_refresh - now, 0)
+            try:
+                await asyncio.wait_for(self._refresh_ahead_wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _refresh_ahead(self, cache_key: str, registration: _RefreshAheadKey, semaphore: asyncio.Semaphore):
+        """Refresh one registered key, unless another caller or instance just did, and schedule the next refresh"""
+        async with semaphore:
+            try:
+                entry = await self._refresh_ahead_entry(cache_key, registration)
+            except Exception as e:
+                print(f"Warning: Refresh-ahead failed for {registration.target_service}{registration.endpoint}: {e}")
+                entry = None
+            
+            if entry is None or entry.negative or entry.stored_at <= registration.stored_at:
+                # Failed or empty: back off exponentially instead of hammering the gateway
+                registration.failures += 1
+                delay = min(
+                    _REFRESH_AHEAD_RETRY_SECONDS * 2 ** (registration.failures - 1), _REFRESH_AHEAD_MAX_RETRY_SECONDS
+                )
+                registration.next_refresh = time.time() + delay
+                return
+            registration.failures = 0
+            registration.stored_at = entry.stored_at
+            registration.next_refresh = max(self._refresh_ahead_due(entry), time.time() + _REFRESH_AHEAD_RETRY_SECONDS)
+    
+    async def _refresh_ahead_entry(self, cache_key: str, registration: _RefreshAheadKey) -> Optional[CacheEntry]:
+        """The registered key's entry, refreshed first unless it is newer than the last one seen"""
+        target_service, endpoint, params = registration.target_service, registration.endpoint, registration.params
+        # Scheduler reads are not caller lookups, so they stay out of the hit/miss stats
+        entry = await self.cache.get_entry(target_service, endpoint, "GET", params or {}, key=cache_key, record=False)
+        if entry is None or entry.negative or entry.stored_at <= registration.stored_at:
+            circuit_breaker = self._get_circuit_breaker(target_service)
+            if await circuit_breaker.can_execute():
+                request_kwargs = dict(
+                    target_service=target_service,
+                    endpoint=endpoint,
+                    method="GET",
+                    data=None,
+                    params=params,
+                    headers=None,
+                    timeout=None,
+                    raw_body=self.config.cache.cache_raw_responses,
+                    capture_headers=self.config.cache.honor_cache_headers
+                )
+                if entry is not None and not entry.negative and self.config.cache.honor_cache_headers and (
+                    entry.etag or entry.last_modified
+                ):
+                    request_kwargs["revalidate"] = entry
+                # Shares the refresh already running for this key, if any
+                self._schedule_refresh(cache_key, True, circuit_breaker, registration.cache_tags, **request_kwargs)
+                await asyncio.wait([self._refresh_tasks[cache_key]])
+            entry = await self.cache.get_entry(
+                target_service, endpoint, "GET", params or {}, key=cache_key, record=False
+            )
+        return entry
+    
+    def _refresh_ahead_due(self, entry: CacheEntry) -> float:
+        """When a registered entry should be refreshed: a jittered fraction into its fresh TTL"""
+        ttl = self.cache.fresh_until(entry) - entry.stored_at
+        ratio = self.config.refresh_ahead_ratio - self.config.refresh_ahead_jitter * random.random()
+        return entry.stored_at + ttl * max(ratio, 0)
+    
+    async def _send_request(self, use_retry: bool, coalesce_key: Optional[str] = None, **request_kwargs) -> Any:
+        """
+        Send a request upstream, publishing its outcome to identical concurrent
+        callers when a coalesce key is given
+        """
+        future = None
+        if coalesce_key:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight_requests[coalesce_key] = future
+        
+        try:
+            if use_retry:
+                response = await self.retry_handler.execute_with_retry(
+                    operation=self._execute_request,
+                    operation_name=request_kwargs["target_service"],
+                    **request_kwargs
+                )
+            else:
+                response = await self._execute_request(**request_kwargs)
+        except asyncio.CancelledError:
+            if future:
+                future.cancel()
+            raise
+        except Exception as e:
+            if future:
+                future.set_exception(e)
+                # Followers re-raise it; don't warn when there were none
+                future.exception()
+            raise
+        else:
+            if future:
+                future.set_result(response)
+            return response
+        finally:
+            if future and self._inflight_requests.get(coalesce_key) is future:
+                del self._inflight_requests[coalesce_key]
+    
     async def _execute_request(
         self,
         target_service: str,
@@ -201,17 +731,24 @@ class ServiceClient:
         params: Optional[Dict],
         headers: Optional[Dict],
         timeout: Optional[int],
-        request_id: str
+        request_id: str,
+        raw_body: bool = False,
+        capture_headers: bool = False,
+        revalidate: Optional[CacheEntry] = None
     ) -> Any:
         """
-        Execute a single HTTP request through the API Gateway
+        Execute a single HTTP request through the API Gateway.
+        With raw_body or capture_headers, a successful response is returned
+        as a _CacheableResponse carrying the body bytes (cached without
+        re-encoding) and the caching headers. With revalidate, the request is
+        made conditional on that cache entry and a 304 returns its data
+        without reading a body.
         """
         # Step 1: Build Gateway URL (route through Gateway instead of direct service call)
-        gateway_url = self.config.gateway_url.rstrip('/')
         # Ensure endpoint starts with /
         if not endpoint.startswith('/'):
             endpoint = '/' + endpoint
-        url = f"{gateway_url}/gateway/{target_service}{endpoint}"
+        url = f"{self.gateway_url}/gateway/{target_service}{endpoint}"
         timeout = timeout or self.config.service_timeouts.get(target_service, 30)
         
         # Add Gateway availability check
@@ -229,9 +766,11 @@ class ServiceClient:
             "Content-Type": "application/json",
             **(headers or {})
         }
+        if revalidate is not None:
+            request_headers.update(revalidate.conditional_headers())
         
         # Step 3: Make HTTP request through Gateway
-        async with self._http_session.request(
+        async with self.transport.request(
             method=method.upper(),
             url=url,
             json=data,
@@ -240,8 +779,22 @@ class ServiceClient:
             timeout=timeout
         ) as response:
             
-            if response.status >= 200 and response.status < 300:
-                return await response.json()
+            if response.status == 304 and revalidate is not None:
+                # The cached entry is still current; keep its validators
+                # unless the gateway sent new ones
+                cache_headers = {"ETag": revalidate.etag, "Last-Modified": revalidate.last_modified}
+                cache_headers = {name: value for name, value in cache_headers.items() if value}
+                cache_headers.update(self._cache_headers(response))
+                return _CacheableResponse(revalidate.data, headers=cache_headers, not_modified=True)
+            elif response.status >= 200 and response.status < 300:
+                cache_headers = self._cache_headers(response) if capture_headers else None
+                if raw_body:
+                    body = await response.read()
+                    return _CacheableResponse(self._json_loads(body) if body.strip() else None, body, cache_headers)
+                data = await response.json(loads=self._json_loads)
+                if capture_headers:
+                    return _CacheableResponse(data, headers=cache_headers)
+                return data
             elif response.status >= 400 and response.status < 500:
                 # Parse Gateway error responses
                 await self._handle_error_response(response, target_service)
@@ -251,6 +804,11 @@ class ServiceClient:
                     service_name=target_service, reason=f"Service returned {response.status}: {error_text}"
                 )
     
+    @staticmethod
+    def _cache_headers(response) -> Dict[str, str]:
+        """The response's caching headers, under their canonical names"""
+        return {name: response.headers[name] for name in _CACHE_HEADERS if name in response.headers}
+    
     async def _handle_error_response(self, response, target_service: str):
         """Parse Gateway error responses"""
         try:
@@ -266,7 +824,8 @@ class ServiceClient:
                 raise GatewayErrorResponse(
                     error_type=error_type,
                     message=message,
-                    correlation_id=correlation_id
+                    correlation_id=correlation_id,
+                    error_code=response.status
                 )
             else:
                 # Fallback to generic error
@@ -321,11 +880,32 @@ class ServiceClient:
         requests: List[Dict[str, Any]]
     ) -> List[Any]:
         """
-        Execute multiple service calls concurrently
+        Execute multiple service calls concurrently.
+        
+        Cache lookups for all cacheable GETs are resolved with a single
+        multi-get, only misses go upstream, and their responses are written
+        back in one pipeline. Invalidations from mutating calls are applied
+        together once all calls finish.
         """
+        cache_keys: Dict[int, str] = {}
+        for index, req in enumerate(requests):
+            method = req.get("method", "GET")
+            if req.get("use_cache", True) and method.upper() == "GET":
+                cache_keys[index] = self.cache._generate_key(
+                    req["target_service"], req["endpoint"], method, req.get("params") or {}
+                )
+        
+        cached_entries = {}
+        if cache_keys:
+            cached_entries = await self.cache.get_entries(
+                {key: requests[index]["target_service"] for index, key in cache_keys.items()}
+            )
+        
+        cache_writes: List[Tuple] = []
+        cache_invalidations: List[CacheInvalidation] = []
         tasks = []
-        for req in requests:
-            task = self.call(
+        for index, req in enumerate(requests):
+            task = self._call(
                 target_service=req["target_service"],
                 endpoint=req["endpoint"],
                 method=req.get("method", "GET"),
@@ -334,11 +914,24 @@ class ServiceClient:
                 headers=req.get("headers"),
                 timeout=req.get("timeout"),
                 use_cache=req.get("use_cache", True),
-                use_circuit_breaker=req.get("use_circuit_breaker", True)
+                use_circuit_breaker=req.get("use_circuit_breaker", True),
+                coalesce=req.get("coalesce"),
+                cache_tags=req.get("cache_tags", ()),
+                invalidate=req.get("invalidate", ()),
+                cache_key=cache_keys.get(index),
+                cached_entry=cached_entries.get(cache_keys[index]) if index in cache_keys else _NOT_LOOKED_UP,
+                cache_writes=cache_writes,
+                cache_invalidations=cache_invalidations
             )
             tasks.append(task)
         
-        return await asyncio.gather(*tasks, return_exceptions=True)
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        if cache_writes:
+            await self.cache.set_many(cache_writes)
+        if cache_invalidations:
+            # After the writes, so GETs racing a write in the batch are dropped too
+            await self.cache.invalidate(*dict.fromkeys(cache_invalidations))
+        return results
     
     # Management methods
     def get_circuit_state(self, target_service: str) -> str:
@@ -353,9 +946,72 @@ class ServiceClient:
         circuit.failure_count = 0
         circuit.success_count = 0
     
-    def clear_cache(self, target_service: Optional[str] = None):
+    async def clear_cache(self, target_service: Optional[str] = None):
         """Clear local cache"""
-        self.cache.clear(target_service)
+        await self.cache.clear(target_service)
+    
+    async def invalidate_cache_tags(self, *tags: str) -> int:
+        """Drop cached responses stored with any of the tags; returns the number removed"""
+        return await self.cache.invalidate_tags(tags)
+    
+    async def warm_cache(
+        self,
+        keys: Iterable[Union[WarmKey, Tuple]] = (),
+        manifest: Optional[str] = None,
+        concurrency: Optional[int] = None
+    ) -> Dict[str, int]:
+        """
+        Prefetch GET responses into the cache, e.g. after a deploy and before
+        reporting ready. keys are WarmKey or (service, endpoint[, params])
+        tuples; manifest is a file written by export_hot_keys(). Entries
+        already in a shared tier are only promoted into the local ones.
+        Failures are counted and reported, not raised. Raises
+        InvalidConfigurationError when there is no cache tier to warm.
+        """
+        if not self.cache.has_storage:
+            raise InvalidConfigurationError(
+                "cache", "no storage tier", "Warming needs caching enabled with Redis, l1_enabled or disk_cache_path"
+            )
+        warm_keys = [key if isinstance(key, WarmKey) else WarmKey(
+            service=key[0], endpoint=key[1], params=key[2] if len(key) > 2 and key[2] else {}
+        ) for key in keys]
+        if manifest:
+            warm_keys.extend(load_manifest(manifest))
+        # One request per cache key, however often it is listed
+        unique_keys = {
+            self.cache._generate_key(key.service, key.endpoint, "GET", key.params): key for key in warm_keys
+        }
+        
+        semaphore = asyncio.Semaphore(concurrency or self.config.warm_concurrency)
+        summary = {"warmed": 0, "failed": 0}
+        
+        async def warm(key: WarmKey):
+            async with semaphore:
+                try:
+                    await self.get(key.service, key.endpoint, params=key.params or None)
+                    summary["warmed"] += 1
+                except Exception as e:
+                    summary["failed"] += 1
+                    print(f"Warning: Could not warm cache for {key.service}{key.endpoint}: {e}")
+        
+        await asyncio.gather(*(warm(key) for key in unique_keys.values()))
+        return summary
+    
+    def export_hot_keys(self, path: Optional[str] = None, limit: Optional[int] = None) -> List[WarmKey]:
+        """
+        The most read cacheable GETs seen by this client, hottest first.
+        With path, they are also written as a manifest for warm_cache().
+        """
+        keys = self.hot_keys.hottest(limit) if self.hot_keys is not None else []
+        if path:
+            save_manifest(keys, path)
+        return keys
+    
+    def get_connection_pool_stats(self) -> Dict[str, int]:
+        """Gateway connections in use, idle and waited for"""
+        if self.transport is None:
+            return {"in_use": 0, "idle": 0, "waiting": 0}
+        return self.transport.pool_stats()
     
     def get_metrics(self) -> Dict[str, Any]:
         """Get client metrics"""
@@ -376,10 +1032,16 @@ class ServiceClient:
     async def _check_gateway_health(self) -> bool:
         """Perform actual Gateway health check"""
         try:
-            health_url = f"{self.config.gateway_url.rstrip('/')}/health"
+            health_url = f"{self.gateway_url}/health"
             timeout = aiohttp.ClientTimeout(total=5)
             
-            async with aiohttp.ClientSession(timeout=timeout) as session:
+            if self.transport is not None:
+                # Use the pooled transport, so the connection is kept for requests
+                async with self.transport.request("GET", health_url, timeout=5) as response:
+                    await response.read()
+                    return response.status == 200
+            connector = aiohttp.UnixConnector(path=self.gateway_socket_path) if self.gateway_socket_path else None
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
                 async with session.get(health_url) as response:
                     return response.status == 200
         except Exception:
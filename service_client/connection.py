@@ -0,0 +1,71 @@
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+from pydantic import BaseModel, Field
+
+from .exceptions import InvalidConfigurationError
+
+UNIX_SCHEME = "unix://"
+# Base URL for requests sent over a Unix socket; the host only fills the Host header
+UNIX_BASE_URL = "http://localhost"
+
+
+class ConnectionPoolConfig(BaseModel):
+    limit: int = Field(default=100, description="Maximum open connections to the gateway, 0 for no limit")
+    limit_per_host: int = Field(default=0, description="Maximum open connections per host, 0 for no limit")
+    keepalive_timeout: float = Field(default=15.0, description="Seconds an idle connection is kept open for reuse")
+    dns_cache_ttl: Optional[int] = Field(default=10, description="Seconds resolved addresses are cached, None to cache forever")
+    happy_eyeballs_delay: Optional[float] = Field(default=0.25, description="Seconds before racing the next address family (RFC 8305), None to connect sequentially")
+    warmup_connections: int = Field(default=0, description="Keep-alive connections opened to the gateway during start(), through concurrent health checks")
+
+
+def create_connector(config: ConnectionPoolConfig) -> aiohttp.TCPConnector:
+    """TCP connector for the gateway session, pooled and kept alive as configured"""
+    return aiohttp.TCPConnector(
+        limit=config.limit,
+        limit_per_host=config.limit_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+        ttl_dns_cache=config.dns_cache_ttl,
+        happy_eyeballs_delay=config.happy_eyeballs_delay,
+    )
+
+
+def create_unix_connector(config: ConnectionPoolConfig, socket_path: str) -> aiohttp.UnixConnector:
+    """Connector for a gateway listening on a Unix domain socket, pooled like the TCP one"""
+    return aiohttp.UnixConnector(
+        path=socket_path,
+        limit=config.limit,
+        limit_per_host=config.limit_per_host,
+        keepalive_timeout=config.keepalive_timeout,
+    )
+
+
+def split_gateway_url(gateway_url: str) -> Tuple[str, Optional[str]]:
+    """
+    Base URL for gateway requests and the Unix socket to send them over.
+    unix:///run/gateway.sock gives ("http://localhost", "/run/gateway.sock"),
+    any other URL is returned as is with no socket.
+    """
+    if not gateway_url.startswith(UNIX_SCHEME):
+        return gateway_url.rstrip('/'), None
+    socket_path = gateway_url[len(UNIX_SCHEME):]
+    if not socket_path.startswith('/'):
+        raise InvalidConfigurationError(
+            "gateway_url", gateway_url, "Unix gateway URLs take an absolute socket path, e.g. unix:///run/gateway.sock"
+        )
+    return UNIX_BASE_URL, socket_path
+
+
+def connection_pool_stats(connector: Optional[aiohttp.BaseConnector]) -> Dict[str, int]:
+    """
+    Connections in use, idle in the pool, and requests waiting for a free
+    connection. Reads aiohttp's pool bookkeeping, which it does not expose
+    publicly.
+    """
+    if connector is None or connector.closed:
+        return {"in_use": 0, "idle": 0, "waiting": 0}
+    return {
+        "in_use": len(getattr(connector, "_acquired", ())),
+        "idle": sum(len(conns) for conns in getattr(connector, "_conns", {}).values()),
+        "waiting": sum(len(waiters) for waiters in getattr(connector, "_waiters", {}).values()),
+    }
@@ -57,10 +57,11 @@ class InvalidConfigurationError(ServiceClientError):
 
 class GatewayErrorResponse(ServiceClientError):
     """Gateway-specific error response"""
-    def __init__(self, error_type: str, message: str, correlation_id: str = None):
+    def __init__(self, error_type: str, message: str, correlation_id: str = None, error_code: int = None):
         self.error_type = error_type
+        self.message = message
         self.correlation_id = correlation_id
         error_message = f"{error_type}: {message}"
         if correlation_id:
             error_message += f" (correlation_id: {correlation_id})"
-        super().__init__(error_message)
\ No newline at end of file
+        super().__init__(error_message, error_code=error_code)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import functools
+import re
+from typing import List, Optional, Pattern
+
+from pydantic import BaseModel, Field
+
+from .cache import CacheInvalidation
+
+_PLACEHOLDER = re.compile(r"\{(\w+)\}")
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_pattern(pattern: str) -> Pattern:
+    """
+    Turn an endpoint pattern into a regex: {name} matches one path segment
+    and a trailing * matches the rest of the path
+    """
+    wildcard = pattern.endswith("*")
+    if wildcard:
+        pattern = pattern[:-1]
+    regex, position = "", 0
+    for placeholder in _PLACEHOLDER.finditer(pattern):
+        regex += re.escape(pattern[position:placeholder.start()]) + f"(?P<{placeholder.group(1)}>[^/]+)"
+        position = placeholder.end()
+    regex += re.escape(pattern[position:]) + (".*" if wildcard else "")
+    return re.compile(regex)
+
+
+class InvalidationRule(BaseModel):
+    """
+    Cached GETs made outdated by a successful mutating call.
+
+    endpoint is matched against the mutating call's endpoint; values of its
+    {placeholders} are substituted into the targets. A target ending in *
+    invalidates every endpoint with that prefix, otherwise only the exact
+    endpoint (with any params). Example:
+
+        InvalidationRule(
+            service="user-service",
+            endpoint="/users/{id}",
+            invalidates=["/users/{id}", "/users"],
+            tags=["user:{id}"],
+        )
+    """
+    service: str = Field(..., description="Target service of the mutating call")
+    endpoint: str = Field(..., description="Endpoint pattern of the mutating call, e.g. /users/{id}")
+    methods: List[str] = Field(default_factory=lambda: ["POST", "PUT", "PATCH", "DELETE"])
+    invalidates: List[str] = Field(default_factory=list, description="GET endpoints or prefixes (ending in *) to invalidate")
+    tags: List[str] = Field(default_factory=list, description="Cache tags to invalidate")
+    cache_service: Optional[str] = Field(default=None, description="Service owning the cached GETs, defaults to service")
+
+    def invalidations_for(self, service: str, method: str, endpoint: str) -> List[CacheInvalidation]:
+        """The invalidations this rule requires for a call, empty if it does not apply"""
+        if service != self.service or method.upper() not in self.methods:
+            return []
+        match = _compile_pattern(self.endpoint).fullmatch(endpoint)
+        if match is None:
+            return []
+
+        values = match.groupdict()
+        cache_service = self.cache_service or self.service
+        invalidations = []
+        try:
+            for target in self.invalidates:
+                target = target.format(**values)
+                if target.endswith("*"):
+                    invalidations.append(CacheInvalidation(service=cache_service, endpoint_prefix=target[:-1]))
+                else:
+                    invalidations.append(CacheInvalidation(service=cache_service, endpoint=target))
+            invalidations.extend(CacheInvalidation(tag=tag.format(**values)) for tag in self.tags)
+        except (KeyError, IndexError) as e:
+            print(f"Warning: Invalidation rule for {self.service}{self.endpoint} uses unknown placeholder {e}")
+        return invalidations
@@ -1,5 +1,6 @@
 import time
-from typing import Dict, Any, List
+import weakref
+from typing import Callable, Dict, Any, List, Optional
 from datetime import datetime
 from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, generate_latest
 
@@ -35,6 +36,74 @@ cache_misses = Counter(
     ['service', 'target_service']
 )
 
+cache_stale_hits = Counter(
+    'service_client_cache_stale_hits_total',
+    'Total cache hits served from stale entries while refreshing',
+    ['service', 'target_service']
+)
+
+cache_negative_hits = Counter(
+    'service_client_cache_negative_hits_total',
+    'Cache hits replaying a cached not-found error or empty result',
+    ['service', 'target_service']
+)
+
+l1_cache_hits = Counter(
+    'service_client_l1_cache_hits_total',
+    'Total in-process (L1) cache hits',
+    ['service', 'target_service']
+)
+
+l1_cache_misses = Counter(
+    'service_client_l1_cache_misses_total',
+    'Total in-process (L1) cache misses',
+    ['service', 'target_service']
+)
+
+coalesced_requests = Counter(
+    'service_client_coalesced_requests_total',
+    'Requests served by awaiting an identical in-flight request',
+    ['service', 'target_service']
+)
+
+cache_revalidations = Counter(
+    'service_client_cache_revalidations_total',
+    'Conditional requests for expired cache entries',
+    ['service', 'target_service', 'result']
+)
+
+cache_operations = Counter(
+    'service_client_cache_operations_total',
+    'Cache lookups, writes, capacity evictions and invalidated entries, counted by the cache',
+    ['service', 'target_service', 'operation']
+)
+
+cache_bytes = Counter(
+    'service_client_cache_bytes_total',
+    'Encoded bytes read from and written to the cache',
+    ['service', 'target_service', 'direction']
+)
+
+cache_serialization_duration = Histogram(
+    'service_client_cache_serialization_seconds',
+    'Time spent encoding and decoding cache entries',
+    ['service', 'target_service', 'operation'],
+    buckets=[0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05]
+)
+
+cache_redis_duration = Histogram(
+    'service_client_cache_redis_duration_seconds',
+    'Redis round-trip time of cache reads and writes',
+    ['service', 'target_service', 'operation'],
+    buckets=[0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5]
+)
+
+connection_pool = Gauge(
+    'service_client_connections',
+    'Gateway connections in use, idle in the pool, and requests waiting for one',
+    ['service', 'state']
+)
+
 retries_total = Counter(
     'service_client_retries_total',
     'Total retry attempts',
@@ -42,6 +111,13 @@ retries_total = Counter(
 )
 
 
+def _pool_state(collector_ref: "weakref.ref", state: str) -> int:
+    """Gauge callback; held by the global registry, so it only references the collector weakly"""
+    collector = collector_ref()
+    pool_stats = collector._read_pool_stats() if collector is not None else None
+    return pool_stats[state] if pool_stats else 0
+
+
 class MetricsCollector:
     def __init__(self, service_name: str):
         self.service_name = service_name
@@ -54,9 +130,18 @@ class MetricsCollector:
             "circuit_opens": 0,
             "cache_hits": 0,
             "cache_misses": 0,
+            "cache_stale_hits": 0,
+            "cache_negative_hits": 0,
+            "l1_cache_hits": 0,
+            "l1_cache_misses": 0,
+            "requests_coalesced": 0,
+            "cache_revalidations": 0,
+            "cache_not_modified": 0,
             "retries_total": 0,
         }
         self._latencies: List[float] = []
+        # Weak reference to the registered pool_stats callable
+        self._pool_stats: Optional[Callable[[], Optional[Callable[[], Dict[str, int]]]]] = None
 
     def record_request(self, target_service: str, endpoint: str, method: str = "GET"):
         """Record request attempt"""
@@ -135,6 +220,126 @@ class MetricsCollector:
             target_service=target_service
         ).inc()
 
+    def record_stale_hit(self, target_service: str):
+        """Record cache hit served from a stale entry"""
+        self._metrics["cache_stale_hits"] += 1
+        
+        # Record Prometheus metrics
+        cache_stale_hits.labels(
+            service=self.service_name,
+            target_service=target_service
+        ).inc()
+
+    def record_negative_hit(self, target_service: str):
+        """Record cache hit replaying a negative entry"""
+        self._metrics["cache_negative_hits"] += 1
+        
+        # Record Prometheus metrics
+        cache_negative_hits.labels(
+            service=self.service_name,
+            target_service=target_service
+        ).inc()
+
+    def record_l1_cache_hit(self, target_service: str):
+        """Record in-process (L1) cache hit"""
+        self._metrics["l1_cache_hits"] += 1
+        
+        # Record Prometheus metrics
+        l1_cache_hits.labels(
+            service=self.service_name,
+            target_service=target_service
+        ).inc()
+
+    def record_l1_cache_miss(self, target_service: str):
+        """Record in-process (L1) cache miss"""
+        self._metrics["l1_cache_misses"] += 1
+        
+        # Record Prometheus metrics
+        l1_cache_misses.labels(
+            service=self.service_name,
+            target_service=target_service
+        ).inc()
+
+    def record_coalesced_request(self, target_service: str):
+        """Record a request that shared another caller's in-flight request"""
+        self._metrics["requests_coalesced"] += 1
+        
+        # Record Prometheus metrics
+        coalesced_requests.labels(
+            service=self.service_name,
+            target_service=target_service
+        ).inc()
+
+    def record_revalidation(self, target_service: str, not_modified: bool):
+        """Record a conditional request and whether the entry was still current"""
+        self._metrics["cache_revalidations"] += 1
+        if not_modified:
+            self._metrics["cache_not_modified"] += 1
+        
+        # Record Prometheus metrics
+        cache_revalidations.labels(
+            service=self.service_name,
+            target_service=target_service,
+            result="not_modified" if not_modified else "modified"
+        ).inc()
+
+    def record_cache_operation(self, target_service: str, operation: str, count: int = 1):
+        """Record cache lookups (hit, stale_hit, negative_hit, miss), writes (set), evictions or invalidations"""
+        cache_operations.labels(
+            service=self.service_name,
+            target_service=target_service,
+            operation=operation
+        ).inc(count)
+
+    def record_cache_bytes(self, target_service: str, direction: str, size: int):
+        """Record encoded bytes read from or written to the cache"""
+        cache_bytes.labels(
+            service=self.service_name,
+            target_service=target_service,
+            direction=direction
+        ).inc(size)
+
+    def record_cache_serialization(self, target_service: str, operation: str, duration: float):
+        """Record time spent encoding or decoding a cache entry"""
+        cache_serialization_duration.labels(
+            service=self.service_name,
+            target_service=target_service,
+            operation=operation
+        ).observe(duration)
+
+    def record_cache_redis_latency(self, target_service: str, operation: str, duration: float):
+        """Record the duration of a Redis cache command"""
+        cache_redis_duration.labels(
+            service=self.service_name,
+            target_service=target_service,
+            operation=operation
+        ).observe(duration)
+
+    def register_connection_pool(self, pool_stats: Callable[[], Dict[str, int]]):
+        """
+        Report the gateway connection pool; pool_stats is read whenever metrics
+        are collected. It is held weakly, so registering a client's method does
+        not keep the client alive.
+        """
+        if hasattr(pool_stats, "__self__"):
+            self._pool_stats = weakref.WeakMethod(pool_stats)
+        else:
+            self._pool_stats = weakref.ref(pool_stats)
+        collector_ref = weakref.ref(self)
+        for state in ("in_use", "idle", "waiting"):
+            connection_pool.labels(
+                service=self.service_name,
+                state=state
+            ).set_function(lambda state=state: _pool_state(collector_ref, state))
+
+    def unregister_connection_pool(self):
+        """Stop reading the connection pool; its series drop to zero"""
+        self._pool_stats = None
+
+    def _read_pool_stats(self) -> Optional[Dict[str, int]]:
+        pool_stats = self._pool_stats() if self._pool_stats is not None else None
+        return pool_stats() if pool_stats is not None else None
+
     def record_retry(self, target_service: str):
         """Record retry attempt"""
         self._metrics["retries_total"] += 1
@@ -172,6 +377,17 @@ class MetricsCollector:
                 (self._metrics["cache_hits"] + self._metrics["cache_misses"])
             )
         
+        if self._metrics["l1_cache_hits"] + self._metrics["l1_cache_misses"] > 0:
+            metrics["l1_cache_hit_rate"] = (
+                self._metrics["l1_cache_hits"] / 
+                (self._metrics["l1_cache_hits"] + self._metrics["l1_cache_misses"])
+            )
+        
+        pool_stats = self._read_pool_stats()
+        if pool_stats:
+            for state, count in pool_stats.items():
+                metrics[f"connections_{state}"] = count
+        
         return metrics
 
     def get_prometheus_metrics(self) -> str:
@@ -190,5 +406,12 @@ class MetricsCollector:
             "circuit_opens": 0,
             "cache_hits": 0,
             "cache_misses": 0,
+            "cache_stale_hits": 0,
+            "cache_negative_hits": 0,
+            "l1_cache_hits": 0,
+            "l1_cache_misses": 0,
+            "requests_coalesced": 0,
+            "cache_revalidations": 0,
+            "cache_not_modified": 0,
             "retries_total": 0,
         })
\ No newline at end of file
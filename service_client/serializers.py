@@ -0,0 +1,231 @@
+import json
+import zlib
+from enum import Enum
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+# Body formats recorded in each cache entry. json and orjson produce the same
+# format, so instances with and without orjson installed can share a cache.
+FORMAT_JSON = 1
+FORMAT_MSGPACK = 2
+
+# Compression codecs, recorded in the first byte of each cache entry
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+COMPRESSION_LZ4 = 3
+
+
+class SerializerType(str, Enum):
+    JSON = "json"
+    ORJSON = "orjson"
+    MSGPACK = "msgpack"
+
+
+class Serializer:
+    """Encodes cache payloads to bytes and back"""
+    format_id: int = FORMAT_JSON
+    name: str = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    """Standard library json, always available"""
+    format_id = FORMAT_JSON
+    name = SerializerType.JSON.value
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    """orjson, several times faster than json for large payloads"""
+    format_id = FORMAT_JSON
+    name = SerializerType.ORJSON.value
+
+    def dumps(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackSerializer(Serializer):
+    """msgpack, a compact binary encoding"""
+    format_id = FORMAT_MSGPACK
+    name = SerializerType.MSGPACK.value
+
+    def dumps(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+_SERIALIZERS: Dict[SerializerType, Callable[[], Serializer]] = {
+    SerializerType.JSON: JsonSerializer,
+    SerializerType.ORJSON: OrjsonSerializer,
+    SerializerType.MSGPACK: MsgpackSerializer,
+}
+
+_AVAILABLE = {
+    SerializerType.JSON: True,
+    SerializerType.ORJSON: orjson is not None,
+    SerializerType.MSGPACK: msgpack is not None,
+}
+
+
+def get_serializer(serializer_type: SerializerType) -> Serializer:
+    """Return the requested serializer, falling back to stdlib json if it is not installed"""
+    serializer_type = SerializerType(serializer_type)
+    if not _AVAILABLE[serializer_type]:
+        print(f"Warning: {serializer_type.value} is not installed. Falling back to json serialization.")
+        serializer_type = SerializerType.JSON
+    return _SERIALIZERS[serializer_type]()
+
+
+def fastest_json_loads() -> Callable[[Any], Any]:
+    """The fastest available JSON decoder, used to parse gateway responses"""
+    return orjson.loads if orjson is not None else json.loads
+
+
+def loads_for_format(format_id: int) -> Callable[[bytes], Any]:
+    """Decoder for a body format read back from the cache"""
+    if format_id == FORMAT_JSON:
+        return fastest_json_loads()
+    if format_id == FORMAT_MSGPACK:
+        if msgpack is None:
+            raise ValueError("msgpack is not installed")
+        return MsgpackSerializer().loads
+    raise ValueError(f"Unknown cache body format {format_id}")
+
+
+class CompressionType(str, Enum):
+    NONE = "none"
+    ZLIB = "zlib"
+    ZSTD = "zstd"
+    LZ4 = "lz4"
+
+
+class Compressor:
+    """Compresses serialized cache bodies"""
+    codec_id: int = COMPRESSION_NONE
+    name: str = "none"
+
+    def compress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decompress(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class ZlibCompressor(Compressor):
+    """zlib, always available"""
+    codec_id = COMPRESSION_ZLIB
+    name = CompressionType.ZLIB.value
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class ZstdCompressor(Compressor):
+    """zstd, better ratio than zlib at a similar speed"""
+    codec_id = COMPRESSION_ZSTD
+    name = CompressionType.ZSTD.value
+
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor()
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    """lz4, the fastest codec with a lower ratio"""
+    codec_id = COMPRESSION_LZ4
+    name = CompressionType.LZ4.value
+
+    def compress(self, data: bytes) -> bytes:
+        return lz4_frame.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return lz4_frame.decompress(data)
+
+
+_COMPRESSORS: Dict[CompressionType, Callable[[], Compressor]] = {
+    CompressionType.ZLIB: ZlibCompressor,
+    CompressionType.ZSTD: ZstdCompressor,
+    CompressionType.LZ4: Lz4Compressor,
+}
+
+_COMPRESSOR_AVAILABLE = {
+    CompressionType.ZLIB: True,
+    CompressionType.ZSTD: zstandard is not None,
+    CompressionType.LZ4: lz4_frame is not None,
+}
+
+_COMPRESSOR_BY_ID: Dict[int, Compressor] = {}
+
+
+def get_compressor(compression_type: CompressionType) -> Optional[Compressor]:
+    """Return the requested compressor, falling back to zlib if it is not installed"""
+    compression_type = CompressionType(compression_type)
+    if compression_type == CompressionType.NONE:
+        return None
+    if not _COMPRESSOR_AVAILABLE[compression_type]:
+        print(f"Warning: {compression_type.value} is not installed. Falling back to zlib compression.")
+        compression_type = CompressionType.ZLIB
+    return _COMPRESSORS[compression_type]()
+
+
+def decompress_for_codec(codec_id: int, data: bytes) -> bytes:
+    """Undo the compression recorded in a cache entry's header"""
+    if codec_id == COMPRESSION_NONE:
+        return data
+    compressor = _COMPRESSOR_BY_ID.get(codec_id)
+    if compressor is None:
+        for compression_type, factory in _COMPRESSORS.items():
+            if _COMPRESSOR_AVAILABLE[compression_type] and factory.codec_id == codec_id:
+                compressor = _COMPRESSOR_BY_ID[codec_id] = factory()
+                break
+        else:
+            raise ValueError(f"Compression codec {codec_id} is not available")
+    try:
+        return compressor.decompress(data)
+    except Exception as e:
+        # zlib, zstd and lz4 each raise their own error types
+        raise ValueError(f"Could not decompress cache entry: {e}") from e
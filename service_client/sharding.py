@@ -0,0 +1,256 @@
+import asyncio
+import bisect
+import hashlib
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+
+# Errors that mean a node is unreachable rather than that a command was wrong
+_NODE_FAILURES = (redis.exceptions.ConnectionError, redis.exceptions.TimeoutError)
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def aggregate_info(info: Dict) -> Dict:
+    """
+    Sum the INFO fields used for cache stats over several nodes. Accepts a
+    single node's INFO or a mapping of node name to INFO, as returned by
+    Redis Cluster.
+    """
+    infos = [info] if "used_memory" in info else [node_info for node_info in info.values() if isinstance(node_info, dict)]
+    return {
+        "db0": {"keys": sum(node_info.get("db0", {}).get("keys", 0) for node_info in infos)},
+        "used_memory": sum(node_info.get("used_memory", 0) for node_info in infos),
+        "keyspace_hits": sum(node_info.get("keyspace_hits", 0) for node_info in infos),
+        "keyspace_misses": sum(node_info.get("keyspace_misses", 0) for node_info in infos),
+    }
+
+
+class HashRing:
+    """
+    Consistent hash ring with virtual nodes. Adding or removing one of N
+    nodes moves roughly 1/N of the keys.
+    """
+    def __init__(self, nodes: List[str], virtual_nodes: int = 160):
+        self.nodes = list(nodes)
+        self.virtual_nodes = virtual_nodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        ring = sorted(
+            (_ring_hash(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(virtual_nodes)
+        )
+        for point, node in ring:
+            self._points.append(point)
+            self._owners.append(node)
+
+    def get_node(self, key: str) -> str:
+        """The node owning key: the first ring point clockwise of its hash"""
+        index = bisect.bisect(self._points, _ring_hash(key)) % len(self._points)
+        return self._owners[index]
+
+
+class ShardedRedis:
+    """
+    Spreads cache keys over several Redis nodes by consistent hashing.
+
+    Implements the subset of the ``redis.asyncio.Redis`` interface that
+    ``AsyncLocalCache`` uses, routing every command by its first key. A node
+    that fails is reported and treated as holding nothing: reads from it
+    are misses and writes to it are dropped, while other nodes keep serving.
+
+    Each node's connections time out after socket_timeout (and
+    socket_connect_timeout while connecting), so an unresponsive node costs
+    at most that long. A node that times out or refuses connections is then
+    skipped without being contacted for cooldown seconds.
+    """
+    def __init__(
+        self,
+        urls: List[str],
+        max_connections: int = 50,
+        virtual_nodes: int = 160,
+        socket_timeout: Optional[float] = None,
+        socket_connect_timeout: Optional[float] = None,
+        cooldown: float = 10.0
+    ):
+        self.ring = HashRing(urls, virtual_nodes)
+        self.clients: Dict[str, aioredis.Redis] = {
+            url: aioredis.Redis.from_url(
+                url,
+                max_connections=max_connections,
+                socket_timeout=socket_timeout,
+                socket_connect_timeout=socket_connect_timeout
+            )
+            for url in urls
+        }
+        self.cooldown = cooldown
+        # node -> monotonic time until which it is skipped
+        self._down_until: Dict[str, float] = {}
+
+    def node_for(self, key: Any) -> str:
+        return self.ring.get_node(key.decode() if isinstance(key, bytes) else key)
+
+    def is_up(self, node: str) -> bool:
+        """Whether node may be contacted, i.e. it is not within a cool-down after failing"""
+        down_until = self._down_until.get(node)
+        if down_until is None:
+            return True
+        if time.monotonic() >= down_until:
+            del self._down_until[node]
+            return True
+        return False
+
+    def _record_failure(self, node: str, error: BaseException):
+        if isinstance(error, _NODE_FAILURES):
+            self._down_until[node] = time.monotonic() + self.cooldown
+
+    async def _run(self, key: Any, command: str, *args, **kwargs) -> Any:
+        """Run a single-key command on the node owning key"""
+        node = self.node_for(key)
+        if not self.is_up(node):
+            raise redis.exceptions.ConnectionError(f"Redis shard {node} is marked down after a failure")
+        try:
+            return await getattr(self.clients[node], command)(key, *args, **kwargs)
+        except _NODE_FAILURES as e:
+            self._record_failure(node, e)
+            raise
+
+    @property
+    def primary(self) -> aioredis.Redis:
+        """Node that carries non-key traffic such as pub/sub"""
+        return self.clients[self.ring.nodes[0]]
+
+    async def ping(self) -> bool:
+        """Succeeds while at least one node is reachable"""
+        results = await asyncio.gather(*(client.ping() for client in self.clients.values()), return_exceptions=True)
+        for url, result in zip(self.clients, results):
+            if isinstance(result, Exception):
+                print(f"Warning: Redis shard {url} is unreachable: {result}. Its keys will be cache misses.")
+                self._record_failure(url, result)
+        if all(isinstance(result, Exception) for result in results):
+            raise redis.exceptions.ConnectionError("No Redis shard is reachable")
+        return True
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """The value of key; None while its node is down"""
+        if not self.is_up(self.node_for(key)):
+            return None
+        return await self._run(key, "get")
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        """One MGET per node, issued concurrently; keys on failed nodes read as None"""
+        by_node: Dict[str, List[int]] = {}
+        for index, key in enumerate(keys):
+            by_node.setdefault(self.ring.get_node(key), []).append(index)
+
+        values: List[Optional[bytes]] = [None] * len(keys)
+        nodes = [node for node in by_node if self.is_up(node)]
+        results = await asyncio.gather(
+            *(self.clients[node].mget([keys[index] for index in by_node[node]]) for node in nodes),
+            return_exceptions=True
+        )
+        for node, result in zip(nodes, results):
+            if isinstance(result, redis.exceptions.RedisError):
+                print(f"Warning: Could not read from Redis shard {node}: {result}")
+                self._record_failure(node, result)
+                continue
+            if isinstance(result, BaseException):
+                raise result
+            for index, value in zip(by_node[node], result):
+                values[index] = value
+        return values
+
+    def pipeline(self, transaction: bool = False) -> "_ShardedPipeline":
+        return _ShardedPipeline(self)
+
+    async def smembers(self, key: str):
+        return await self._run(key, "smembers")
+
+    async def srem(self, key: str, *members: str) -> int:
+        return await self._run(key, "srem", *members)
+
+    async def zrange(self, key: str, start: int, end: int):
+        return await self._run(key, "zrange", start, end)
+
+    async def zrangebylex(self, key: str, low: bytes, high: bytes, **kwargs):
+        return await self._run(key, "zrangebylex", low, high, **kwargs)
+
+    async def zrem(self, key: str, *members) -> int:
+        return await self._run(key, "zrem", *members)
+
+    async def delete(self, *keys: str) -> int:
+        results = await asyncio.gather(*(self._run(key, "delete") for key in keys))
+        return sum(results)
+
+    async def publish(self, channel: str, message: str) -> int:
+        return await self.primary.publish(channel, message)
+
+    def pubsub(self):
+        return self.primary.pubsub()
+
+    async def info(self) -> Dict:
+        results = await asyncio.gather(*(client.info() for client in self.clients.values()), return_exceptions=True)
+        return aggregate_info({
+            url: result for url, result in zip(self.clients, results) if isinstance(result, dict)
+        })
+
+    async def aclose(self):
+        for client in self.clients.values():
+            await client.aclose()
+
+
+class _ShardedPipeline:
+    """
+    Queues commands, then runs one pipeline per node concurrently. Results
+    come back in queue order; commands on a failed or down node return None.
+    """
+    def __init__(self, sharded: ShardedRedis):
+        self._sharded = sharded
+        self._commands: List[Tuple[str, str, tuple, dict]] = []
+
+    async def __aenter__(self) -> "_ShardedPipeline":
+        return self
+
+    async def __aexit__(self, *exc_info) -> bool:
+        self._commands.clear()
+        return False
+
+    def __getattr__(self, name: str):
+        def queue(key, *args, **kwargs):
+            node = self._sharded.node_for(key)
+            self._commands.append((node, name, (key, *args), kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        by_node: Dict[str, List[int]] = {}
+        for index, (node, _, _, _) in enumerate(self._commands):
+            by_node.setdefault(node, []).append(index)
+
+        async def run(node: str) -> List[Any]:
+            async with self._sharded.clients[node].pipeline(transaction=False) as pipe:
+                for index in by_node[node]:
+                    _, name, args, kwargs = self._commands[index]
+                    getattr(pipe, name)(*args, **kwargs)
+                return await pipe.execute()
+
+        results: List[Any] = [None] * len(self._commands)
+        nodes = [node for node in by_node if self._sharded.is_up(node)]
+        outcomes = await asyncio.gather(*(run(node) for node in nodes), return_exceptions=True)
+        for node, outcome in zip(nodes, outcomes):
+            if isinstance(outcome, redis.exceptions.RedisError):
+                print(f"Warning: Could not write to Redis shard {node}: {outcome}")
+                self._sharded._record_failure(node, outcome)
+                continue
+            if isinstance(outcome, BaseException):
+                raise outcome
+            for index, value in zip(by_node[node], outcome):
+                results[index] = value
+        self._commands.clear()
+        return results
@@ -0,0 +1,295 @@
+import abc
+import asyncio
+import contextlib
+import json as jsonlib
+from collections import deque
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+from .connection import ConnectionPoolConfig, create_connector, create_unix_connector, connection_pool_stats
+from .exceptions import InvalidConfigurationError
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import h2
+except ImportError:
+    h2 = None
+
+
+class TransportType(str, Enum):
+    AIOHTTP = "aiohttp"
+    HTTP2 = "http2"
+    UNIX = "unix"
+
+
+class Transport(abc.ABC):
+    """
+    Sends requests to the gateway.
+
+    request() is an async context manager yielding a response with status,
+    headers, and awaitable read(), json() and text(): the part of
+    aiohttp.ClientResponse that ServiceClient uses.
+    """
+    name: str = "transport"
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        pass
+
+    @abc.abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        json: Any = None,
+        params: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ):
+        """An async context manager yielding the response"""
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Connections in use, idle and waited for"""
+        return {"in_use": 0, "idle": 0, "waiting": 0}
+
+
+class AiohttpTransport(Transport):
+    """HTTP/1.1 over a pooled aiohttp session, the default"""
+    name = TransportType.AIOHTTP.value
+
+    def __init__(
+        self,
+        session: Optional[aiohttp.ClientSession] = None,
+        pool: Optional[ConnectionPoolConfig] = None,
+        timeout: float = 30
+    ):
+        self.session = session
+        self.pool = pool or ConnectionPoolConfig()
+        self.timeout = timeout
+
+    async def start(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=self._create_connector(),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+    def _create_connector(self) -> aiohttp.BaseConnector:
+        return create_connector(self.pool)
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def request(self, method, url, json=None, params=None, headers=None, timeout=None):
+        return self.session.request(method=method, url=url, json=json, params=params, headers=headers, timeout=timeout)
+
+    def pool_stats(self) -> Dict[str, int]:
+        return connection_pool_stats(self.session.connector if self.session is not None else None)
+
+
+class UnixSocketTransport(AiohttpTransport):
+    """
+    HTTP/1.1 over a Unix domain socket, for a gateway running as a sidecar
+    in the same pod. Skips the TCP loopback stack; the host in request URLs
+    is only sent as the Host header.
+    """
+    name = TransportType.UNIX.value
+
+    def __init__(self, socket_path: str, pool: Optional[ConnectionPoolConfig] = None, timeout: float = 30):
+        super().__init__(pool=pool, timeout=timeout)
+        self.socket_path = socket_path
+
+    def _create_connector(self) -> aiohttp.BaseConnector:
+        return create_unix_connector(self.pool, self.socket_path)
+
+
+class _BufferedResponse:
+    """A fully read response, exposing the aiohttp response interface"""
+    __slots__ = ("status", "headers", "_body")
+
+    def __init__(self, status: int, headers, body: bytes):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def text(self) -> str:
+        return self._body.decode("utf-8", errors="replace")
+
+    async def json(self, loads: Callable[[Any], Any] = jsonlib.loads) -> Any:
+        return loads(self._body) if self._body.strip() else None
+
+
+class Http2Transport(Transport):
+    """
+    HTTP/2 through httpx, multiplexing concurrent requests as streams over a
+    few connections instead of one socket per in-flight request. https://
+    gateways negotiate h2 through ALPN, falling back to HTTP/1.1 if they do
+    not offer it; with prior_knowledge, plain http:// gateways are spoken to
+    in h2c from the first byte. Requires the http2 extra (httpx and h2).
+    """
+    name = TransportType.HTTP2.value
+
+    def __init__(
+        self,
+        pool: Optional[ConnectionPoolConfig] = None,
+        timeout: float = 30,
+        prior_knowledge: bool = False
+    ):
+        self.pool = pool or ConnectionPoolConfig()
+        self.timeout = timeout
+        self.prior_knowledge = prior_knowledge
+        self.client: Optional["httpx.AsyncClient"] = None
+
+    async def start(self):
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                # Disabling HTTP/1.1 is what makes httpx use h2c, and it rules out the ALPN fallback
+                http1=not self.prior_knowledge,
+                http2=True,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.pool.limit or None,
+                    keepalive_expiry=self.pool.keepalive_timeout
+                )
+            )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    @contextlib.asynccontextmanager
+    async def request(self, method, url, json=None, params=None, headers=None, timeout=None) -> AsyncIterator[_BufferedResponse]:
+        response = await self.client.request(
+            method,
+            url,
+            json=json,
+            params=params,
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+        )
+        yield _BufferedResponse(response.status_code, response.headers, response.content)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """
+        httpx has no public pool statistics, so they are read from httpcore's
+        pool, where a connection is in use while it carries any stream. Zeros
+        are reported if a release lays the pool out differently.
+        """
+        pool = getattr(getattr(self.client, "_transport", None), "_pool", None)
+        connections = getattr(pool, "connections", None)
+        if connections is None:
+            return super().pool_stats()
+        try:
+            idle = sum(1 for connection in connections if connection.is_idle())
+            waiting = sum(1 for request in getattr(pool, "_requests", ()) if request.is_queued())
+        except (AttributeError, TypeError):
+            return super().pool_stats()
+        return {"in_use": len(connections) - idle, "idle": idle, "waiting": waiting}
+
+
+class _ScriptedResponse:
+    __slots__ = ("status", "headers", "body", "latency", "error")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes, latency: float, error: Optional[BaseException]):
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.latency = latency
+        self.error = error
+
+
+class InMemoryTransport(Transport):
+    """
+    Answers requests from scripted responses without touching the network,
+    for tests and for benchmarking the client's own overhead.
+
+    Responses are queued per method and URL path with add_response(); each
+    request takes the next one, and the last is repeated once the queue is
+    down to it. Requests with nothing scripted get a 404. Every request is
+    recorded in requests as (method, path, params, json, headers).
+    """
+    name = "memory"
+
+    def __init__(self):
+        self._responses: Dict[Tuple[str, str], Deque[_ScriptedResponse]] = {}
+        self.requests: List[Tuple[str, str, Optional[Dict], Any, Optional[Dict[str, str]]]] = []
+
+    def add_response(
+        self,
+        path: str,
+        body: Any = None,
+        status: int = 200,
+        method: str = "GET",
+        headers: Optional[Dict[str, str]] = None,
+        latency: float = 0.0,
+        error: Optional[BaseException] = None
+    ):
+        """
+        Script the next response to method path. body is JSON-encoded unless
+        it is bytes; latency is awaited before answering; error is raised
+        instead of answering, e.g. asyncio.TimeoutError or
+        aiohttp.ClientConnectionError.
+        """
+        if not isinstance(body, bytes):
+            body = b"" if body is None else jsonlib.dumps(body).encode()
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        self._responses.setdefault((method.upper(), path), deque()).append(
+            _ScriptedResponse(status, headers, body, latency, error)
+        )
+
+    @contextlib.asynccontextmanager
+    async def request(self, method, url, json=None, params=None, headers=None, timeout=None) -> AsyncIterator[_BufferedResponse]:
+        path = urlsplit(url).path
+        self.requests.append((method.upper(), path, params, json, headers))
+        queue = self._responses.get((method.upper(), path))
+        if not queue:
+            yield _BufferedResponse(404, CIMultiDict(), b"Not Found")
+            return
+
+        scripted = queue.popleft() if len(queue) > 1 else queue[0]
+        if scripted.latency:
+            await asyncio.sleep(scripted.latency)
+        if scripted.error is not None:
+            raise scripted.error
+        yield _BufferedResponse(scripted.status, CIMultiDict(scripted.headers), scripted.body)
+
+
+def create_transport(
+    transport_type: TransportType,
+    pool: ConnectionPoolConfig,
+    timeout: float,
+    socket_path: Optional[str] = None,
+    gateway_url: Optional[str] = None
+) -> Transport:
+    """
+    Build the configured transport, falling back to aiohttp if HTTP/2 support
+    is not installed. HTTP/2 to an http:// gateway_url uses prior knowledge.
+    """
+    transport_type = TransportType(transport_type)
+    if transport_type == TransportType.UNIX:
+        if not socket_path:
+            raise InvalidConfigurationError(
+                "gateway_socket_path", str(socket_path), "The unix transport needs gateway_socket_path"
+            )
+        return UnixSocketTransport(socket_path, pool, timeout)
+    if transport_type == TransportType.HTTP2:
+        if httpx is not None and h2 is not None:
+            return Http2Transport(pool, timeout, prior_knowledge=bool(gateway_url and gateway_url.startswith("http://")))
+        print("Warning: httpx[http2] is not installed. Falling back to the aiohttp transport.")
+    return AiohttpTransport(pool=pool, timeout=timeout)
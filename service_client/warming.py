@@ -0,0 +1,61 @@
+import json
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class WarmKey(BaseModel):
+    """A cacheable GET to prefetch when warming the cache"""
+    service: str = Field(..., description="Target service")
+    endpoint: str = Field(..., description="GET endpoint")
+    params: Dict[str, Any] = Field(default_factory=dict, description="Query parameters")
+    hits: int = Field(default=0, description="Reads seen by the client that exported the key")
+
+
+class HotKeyTracker:
+    """
+    Counts cacheable GETs by cache key so the hottest can be exported as a
+    warm-up manifest. Holds up to twice capacity keys; when full, the less
+    read half is dropped, so steadily read keys keep their counts while
+    one-off lookups fall out.
+    """
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        # cache key -> [service, endpoint, params, hits]
+        self._keys: Dict[str, list] = {}
+
+    def record(self, key: str, service: str, endpoint: str, params: Optional[Dict[str, Any]]):
+        counted = self._keys.get(key)
+        if counted is None:
+            if len(self._keys) >= 2 * self.capacity:
+                self._prune()
+            self._keys[key] = [service, endpoint, dict(params or {}), 1]
+        else:
+            counted[3] += 1
+
+    def _prune(self):
+        hottest = sorted(self._keys.items(), key=lambda item: item[1][3], reverse=True)
+        self._keys = dict(hottest[:self.capacity])
+
+    def hottest(self, limit: Optional[int] = None) -> List[WarmKey]:
+        """Tracked keys, most read first"""
+        counted = sorted(self._keys.values(), key=lambda item: item[3], reverse=True)
+        return [
+            WarmKey(service=service, endpoint=endpoint, params=params, hits=hits)
+            for service, endpoint, params, hits in counted[:limit or self.capacity]
+        ]
+
+
+def save_manifest(keys: List[WarmKey], path: str):
+    """Write keys as a JSON manifest readable by load_manifest()"""
+    manifest = {"generated_at": time.time(), "keys": [key.model_dump() for key in keys]}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=2)
+
+
+def load_manifest(path: str) -> List[WarmKey]:
+    """Read a manifest written by save_manifest()"""
+    with open(path, "r", encoding="utf-8") as fh:
+        manifest = json.load(fh)
+    return [WarmKey(**key) for key in manifest.get("keys", [])]
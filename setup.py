@@ -26,7 +26,15 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    entry_points={
+        "console_scripts": ["service-client-warm=service_client.cli:main"],
+    },
     extras_require={
+        "orjson": ["orjson>=3.6"],
+        "msgpack": ["msgpack>=1.0"],
+        "zstd": ["zstandard>=0.15"],
+        "lz4": ["lz4>=3.1"],
+        "http2": ["httpx[http2]>=0.23"],
         "dev": [
             "pytest>=6.0",
             "pytest-asyncio>=0.15.0",
@@ -0,0 +1,659 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis
+
+from service_client.cache import (
+    AsyncLocalCache, CacheConfig, CacheEntry, CacheInvalidation, DiskCache, InvalidationBus, MemoryCache,
+    parse_cache_control
+)
+from service_client.exceptions import GatewayErrorResponse, ServiceClientError
+from service_client.metrics import MetricsCollector
+from service_client.serializers import COMPRESSION_ZLIB, CompressionType, SerializerType
+
+
+@pytest.fixture
+def async_cache():
+    cache = AsyncLocalCache(CacheConfig(redis_url="redis://fake-redis:6379/0"))
+    cache.redis_client = AsyncMock()
+    return cache
+
+
+@pytest.fixture
+def pipe(async_cache):
+    """Pipeline returned by the mocked Redis client; writes are queued on it"""
+    pipe = MagicMock()
+    pipe.execute = AsyncMock(return_value=[])
+    async_cache.redis_client.pipeline = MagicMock(return_value=MagicMock(
+        __aenter__=AsyncMock(return_value=pipe), __aexit__=AsyncMock(return_value=False)
+    ))
+    return pipe
+
+
+@pytest.mark.asyncio
+async def test_async_cache_get_hit(async_cache):
+    async_cache.redis_client.get.return_value = async_cache._encode_entry(CacheEntry({"data": "cached"}))
+
+    response = await async_cache.get("user-service", "/users", "GET", {})
+
+    assert response == {"data": "cached"}
+    async_cache.redis_client.get.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_async_cache_set_uses_ttl(async_cache, pipe):
+    await async_cache.set("user-service", "/users", "GET", {}, {"data": "fresh"})
+
+    key, ttl, payload = pipe.setex.call_args.args
+    assert key.startswith("service:user-service:endpoint:/users:")
+    assert ttl == async_cache.config.ttl_seconds
+    assert async_cache._decode_entry(payload).data == {"data": "fresh"}
+
+
+@pytest.mark.asyncio
+async def test_async_cache_redis_error_is_a_miss(async_cache):
+    async_cache.redis_client.get.side_effect = redis.exceptions.ConnectionError("down")
+
+    assert await async_cache.get("user-service", "/users", "GET", {}) is None
+
+
+@pytest.mark.asyncio
+async def test_async_cache_disabled_without_redis():
+    cache = AsyncLocalCache(CacheConfig())
+    await cache.connect()
+
+    assert cache.redis_client is None
+    assert await cache.get("user-service", "/users", "GET", {}) is None
+    assert (await cache.get_stats())["enabled"] is False
+
+
+def test_memory_cache_evicts_least_recently_used():
+    l1 = MemoryCache(max_size_bytes=30)
+    l1.set("a", {"v": "a"}, ttl_seconds=60, size_bytes=10)
+    l1.set("b", {"v": "b"}, ttl_seconds=60, size_bytes=10)
+    l1.set("c", {"v": "c"}, ttl_seconds=60, size_bytes=10)
+    l1.get("a")
+
+    l1.set("d", {"v": "d"}, ttl_seconds=60, size_bytes=10)
+
+    assert l1.get("b") is None
+    assert l1.get("a") == {"v": "a"}
+    assert l1.size_bytes == 30
+    assert l1.evictions == 1
+
+
+def test_memory_cache_respects_ttl():
+    l1 = MemoryCache(max_size_bytes=1024)
+    l1.set("a", {"v": "a"}, ttl_seconds=0, size_bytes=10)
+
+    assert l1.get("a") is None
+    assert len(l1) == 0
+
+
+@pytest.mark.asyncio
+async def test_l1_tier_answers_without_redis(async_cache, pipe):
+    async_cache.l1 = MemoryCache(1024 * 1024)
+    async_cache.metrics = MetricsCollector("test-service")
+
+    await async_cache.set("user-service", "/users", "GET", {}, {"data": "fresh"})
+    response = await async_cache.get("user-service", "/users", "GET", {})
+
+    assert response == {"data": "fresh"}
+    async_cache.redis_client.get.assert_not_awaited()
+    assert async_cache.metrics.get_metrics()["l1_cache_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_l1_hits_are_private_copies_unless_shared(async_cache, pipe):
+    async_cache.l1 = MemoryCache(1024 * 1024)
+    await async_cache.set("user-service", "/users", "GET", {}, {"items": [1, 2]})
+
+    (await async_cache.get("user-service", "/users", "GET", {}))["items"].clear()
+    assert await async_cache.get("user-service", "/users", "GET", {}) == {"items": [1, 2]}
+
+    async_cache.config.l1_share_objects = True
+    await async_cache.set("user-service", "/users", "GET", {}, {"items": [1, 2]})
+    first = await async_cache.get("user-service", "/users", "GET", {})
+    assert await async_cache.get("user-service", "/users", "GET", {}) is first
+    async_cache.redis_client.get.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_redis_hits_older_than_l1_ttl_still_fill_l1(async_cache):
+    async_cache.l1 = MemoryCache(1024 * 1024)
+    async_cache.config.l1_ttl_seconds = 5
+    async_cache.config.hard_ttl_seconds = 300
+    async_cache.redis_client.get.side_effect = [
+        async_cache._encode_entry(CacheEntry({"data": "old"}, stored_at=time.time() - 10)),
+        async_cache._encode_entry(CacheEntry({"data": "gone"}, stored_at=time.time() - 400)),
+    ]
+
+    await async_cache.get_entry("user-service", "/users/1", "GET", {})
+    await async_cache.get_entry("user-service", "/users/2", "GET", {})
+
+    (_, expires_at, _, _), = async_cache.l1._entries.values()
+    assert 4 < expires_at - time.monotonic() <= 5
+    assert async_cache.l1.size_bytes > 0
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_kept_until_hard_ttl(async_cache):
+    async_cache.config.soft_ttl_seconds = 10
+    async_cache.config.hard_ttl_seconds = 300
+    stale = CacheEntry({"data": "stale"}, stored_at=time.time() - 60)
+    async_cache.redis_client.get.return_value = async_cache._encode_entry(stale)
+
+    entry = await async_cache.get_entry("user-service", "/users", "GET", {})
+
+    assert entry.data == {"data": "stale"}
+    assert not async_cache.is_fresh(entry)
+    assert await async_cache.get("user-service", "/users", "GET", {}) is None
+
+
+def test_early_refresh_depends_on_fetch_duration(async_cache):
+    near_expiry = time.time() - 59
+    cheap = CacheEntry({"data": "cached"}, stored_at=near_expiry, ttl=60, delta=0.0)
+    expensive = CacheEntry({"data": "cached"}, stored_at=near_expiry, ttl=60, delta=300.0)
+    young = CacheEntry({"data": "cached"}, ttl=3600, delta=0.001)
+
+    assert not async_cache.should_refresh_early(cheap)
+    assert sum(async_cache.should_refresh_early(expensive) for _ in range(100)) > 90
+    assert not any(async_cache.should_refresh_early(young) for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_set_jitters_ttl(async_cache, pipe):
+    async_cache.config.ttl_jitter = 0.5
+
+    for _ in range(20):
+        await async_cache.set("user-service", "/users", "GET", {}, {"data": "fresh"}, fetch_duration=0.2)
+
+    ttls = {call.args[1] for call in pipe.setex.call_args_list}
+    assert len(ttls) > 1
+    assert all(30 <= ttl <= 90 for ttl in ttls)
+    stored = async_cache._decode_entry(pipe.setex.call_args.args[2])
+    assert stored.delta == 0.2
+
+
+@pytest.mark.parametrize("serializer", list(SerializerType))
+def test_entry_round_trips_through_serializer(serializer):
+    if serializer == SerializerType.MSGPACK:
+        pytest.importorskip("msgpack")
+    if serializer == SerializerType.ORJSON:
+        pytest.importorskip("orjson")
+    cache = AsyncLocalCache(CacheConfig(serializer=serializer))
+    entry = CacheEntry({"items": [{"id": 1, "name": "Villa"}], "total": 1}, ttl=60, delta=0.1)
+
+    decoded = cache._decode_entry(cache._encode_entry(entry))
+
+    assert decoded.data == entry.data
+    assert decoded.stored_at == entry.stored_at
+    assert decoded.delta == 0.1
+
+
+def test_raw_response_bytes_stored_verbatim():
+    cache = AsyncLocalCache(CacheConfig(cache_raw_responses=True))
+    body = b'{"items": [1, 2, 3]}'
+
+    encoded = cache._encode_entry(CacheEntry({"items": [1, 2, 3]}), raw_body=body)
+
+    assert encoded.endswith(body)
+    assert cache._decode_entry(encoded).data == {"items": [1, 2, 3]}
+
+
+def test_corrupted_entry_is_a_miss(async_cache):
+    assert async_cache._decode_entry(b"not-an-entry") is None
+
+
+@pytest.mark.asyncio
+async def test_large_entries_are_compressed():
+    cache = AsyncLocalCache(CacheConfig(compression=CompressionType.ZLIB, compression_threshold_bytes=1024))
+    cache.redis_client = AsyncMock()
+    cache.redis_client.info.return_value = {}
+    cache.redis_client.smembers.return_value = set()
+    small = CacheEntry({"id": 1})
+    large = CacheEntry({"items": [{"id": i, "name": "Apartment"} for i in range(200)]})
+
+    small_encoded = cache._encode_entry(small)
+    large_encoded = cache._encode_entry(large)
+
+    assert small_encoded[0] == 0
+    assert large_encoded[0] == COMPRESSION_ZLIB
+    assert len(large_encoded) < large.size
+    assert cache._decode_entry(large_encoded).data == large.data
+    stats = await cache.get_stats()
+    assert stats["compression"] == "zlib"
+    assert stats["compressed_entries"] == 1
+    assert stats["compression_ratio"] > 1
+
+
+def test_cache_key_is_canonical_and_type_safe(async_cache):
+    key = async_cache._generate_key("user-service", "/users", "GET", {"page": 1, "limit": 10})
+
+    assert key == async_cache._generate_key("user-service", "/users", "GET", {"limit": 10, "page": 1})
+    assert key.startswith("service:user-service:endpoint:/users:")
+    assert key != async_cache._generate_key("user-service", "/users", "GET", {"page": "1", "limit": 10})
+    assert key != async_cache._generate_key("user-service", "/users", "GET", {"page": 1.0, "limit": 10})
+    assert key != async_cache._generate_key("user-service", "/users", "POST", {"page": 1, "limit": 10})
+
+
+def test_cache_key_supports_nested_params(async_cache):
+    params = {"filters": {"bedrooms": [2, 3]}, "page": 1}
+
+    key = async_cache._generate_key("property-service", "/search", "GET", params)
+
+    assert key == async_cache._generate_key("property-service", "/search", "GET", dict(reversed(params.items())))
+    assert key != async_cache._generate_key("property-service", "/search", "GET", {"page": 1})
+
+
+@pytest.mark.asyncio
+async def test_get_entries_uses_single_mget(async_cache):
+    keys = {f"service:user-service:endpoint:/users/{i}:key": "user-service" for i in range(3)}
+    hit = async_cache._encode_entry(CacheEntry({"id": 1}))
+    async_cache.redis_client.mget.return_value = [hit, None, None]
+
+    entries = await async_cache.get_entries(keys)
+
+    async_cache.redis_client.mget.assert_awaited_once_with(list(keys))
+    assert [entry.data if entry else None for entry in entries.values()] == [{"id": 1}, None, None]
+
+
+@pytest.mark.asyncio
+async def test_set_many_pipelines_writes(async_cache, pipe):
+    await async_cache.set_many([
+        ("key-1", "user-service", {"id": 1}, 0.1, None, None, ()),
+        ("key-2", "user-service", {"id": 2}, 0.1, None, None, ()),
+    ])
+
+    assert [call.args[0] for call in pipe.setex.call_args_list] == ["key-1", "key-2"]
+    pipe.execute.assert_awaited_once()
+    async_cache.redis_client.setex.assert_not_awaited()
+
+
+def test_parse_cache_control():
+    directives = parse_cache_control('public, Max-Age=60, no-cache="Set-Cookie", stale-while-revalidate=30')
+
+    assert directives == {"public": None, "max-age": "60", "no-cache": "Set-Cookie", "stale-while-revalidate": "30"}
+
+
+@pytest.mark.asyncio
+async def test_cache_control_sets_entry_ttls(async_cache, pipe):
+    async_cache.config.honor_cache_headers = True
+    headers = {"Cache-Control": "max-age=30, stale-while-revalidate=60", "ETag": '"v1"'}
+
+    await async_cache.set("user-service", "/users", "GET", {}, {"data": "fresh"}, headers=headers)
+
+    _, ttl, payload = pipe.setex.call_args.args
+    entry = async_cache._decode_entry(payload)
+    assert ttl == 90 + async_cache.config.revalidation_window_seconds
+    assert (entry.ttl, entry.stale_ttl, entry.etag) == (30, 90, '"v1"')
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+@pytest.mark.asyncio
+async def test_no_store_response_is_not_cached(async_cache, pipe):
+    async_cache.config.honor_cache_headers = True
+
+    await async_cache.set("user-service", "/users", "GET", {}, {"data": "secret"}, headers={"Cache-Control": "no-store"})
+
+    pipe.setex.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_set_indexes_key_by_service_endpoint_and_tag(async_cache, pipe):
+    await async_cache.set("user-service", "/users/1", "GET", {}, {"id": 1}, tags=["user:1"])
+
+    key = pipe.setex.call_args.args[0]
+    names, *keyed = pipe.zadd.call_args_list
+    assert names.args == ("cache-index:endpoints:user-service", {"/users/1": 0})
+    indexes = [call.args[0] for call in keyed]
+    assert indexes == [
+        "cache-index:service:user-service", "cache-index:tag:user:1", "cache-index:endpoint:user-service:/users/1"
+    ]
+    assert all(key in call.args[1] for call in keyed)
+    pipe.sadd.assert_called_once_with("cache-index:services", "user-service")
+    # Every index expires with its longest-lived entry
+    expiries = [(call.args, call.kwargs) for call in pipe.expire.call_args_list]
+    for index in ("cache-index:services", "cache-index:endpoints:user-service", *indexes):
+        assert ((index, 60), {"nx": True}) in expiries
+        assert ((index, 60), {"gt": True}) in expiries
+
+
+@pytest.mark.asyncio
+async def test_invalidate_tags_deletes_indexed_keys_in_batches(async_cache, pipe):
+    async_cache.l1 = MemoryCache(1024)
+    async_cache.l1.set("key-1", CacheEntry({"id": 1}), ttl_seconds=60, size_bytes=10)
+    async_cache.redis_client.zrange.side_effect = [[b"key-1", b"key-2"], [b"key-3"], []]
+    pipe.execute.side_effect = [[1, 1, 2], [1, 1]]
+
+    deleted = await async_cache.invalidate_tags(["user:1"])
+
+    assert deleted == 3
+    assert [call.args for call in pipe.unlink.call_args_list] == [(b"key-1",), (b"key-2",), (b"key-3",)]
+    assert pipe.execute.await_count == 2
+    assert async_cache.redis_client.zrange.await_args.args[0] == "cache-index:tag:user:1"
+    assert async_cache.l1.get("key-1") is None
+    async_cache.redis_client.scan_iter.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_clear_all_uses_service_indexes_not_flushdb(async_cache, pipe):
+    async_cache.redis_client.smembers.return_value = {b"user-service"}
+    async_cache.redis_client.zrange.side_effect = [[b"key-1"], []]
+    pipe.execute.return_value = [1, 1]
+
+    await async_cache.invalidate_gateway_transition()
+
+    pipe.unlink.assert_called_once_with(b"key-1")
+    async_cache.redis_client.delete.assert_awaited_once_with("cache-index:services")
+    async_cache.redis_client.flushdb.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_rule_invalidations_read_only_their_own_indexes(async_cache, pipe):
+    async_cache.redis_client.zrange.return_value = []
+    targets = (CacheInvalidation(service="user-service", endpoint="/users/42"), CacheInvalidation(tag="user:42"))
+
+    await async_cache.invalidate(*targets, targets[0])
+
+    read = sorted(call.args[0] for call in async_cache.redis_client.zrange.await_args_list)
+    assert read == ["cache-index:endpoint:user-service:/users/42", "cache-index:tag:user:42"]
+    async_cache.redis_client.smembers.assert_not_awaited()
+
+
+def test_memory_cache_clears_by_endpoint_group_and_prefix():
+    l1 = MemoryCache(max_size_bytes=1024)
+    for key in ("service:a:endpoint:/users/4:k1", "service:a:endpoint:/users/4:k2", "service:a:endpoint:/users/42:k"):
+        l1.set(key, {}, ttl_seconds=60, size_bytes=10)
+    l1.set("service:a:endpoint:/agents:k", {}, ttl_seconds=60, size_bytes=10)
+
+    l1.delete_group("service:a:endpoint:/users/4")
+    assert len(l1) == 2
+    l1.clear("service:a:endpoint:/users")
+    assert len(l1) == 1 and l1.size_bytes == 10
+    assert l1._groups == {"service:a:endpoint:/agents": {"service:a:endpoint:/agents:k"}}
+
+
+def test_memory_cache_deletes_by_tag():
+    l1 = MemoryCache(max_size_bytes=1024)
+    l1.set("a", {"v": "a"}, ttl_seconds=60, size_bytes=10, tags=["user:1"])
+    l1.set("b", {"v": "b"}, ttl_seconds=60, size_bytes=10, tags=["user:1", "user:2"])
+    l1.set("c", {"v": "c"}, ttl_seconds=60, size_bytes=10)
+
+    l1.delete_tag("user:1")
+
+    assert (l1.get("a"), l1.get("b"), l1.get("c")) == (None, None, {"v": "c"})
+    assert l1.size_bytes == 10
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bus_batches_and_coalesces():
+    redis_client = AsyncMock()
+    bus = InvalidationBus(redis_client, "invalidations", apply=MagicMock(), flush_interval=0.01)
+
+    bus.publish([CacheInvalidation(service="user-service", endpoint_prefix="/users/1")])
+    bus.publish([CacheInvalidation(service="user-service"), CacheInvalidation(tag="user:1")])
+    bus.publish([CacheInvalidation(service="user-service")])
+    await asyncio.sleep(0.05)
+
+    channel, message = redis_client.publish.await_args.args
+    assert channel == "invalidations"
+    assert json.loads(message)["invalidations"] == [{"service": "user-service"}, {"tag": "user:1"}]
+    redis_client.publish.assert_awaited_once()
+
+
+def test_invalidation_bus_applies_messages_from_other_clients():
+    apply = MagicMock()
+    bus = InvalidationBus(AsyncMock(), "invalidations", apply=apply, flush_interval=0.01)
+
+    bus._handle(json.dumps({"sender": bus.sender_id, "invalidations": [{"tag": "own"}]}))
+    bus._handle(json.dumps({"sender": "other", "invalidations": [{"service": "user-service"}]}))
+
+    apply.assert_called_once_with([CacheInvalidation(service="user-service")])
+
+
+@pytest.mark.asyncio
+async def test_invalidation_bus_listener_survives_failed_evictions():
+    apply = MagicMock(side_effect=[sqlite3.OperationalError("database is locked"), None])
+    messages = [{"data": json.dumps({"sender": "other", "invalidations": [{"tag": tag}]})} for tag in ("a", "b")]
+
+    async def get_message(**kwargs):
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(0.01)
+
+    pubsub = MagicMock(subscribe=AsyncMock(), aclose=AsyncMock(), get_message=get_message)
+    bus = InvalidationBus(MagicMock(pubsub=MagicMock(return_value=pubsub)), "invalidations", apply, flush_interval=0.01)
+
+    await bus.start()
+    await asyncio.sleep(0.01)
+
+    assert apply.call_count == 2
+    assert not bus._listen_task.done()
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_publish_only_bus_does_not_subscribe():
+    redis_client = MagicMock()
+    bus = InvalidationBus(redis_client, "invalidations", apply=MagicMock(), flush_interval=0.01)
+
+    await bus.start(subscribe=False)
+
+    redis_client.pubsub.assert_not_called()
+    assert bus._listen_task is None
+    await bus.stop()
+
+
+@pytest.mark.asyncio
+async def test_invalidate_evicts_local_entries_and_publishes(async_cache, pipe):
+    async_cache.l1 = MemoryCache(1024 * 1024)
+    async_cache.bus = MagicMock()
+    async_cache.redis_client.zrangebylex.side_effect = [[b"/users/1"], []]
+    async_cache.redis_client.zrange.return_value = []
+    await async_cache.set("user-service", "/users/1", "GET", {}, {"id": 1})
+    await async_cache.set("user-service", "/agents", "GET", {}, {"id": 2})
+    invalidation = CacheInvalidation(service="user-service", endpoint_prefix="/users")
+
+    await async_cache.invalidate(invalidation)
+
+    assert await async_cache.get("user-service", "/users/1", "GET", {}) is None
+    assert await async_cache.get("user-service", "/agents", "GET", {}) == {"id": 2}
+    async_cache.bus.publish.assert_called_once_with((invalidation,))
+    # Matching endpoints come from a lexical range, then each one's own index
+    names_key, low, high = async_cache.redis_client.zrangebylex.await_args.args
+    assert (names_key, low, high) == ("cache-index:endpoints:user-service", b"[/users", b"[/users\xff")
+    async_cache.redis_client.zrem.assert_awaited_once_with("cache-index:endpoints:user-service", b"/users/1")
+    assert async_cache.redis_client.zrange.await_args.args[0] == "cache-index:endpoint:user-service:/users/1"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_endpoint_reads_only_its_index(async_cache, pipe):
+    async_cache.l1 = MemoryCache(1024 * 1024)
+    await async_cache.set("user-service", "/users/4", "GET", {}, {"id": 4})
+    await async_cache.set("user-service", "/users/42", "GET", {}, {"id": 42})
+    key = pipe.setex.call_args_list[0].args[0]
+    async_cache.redis_client.zrange.side_effect = [[key.encode()], []]
+    pipe.execute.return_value = [1, 1, 1]
+
+    deleted = await async_cache.invalidate(CacheInvalidation(service="user-service", endpoint="/users/4"))
+
+    assert deleted == 1
+    assert async_cache.redis_client.zrange.await_args.args[0] == "cache-index:endpoint:user-service:/users/4"
+    # The key also leaves its service index, which get_stats() counts
+    pipe.zrem.assert_any_call("cache-index:service:user-service", key.encode())
+    assert async_cache.l1.get(key) is None
+    assert await async_cache.get("user-service", "/users/42", "GET", {}) == {"id": 42}
+
+
+@pytest.mark.asyncio
+async def test_negative_entry_round_trips_gateway_error(async_cache, pipe):
+    async_cache.config.negative_cache = True
+    error = GatewayErrorResponse(error_type="NotFound", message="No such user", correlation_id="c-1", error_code=404)
+
+    assert async_cache.is_negative_cacheable(error)
+    await async_cache.set_negative("user-service", "/users/9", "GET", {}, error=error)
+
+    _, ttl, payload = pipe.setex.call_args.args
+    entry = async_cache._decode_entry(payload)
+    assert ttl == async_cache.config.negative_ttl_seconds
+    assert entry.negative
+    with pytest.raises(GatewayErrorResponse) as exc_info:
+        entry.replay()
+    assert (exc_info.value.error_type, exc_info.value.error_code, exc_info.value.correlation_id) == ("NotFound", 404, "c-1")
+
+
+def test_only_configured_errors_are_negative_cacheable(async_cache):
+    async_cache.config.negative_cache = True
+
+    assert async_cache.is_negative_cacheable(ServiceClientError("gone", error_code=410))
+    assert not async_cache.is_negative_cacheable(ServiceClientError("bad request", error_code=400))
+    assert not async_cache.is_negative_cacheable(RuntimeError("boom"))
+
+
+def test_disk_cache_expires_and_evicts(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.db"), max_size_bytes=25)
+    disk.set("expired", b"x" * 10, ttl_seconds=0)
+    disk.set("a", b"a" * 10, ttl_seconds=60)
+    disk.set("b", b"b" * 10, ttl_seconds=120)
+    disk.set("c", b"c" * 10, ttl_seconds=180)
+
+    assert disk.get("expired") is None
+    assert disk.get("a") is None
+    assert disk.get_many(["a", "b", "c"]) == {"b": b"b" * 10, "c": b"c" * 10}
+    assert disk.size_bytes == 20
+
+
+def test_disk_cache_size_cap_holds_across_processes(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first, second = DiskCache(path, max_size_bytes=25), DiskCache(path, max_size_bytes=25)
+    first.set("a", b"a" * 10, ttl_seconds=60)
+    second.set("b", b"b" * 10, ttl_seconds=120)
+    first.set("c", b"c" * 10, ttl_seconds=180)
+
+    assert first.size_bytes == second.size_bytes == 20
+    assert second.get_many(["a", "b", "c"]) == {"b": b"b" * 10, "c": b"c" * 10}
+
+
+def test_disk_cache_deletes_by_tag_and_prefix(tmp_path):
+    disk = DiskCache(str(tmp_path / "cache.db"), max_size_bytes=1024)
+    disk.set("service:users:1", b"1", ttl_seconds=60, tags=("user:1",))
+    disk.set("service:users:2", b"2", ttl_seconds=60, tags=("user:2",))
+    disk.set("service:orders:1", b"3", ttl_seconds=60)
+
+    disk.delete_tag("user:1")
+    assert disk.get("service:users:1") is None
+    assert disk.get("service:users:2") == b"2"
+
+    plan = disk._db.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM entries WHERE key >= ? AND key < ?", ("service:users:", "service:users;")
+    ).fetchall()
+    assert "SCAN" not in str(plan)
+    disk.clear("service:users:")
+    assert disk.get("service:users:2") is None
+    assert disk.get("service:orders:1") == b"3"
+
+
+@pytest.mark.asyncio
+async def test_disk_tier_persists_without_redis(tmp_path):
+    config = CacheConfig(disk_cache_path=str(tmp_path / "cache.db"))
+    cache = AsyncLocalCache(config)
+    await cache.connect()
+    await cache.set("user-service", "/users", "GET", {}, {"data": "fresh"})
+    await cache.close()
+
+    reopened = AsyncLocalCache(config)
+    await reopened.connect()
+    assert await reopened.get("user-service", "/users", "GET", {}) == {"data": "fresh"}
+    assert (await reopened.get_stats())["disk_entries"] == 1
+    await reopened.close()
+
+
+@pytest.mark.asyncio
+async def test_disk_evictions_are_counted_on_the_event_loop(tmp_path):
+    cache = AsyncLocalCache(CacheConfig(disk_cache_path=str(tmp_path / "cache.db")))
+    cache.disk.max_size_bytes = 15
+    counted_on = []
+    record_eviction = cache.stats.record_eviction
+    cache.stats.record_eviction = lambda key: (counted_on.append(threading.current_thread()), record_eviction(key))
+
+    for endpoint in ("/users/1", "/users/2"):
+        await cache._on_disk(cache.disk.set, f"service:user-service:endpoint:{endpoint}:k", b"x" * 10, 60)
+    await asyncio.sleep(0)
+
+    assert counted_on == [threading.main_thread()]
+    assert cache.stats.snapshot()["services"]["user-service"]["evictions"] == 1
+    await cache.close()
+
+
+@pytest.mark.asyncio
+async def test_redis_hit_is_written_to_disk_tier(async_cache, tmp_path):
+    async_cache.disk = DiskCache(str(tmp_path / "cache.db"), max_size_bytes=1024 * 1024)
+    payload, _ = async_cache._prepare_entry("k", "user-service", async_cache._new_entry({"data": "cached"}, 0)[0], 60)
+    await async_cache._on_disk(async_cache.disk.delete, "k")
+    async_cache.redis_client.get.return_value = payload
+
+    assert (await async_cache.get_entry("user-service", "/users", "GET", {}, key="k")).data == {"data": "cached"}
+    # The write-back is queued on the disk thread, ahead of this read
+    assert await async_cache._on_disk(async_cache.disk.get, "k") == payload
+
+
+@pytest.mark.asyncio
+async def test_stats_are_counted_per_service_by_the_cache(async_cache, pipe):
+    async_cache.redis_client.info.return_value = {"keyspace_hits": 900, "keyspace_misses": 100}
+    await async_cache.set("user-service", "/users", "GET", {}, {"data": "fresh"})
+    payload = pipe.setex.call_args[0][2]
+    async_cache.redis_client.get.side_effect = [payload, None]
+
+    assert await async_cache.get("user-service", "/users", "GET", {}) == {"data": "fresh"}
+    assert await async_cache.get("agent-service", "/agents", "GET", {}) is None
+    pipe.execute.return_value = [1, 1]
+    async_cache.redis_client.zrange.side_effect = [[b"service:user-service:endpoint:/users:k"], []]
+    await async_cache.clear("user-service")
+    async_cache.redis_client.smembers.return_value = {b"user-service", b"agent-service"}
+    pipe.execute.return_value = [0, 3]
+
+    stats = await async_cache.get_stats()
+    users = stats["services"]["user-service"]
+    assert (users["hits"], users["misses"], users["sets"], users["invalidations"]) == (1, 0, 1, 1)
+    # Counted in this cache's own indexes, not Redis' keyspace
+    assert stats["total_entries"] == 3
+    assert pipe.zcount.call_count == 2
+    # The service without live entries is pruned from the services index
+    async_cache.redis_client.srem.assert_awaited_once()
+    assert async_cache.redis_client.srem.await_args.args[0] == "cache-index:services"
+    assert users["bytes_written"] == users["bytes_read"] == len(payload)
+    assert users["redis_calls"] == 2
+    assert stats["services"]["agent-service"]["misses"] == 1
+    # The hit rate is this client's, not Redis' keyspace hit rate
+    assert stats["hit_rate"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_stale_and_negative_lookups_are_not_counted_as_hits(async_cache):
+    async_cache.config.hard_ttl_seconds = 300
+    async_cache.redis_client.get.side_effect = [
+        async_cache._encode_entry(CacheEntry({"data": "stale"}, stored_at=time.time() - 120)),
+        async_cache._encode_entry(async_cache._negative_entry(None)[0]),
+    ]
+
+    await async_cache.get_entry("user-service", "/users/1", "GET", {})
+    await async_cache.get_entry("user-service", "/users/2", "GET", {})
+
+    users = async_cache.stats.snapshot()["services"]["user-service"]
+    assert (users["hits"], users["stale_hits"], users["negative_hits"], users["misses"]) == (0, 1, 1, 0)
+    assert users["hit_rate"] == 0
+
+
+def test_l1_capacity_evictions_are_counted_per_service():
+    cache = AsyncLocalCache(CacheConfig(l1_enabled=True, max_size_mb=0))
+    cache.l1.max_size_bytes = 15
+    for key in ("service:a:endpoint:/1:k", "service:a:endpoint:/2:k", "service:b:endpoint:/1:k"):
+        cache.l1.set(key, {}, ttl_seconds=60, size_bytes=10)
+
+    assert cache.stats.snapshot()["services"]["a"]["evictions"] == 2
@@ -1,10 +1,19 @@
 import asyncio
+import gc
+import time
+import weakref
 from unittest.mock import MagicMock, AsyncMock
 
 import pytest
+from aiohttp import web
+from prometheus_client import REGISTRY
+from service_client.cache import CacheEntry, CacheInvalidation, MemoryCache
+from service_client.invalidation import InvalidationRule
 from service_client.client import ServiceClient, ServiceClientConfig
-from service_client.exceptions import CircuitOpenError, MaxRetriesExceededError, ServiceClientError, \
-    ServiceUnavailableError
+from service_client.connection import ConnectionPoolConfig
+from service_client.transport import AiohttpTransport
+from service_client.exceptions import CircuitOpenError, InvalidConfigurationError, MaxRetriesExceededError, \
+    ServiceClientError, ServiceUnavailableError
 
 
 @pytest.fixture
@@ -24,8 +33,8 @@ def mock_service_client(mock_config):
             selected_instance=MagicMock(host="localhost", port=8080)
         )
     )
-    client._http_session = MagicMock()
-    client._http_session.request = MagicMock()
+    client.transport = AiohttpTransport(MagicMock())
+    client.transport.session.request = MagicMock()
     return client
 
 
@@ -34,7 +43,7 @@ async def test_successful_call(mock_service_client):
     mock_response = MagicMock()
     mock_response.status = 200
     mock_response.json = AsyncMock(return_value={"data": "success"})
-    mock_service_client._http_session.request.return_value.__aenter__.return_value = (
+    mock_service_client.transport.session.request.return_value.__aenter__.return_value = (
         mock_response
     )
 
@@ -44,7 +53,7 @@ async def test_successful_call(mock_service_client):
     mock_service_client.discovery.discover_service.assert_called_once_with(
         "target-service"
     )
-    mock_service_client._http_session.request.assert_called_once()
+    mock_service_client.transport.session.request.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -55,7 +64,7 @@ async def test_circuit_breaker_opens(mock_service_client):
     mock_response = MagicMock()
     mock_response.status = 503
     mock_response.text = AsyncMock(return_value="Service Unavailable")
-    mock_service_client._http_session.request.return_value.__aenter__.return_value = (
+    mock_service_client.transport.session.request.return_value.__aenter__.return_value = (
         mock_response
     )
 
@@ -73,13 +82,13 @@ async def test_circuit_breaker_opens(mock_service_client):
 
 @pytest.mark.asyncio
 async def test_cache_hit(mock_service_client):
-    mock_service_client.cache.get = MagicMock(return_value={"data": "cached"})
+    mock_service_client.cache.get_entry = AsyncMock(return_value=CacheEntry({"data": "cached"}))
 
     response = await mock_service_client.call("target-service", "/test")
 
     assert response == {"data": "cached"}
-    mock_service_client.cache.get.assert_called_once()
-    mock_service_client._http_session.request.assert_not_called()
+    mock_service_client.cache.get_entry.assert_called_once()
+    mock_service_client.transport.session.request.assert_not_called()
 
 
 @pytest.mark.asyncio
@@ -95,7 +104,7 @@ async def test_retry_on_failure(mock_service_client):
     successful_response.status = 200
     successful_response.json = AsyncMock(return_value={"data": "success"})
 
-    mock_service_client._http_session.request.side_effect = [
+    mock_service_client.transport.session.request.side_effect = [
         MagicMock(__aenter__=AsyncMock(return_value=failed_response)),
         MagicMock(__aenter__=AsyncMock(return_value=successful_response)),
     ]
@@ -105,7 +114,7 @@ async def test_retry_on_failure(mock_service_client):
     )
 
     assert response == {"data": "success"}
-    assert mock_service_client._http_session.request.call_count == 2
+    assert mock_service_client.transport.session.request.call_count == 2
 
 
 @pytest.mark.asyncio
@@ -116,14 +125,14 @@ async def test_max_retries_exceeded(mock_service_client):
     failed_response = MagicMock()
     failed_response.status = 500
     failed_response.text = AsyncMock(return_value="Internal Server Error")
-    mock_service_client._http_session.request.return_value.__aenter__.return_value = (
+    mock_service_client.transport.session.request.return_value.__aenter__.return_value = (
         failed_response
     )
 
     with pytest.raises(MaxRetriesExceededError):
         await mock_service_client.call("target-service", "/test", use_cache=False)
 
-    assert mock_service_client._http_session.request.call_count == 2
+    assert mock_service_client.transport.session.request.call_count == 2
 
 
 @pytest.mark.asyncio
@@ -131,7 +140,7 @@ async def test_batch_call(mock_service_client):
     mock_response = MagicMock()
     mock_response.status = 200
     mock_response.json = AsyncMock(return_value={"data": "success"})
-    mock_service_client._http_session.request.return_value.__aenter__.return_value = (
+    mock_service_client.transport.session.request.return_value.__aenter__.return_value = (
         mock_response
     )
 
@@ -145,7 +154,7 @@ async def test_batch_call(mock_service_client):
     assert len(responses) == 2
     assert responses[0] == {"data": "success"}
     assert responses[1] == {"data": "success"}
-    assert mock_service_client._http_session.request.call_count == 2
+    assert mock_service_client.transport.session.request.call_count == 2
 
 
 @pytest.mark.asyncio
@@ -155,11 +164,413 @@ async def test_client_error_no_retry(mock_service_client):
     mock_response = MagicMock()
     mock_response.status = 400
     mock_response.text = AsyncMock(return_value="Bad Request")
-    mock_service_client._http_session.request.return_value.__aenter__.return_value = (
+    mock_service_client.transport.session.request.return_value.__aenter__.return_value = (
         mock_response
     )
 
     with pytest.raises(ServiceClientError):
         await mock_service_client.call("target-service", "/test", use_cache=False)
 
-    assert mock_service_client._http_session.request.call_count == 1
\ No newline at end of file
+    assert mock_service_client.transport.session.request.call_count == 1
+
+@pytest.fixture
+def gateway_client(mock_config):
+    client = ServiceClient(mock_config)
+    client.transport = AiohttpTransport(MagicMock())
+    client.transport.session.request = MagicMock()
+    return client
+
+
+def _slow_response(status, payload, delay=0.05):
+    response = MagicMock()
+    response.status = status
+    response.json = AsyncMock(return_value=payload)
+    response.text = AsyncMock(return_value=str(payload))
+
+    async def enter(*args, **kwargs):
+        await asyncio.sleep(delay)
+        return response
+
+    return MagicMock(__aenter__=enter, __aexit__=AsyncMock(return_value=False))
+
+
+@pytest.mark.asyncio
+async def test_identical_gets_are_coalesced(gateway_client):
+    gateway_client.transport.session.request.return_value = _slow_response(200, {"data": "success"})
+
+    responses = await asyncio.gather(*[
+        gateway_client.get("target-service", "/test", params={"id": 1}, use_circuit_breaker=False)
+        for _ in range(5)
+    ])
+
+    assert responses == [{"data": "success"}] * 5
+    assert gateway_client.transport.session.request.call_count == 1
+    assert gateway_client.get_metrics()["requests_coalesced"] == 4
+    assert gateway_client._inflight_requests == {}
+
+
+@pytest.mark.asyncio
+async def test_coalesced_callers_share_error(gateway_client):
+    gateway_client.transport.session.request.return_value = _slow_response(503, "Service Unavailable")
+
+    results = await asyncio.gather(*[
+        gateway_client.get("target-service", "/test", use_circuit_breaker=False, use_retry=False)
+        for _ in range(3)
+    ], return_exceptions=True)
+
+    assert all(isinstance(result, ServiceUnavailableError) for result in results)
+    assert gateway_client.transport.session.request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_coalescing_can_be_disabled_per_service(gateway_client):
+    gateway_client.config.service_coalescing["target-service"] = False
+    gateway_client.transport.session.request.return_value = _slow_response(200, {"data": "success"})
+
+    await asyncio.gather(*[
+        gateway_client.get("target-service", "/test", use_circuit_breaker=False)
+        for _ in range(3)
+    ])
+
+    assert gateway_client.transport.session.request.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_revalidating(gateway_client):
+    gateway_client.config.cache.hard_ttl_seconds = 300
+    stale_entry = CacheEntry({"data": "stale"}, stored_at=time.time() - 120)
+    gateway_client.cache.get_entry = AsyncMock(return_value=stale_entry)
+    gateway_client.cache.set = AsyncMock()
+    gateway_client.transport.session.request.return_value = _slow_response(200, {"data": "fresh"})
+
+    response = await gateway_client.get("target-service", "/test", use_circuit_breaker=False)
+
+    assert response == {"data": "stale"}
+    await asyncio.gather(*gateway_client._refresh_tasks.values())
+    assert gateway_client.transport.session.request.call_count == 1
+    gateway_client.cache.set.assert_awaited_once()
+    assert gateway_client.cache.set.await_args.args == ("target-service", "/test", "GET", {}, {"data": "fresh"})
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_joins_inflight_request(gateway_client):
+    gateway_client.config.cache.hard_ttl_seconds = 300
+    gateway_client.cache.get_entry = AsyncMock(return_value=CacheEntry({"data": "stale"}, stored_at=time.time() - 120))
+    gateway_client.cache.set = AsyncMock()
+    gateway_client.transport.session.request.return_value = _slow_response(200, {"data": "fresh"})
+
+    leader = asyncio.create_task(
+        gateway_client.get("target-service", "/test", use_cache=False, use_circuit_breaker=False)
+    )
+    await asyncio.sleep(0.01)
+    assert len(gateway_client._inflight_requests) == 1
+
+    # A second caller gets the stale entry and its refresh shares the leader's request
+    assert await gateway_client.get("target-service", "/test", use_circuit_breaker=False) == {"data": "stale"}
+    await asyncio.gather(leader, *gateway_client._refresh_tasks.values())
+
+    assert gateway_client.transport.session.request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_background_refresh_does_not_coalesce_when_disabled(gateway_client):
+    gateway_client.config.service_coalescing["target-service"] = False
+    gateway_client.config.cache.hard_ttl_seconds = 300
+    gateway_client.cache.get_entry = AsyncMock(return_value=CacheEntry({"data": "stale"}, stored_at=time.time() - 120))
+    gateway_client.cache.set = AsyncMock()
+    gateway_client.transport.session.request.return_value = _slow_response(200, {"data": "fresh"})
+
+    await gateway_client.get("target-service", "/test", use_circuit_breaker=False)
+    await asyncio.sleep(0.01)
+
+    assert gateway_client._refresh_tasks
+    assert gateway_client._inflight_requests == {}
+    await asyncio.gather(*gateway_client._refresh_tasks.values())
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_refreshed_to_empty_is_replaced_by_negative_entry(gateway_client):
+    gateway_client.config.cache.hard_ttl_seconds = 300
+    gateway_client.cache.get_entry = AsyncMock(return_value=CacheEntry({"data": "stale"}, stored_at=time.time() - 120))
+    gateway_client.cache.set = AsyncMock()
+    gateway_client.cache.set_negative = AsyncMock()
+    gateway_client._execute_request = AsyncMock(return_value=None)
+
+    assert await gateway_client.get("target-service", "/test", use_circuit_breaker=False) == {"data": "stale"}
+    await asyncio.gather(*gateway_client._refresh_tasks.values())
+
+    gateway_client.cache.set.assert_not_awaited()
+    gateway_client.cache.set_negative.assert_awaited_once()
+    assert gateway_client.cache.set_negative.await_args.args == ("target-service", "/test", "GET", {})
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_on_error(gateway_client):
+    gateway_client.config.cache.hard_ttl_seconds = 300
+    gateway_client.config.cache.stale_while_revalidate = False
+    stale_entry = CacheEntry({"data": "stale"}, stored_at=time.time() - 120)
+    gateway_client.cache.get_entry = AsyncMock(return_value=stale_entry)
+    gateway_client.transport.session.request.return_value = _slow_response(503, "Service Unavailable")
+
+    response = await gateway_client.get("target-service", "/test", use_circuit_breaker=False, use_retry=False)
+
+    assert response == {"data": "stale"}
+    assert gateway_client.transport.session.request.call_count == 1
+
+
+@pytest.mark.asyncio
+async def test_raw_response_body_passed_to_cache(gateway_client):
+    gateway_client.config.cache.cache_raw_responses = True
+    gateway_client.cache.set = AsyncMock()
+    response = _slow_response(200, None, delay=0)
+    response.__aenter__ = AsyncMock(return_value=MagicMock(status=200, read=AsyncMock(return_value=b'{"data": "raw"}')))
+    gateway_client.transport.session.request.return_value = response
+
+    result = await gateway_client.get("target-service", "/test", use_circuit_breaker=False)
+
+    assert result == {"data": "raw"}
+    assert gateway_client.cache.set.await_args.kwargs["raw_body"] == b'{"data": "raw"}'
+
+
+@pytest.mark.asyncio
+async def test_batch_call_resolves_cache_in_one_lookup(gateway_client):
+    cached_key = gateway_client.cache._generate_key("service-a", "/cached", "GET", {})
+    gateway_client.cache.get_entries = AsyncMock(side_effect=lambda keys: {
+        key: CacheEntry({"data": "cached"}) if key == cached_key else None for key in keys
+    })
+    gateway_client.cache.get_entry = AsyncMock()
+    gateway_client.cache.set_many = AsyncMock()
+    gateway_client.transport.session.request.return_value = _slow_response(200, {"data": "fresh"}, delay=0)
+
+    responses = await gateway_client.batch_call([
+        {"target_service": "service-a", "endpoint": "/cached", "use_circuit_breaker": False},
+        {"target_service": "service-a", "endpoint": "/missing", "use_circuit_breaker": False},
+    ])
+
+    assert responses == [{"data": "cached"}, {"data": "fresh"}]
+    gateway_client.cache.get_entries.assert_awaited_once()
+    gateway_client.cache.get_entry.assert_not_awaited()
+    assert gateway_client.transport.session.request.call_count == 1
+    (write,) = gateway_client.cache.set_many.await_args.args[0]
+    assert write[1:3] == ("service-a", {"data": "fresh"})
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_revalidated_with_etag(gateway_client):
+    gateway_client.config.cache.honor_cache_headers = True
+    expired_entry = CacheEntry({"data": "cached"}, stored_at=time.time() - 120, ttl=60, stale_ttl=60, etag='"v1"')
+    gateway_client.cache.get_entry = AsyncMock(return_value=expired_entry)
+    gateway_client.cache.set = AsyncMock()
+    response = _slow_response(304, None, delay=0)
+    not_modified = MagicMock(status=304, headers={"Cache-Control": "max-age=120"}, json=AsyncMock(), read=AsyncMock())
+    response.__aenter__ = AsyncMock(return_value=not_modified)
+    gateway_client.transport.session.request.return_value = response
+
+    result = await gateway_client.get("target-service", "/test", use_circuit_breaker=False)
+
+    assert result == {"data": "cached"}
+    assert gateway_client.transport.session.request.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+    not_modified.json.assert_not_awaited()
+    not_modified.read.assert_not_awaited()
+    assert gateway_client.cache.set.await_args.kwargs["headers"] == {"ETag": '"v1"', "Cache-Control": "max-age=120"}
+    assert gateway_client.get_metrics()["cache_not_modified"] == 1
+
+
+@pytest.mark.asyncio
+async def test_mutating_call_applies_invalidation_rules(gateway_client):
+    gateway_client.config.invalidation_rules = [
+        InvalidationRule(service="user-service", endpoint="/users/{id}", invalidates=["/users/{id}"], tags=["user:{id}"])
+    ]
+    gateway_client.cache.invalidate = AsyncMock()
+    gateway_client.transport.session.request.return_value = _slow_response(200, {"updated": True}, delay=0)
+
+    await gateway_client.put("user-service", "/users/42", data={"name": "Ali"}, use_circuit_breaker=False)
+
+    gateway_client.cache.invalidate.assert_awaited_once_with(
+        CacheInvalidation(service="user-service", endpoint="/users/42"),
+        CacheInvalidation(tag="user:42"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_not_found_is_replayed_from_negative_cache(gateway_client):
+    gateway_client.config.cache.negative_cache = True
+    gateway_client.cache.l1 = MemoryCache(1024 * 1024)
+    response = _slow_response(404, None, delay=0)
+    response.__aenter__ = AsyncMock(return_value=MagicMock(
+        status=404, json=AsyncMock(return_value={"message": "not found"}), text=AsyncMock(return_value="not found")
+    ))
+    gateway_client.transport.session.request.return_value = response
+
+    for _ in range(3):
+        with pytest.raises(ServiceClientError) as exc_info:
+            await gateway_client.get("user-service", "/users/9")
+        assert exc_info.value.error_code == 404
+
+    assert gateway_client.transport.session.request.call_count == 1
+    assert gateway_client.get_metrics()["cache_negative_hits"] == 2
+    assert gateway_client.get_circuit_state("user-service") == "CLOSED"
+
+
+@pytest.mark.asyncio
+async def test_refresh_ahead_keeps_registered_key_fresh(gateway_client):
+    gateway_client.cache.l1 = MemoryCache(1024 * 1024)
+    gateway_client._execute_request = AsyncMock(side_effect=[{"version": 1}, {"version": 2}])
+
+    cache_key = gateway_client.register_refresh_ahead("config-service", "/flags")
+    await asyncio.sleep(0.01)
+
+    assert await gateway_client.get("config-service", "/flags") == {"version": 1}
+    assert gateway_client._execute_request.await_count == 1
+    registration = gateway_client._refresh_ahead_keys[cache_key]
+    entry = await gateway_client.cache.get_entry("config-service", "/flags", "GET", {}, key=cache_key)
+    ttl = gateway_client.cache.fresh_until(entry) - entry.stored_at
+    assert entry.stored_at + ttl * 0.7 <= gateway_client._refresh_ahead_due(entry) <= entry.stored_at + ttl * 0.8
+    assert registration.next_refresh > time.time()
+
+    # Once due, the key is refreshed in the background
+    registration.next_refresh = 0
+    gateway_client._refresh_ahead_wakeup.set()
+    await asyncio.sleep(0.01)
+
+    assert gateway_client._execute_request.await_count == 2
+    assert await gateway_client.get("config-service", "/flags") == {"version": 2}
+    gateway_client._refresh_ahead_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_refresh_ahead_reads_are_not_counted_as_lookups(gateway_client):
+    gateway_client.cache.l1 = MemoryCache(1024 * 1024)
+    gateway_client._execute_request = AsyncMock(side_effect=[{"version": 1}, {"version": 2}])
+
+    cache_key = gateway_client.register_refresh_ahead("config-service", "/flags")
+    await asyncio.sleep(0.01)
+    gateway_client._refresh_ahead_keys[cache_key].next_refresh = 0
+    gateway_client._refresh_ahead_wakeup.set()
+    await asyncio.sleep(0.01)
+
+    assert gateway_client._execute_request.await_count == 2
+    flags = gateway_client.cache.stats.snapshot()["services"]["config-service"]
+    assert (flags["sets"], flags["hits"], flags["stale_hits"], flags["misses"]) == (2, 0, 0, 0)
+    assert (gateway_client.cache.l1.hits, gateway_client.cache.l1.misses) == (0, 0)
+    assert gateway_client.get_metrics()["l1_cache_hits"] == gateway_client.get_metrics()["l1_cache_misses"] == 0
+    gateway_client._refresh_ahead_task.cancel()
+
+
+@pytest.mark.asyncio
+async def test_refresh_ahead_backs_off_after_failed_refreshes(gateway_client):
+    gateway_client.cache.l1 = MemoryCache(1024 * 1024)
+    gateway_client.retry_handler.config.max_attempts = 1
+    gateway_client._execute_request = AsyncMock(side_effect=ServiceUnavailableError("config-service"))
+    gateway_client._refresh_ahead_entry = AsyncMock(wraps=gateway_client._refresh_ahead_entry)
+
+    cache_key = gateway_client.register_refresh_ahead("config-service", "/flags")
+    registration = gateway_client._refresh_ahead_keys[cache_key]
+    delays = []
+    for attempt in range(3):
+        if attempt == 2:
+            # An unexpected error counts as a failure and leaves the scheduler running
+            gateway_client._refresh_ahead_entry.side_effect = RuntimeError("boom")
+        if attempt:
+            registration.next_refresh = 0
+            gateway_client._refresh_ahead_wakeup.set()
+        await asyncio.sleep(0.01)
+        delays.append(registration.next_refresh - time.time())
+
+    assert registration.failures == 3
+    assert [round(delay) for delay in delays] == [1, 2, 4]
+    assert not gateway_client._refresh_ahead_task.done()
+    gateway_client._refresh_ahead_task.cancel()
+
+
+def test_refresh_ahead_needs_a_cache_tier(gateway_client):
+    with pytest.raises(InvalidConfigurationError):
+        gateway_client.register_refresh_ahead("config-service", "/flags")
+
+
+@pytest.mark.asyncio
+async def test_error_fallback_reuses_first_lookup_within_max_staleness(gateway_client):
+    gateway_client.config.cache.hard_ttl_seconds = 600
+    gateway_client.config.cache.stale_while_revalidate = False
+    gateway_client.config.cache.max_stale_seconds = 120
+    gateway_client.transport.session.request.return_value = _slow_response(503, "Service Unavailable", delay=0)
+    gateway_client.cache.get_entry = AsyncMock(return_value=CacheEntry({"data": "stale"}, stored_at=time.time() - 120))
+
+    response = await gateway_client.get("target-service", "/test", use_circuit_breaker=False, use_retry=False)
+
+    assert response == {"data": "stale"}
+    gateway_client.cache.get_entry.assert_awaited_once()
+
+    # Stale for 240 seconds, beyond max_stale_seconds
+    gateway_client.cache.get_entry.return_value = CacheEntry({"data": "stale"}, stored_at=time.time() - 300)
+    with pytest.raises(ServiceUnavailableError):
+        await gateway_client.get("target-service", "/test", use_circuit_breaker=False, use_retry=False)
+
+
+@pytest.mark.asyncio
+async def test_connection_pool_is_configured_and_reported(mock_config):
+    async def users(request):
+        return web.json_response({"data": "ok"})
+
+    app = web.Application()
+    app.router.add_get("/gateway/user-service/users", users)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    mock_config.gateway_url = f"http://127.0.0.1:{port}"
+    mock_config.connection_pool = ConnectionPoolConfig(limit=20, limit_per_host=10, keepalive_timeout=30)
+    client = ServiceClient(mock_config)
+    await client.start()
+    try:
+        connector = client.transport.session.connector
+        assert (connector.limit, connector.limit_per_host) == (20, 10)
+
+        assert await client.get("user-service", "/users", use_circuit_breaker=False) == {"data": "ok"}
+
+        metrics = client.get_metrics()
+        assert (metrics["connections_in_use"], metrics["connections_idle"], metrics["connections_waiting"]) == (0, 1, 0)
+        assert REGISTRY.get_sample_value("service_client_connections", {"service": "test-service", "state": "idle"}) == 1
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+    # The global gauge neither reports nor keeps alive a closed client
+    assert REGISTRY.get_sample_value("service_client_connections", {"service": "test-service", "state": "idle"}) == 0
+    client_ref = weakref.ref(client)
+    del client
+    gc.collect()
+    assert client_ref() is None
+
+
+@pytest.mark.asyncio
+async def test_start_prewarms_gateway_connections(mock_config):
+    peers = set()
+
+    async def health(request):
+        peers.add(request.transport.get_extra_info("peername"))
+        await asyncio.sleep(0.01)
+        return web.Response(text="ok")
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    mock_config.gateway_url = f"http://127.0.0.1:{port}"
+    mock_config.connection_pool = ConnectionPoolConfig(warmup_connections=3)
+    client = ServiceClient(mock_config)
+    assert not client.ready
+    await client.start()
+    try:
+        assert client.ready
+        assert len(peers) == 3
+        assert client.get_connection_pool_stats()["idle"] == 3
+    finally:
+        await client.close()
+        await runner.cleanup()
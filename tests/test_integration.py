@@ -4,6 +4,7 @@ Integration tests for ServiceClient ↔ API Gateway compatibility
 import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from service_client.cache import CacheEntry
 from service_client.client import ServiceClient, ServiceClientConfig
 from service_client.exceptions import CircuitOpenError, GatewayErrorResponse
 
@@ -238,7 +239,7 @@ class TestCacheIntegration:
     async def test_cache_hit_metrics(self, service_client):
         """Test that cache hits are recorded in metrics"""
         # Mock cache to return a hit
-        service_client.cache.get = MagicMock(return_value={"data": "cached"})
+        service_client.cache.get_entry = AsyncMock(return_value=CacheEntry({"data": "cached"}))
         
         result = await service_client.get("user-service", "/users")
         assert result == {"data": "cached"}
@@ -251,7 +252,7 @@ class TestCacheIntegration:
     async def test_cache_miss_metrics(self, service_client):
         """Test that cache misses are recorded in metrics"""
         # Mock cache to return None (miss)
-        service_client.cache.get = MagicMock(return_value=None)
+        service_client.cache.get_entry = AsyncMock(return_value=None)
         
         with patch('aiohttp.ClientSession.request') as mock_request:
             mock_response = AsyncMock()
@@ -382,14 +383,15 @@ class TestCacheScenarios:
     async def test_cache_with_gateway_routing(self, service_client):
         """Test that cache works correctly with Gateway routing"""
         # Mock cache to return a hit
-        service_client.cache.get = MagicMock(return_value={"data": "cached"})
+        service_client.cache.get_entry = AsyncMock(return_value=CacheEntry({"data": "cached"}))
         
         result = await service_client.get("user-service", "/users")
         assert result == {"data": "cached"}
         
         # Verify cache was checked with correct parameters
-        service_client.cache.get.assert_called_once_with(
-            "user-service", "/users", "GET", {}
+        service_client.cache.get_entry.assert_called_once_with(
+            "user-service", "/users", "GET", {},
+            key=service_client.cache._generate_key("user-service", "/users", "GET", {})
         )
     
     @pytest.mark.asyncio
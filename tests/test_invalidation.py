@@ -0,0 +1,46 @@
+from service_client.cache import CacheInvalidation
+from service_client.invalidation import InvalidationRule
+
+
+def test_rule_substitutes_placeholders():
+    rule = InvalidationRule(
+        service="user-service",
+        endpoint="/users/{id}",
+        invalidates=["/users/{id}", "/users/{id}/listings*"],
+        tags=["user:{id}"],
+    )
+
+    assert rule.invalidations_for("user-service", "put", "/users/42") == [
+        CacheInvalidation(service="user-service", endpoint="/users/42"),
+        CacheInvalidation(service="user-service", endpoint_prefix="/users/42/listings"),
+        CacheInvalidation(tag="user:42"),
+    ]
+
+
+def test_rule_only_applies_to_matching_calls():
+    rule = InvalidationRule(service="user-service", endpoint="/users/{id}", invalidates=["/users"])
+
+    assert rule.invalidations_for("user-service", "GET", "/users/42") == []
+    assert rule.invalidations_for("agent-service", "PUT", "/users/42") == []
+    assert rule.invalidations_for("user-service", "PUT", "/users/42/avatar") == []
+
+
+def test_rule_wildcard_endpoint_and_cache_service():
+    rule = InvalidationRule(
+        service="listing-writer",
+        endpoint="/listings/*",
+        methods=["POST"],
+        invalidates=["/search*"],
+        cache_service="search-service",
+    )
+
+    assert rule.invalidations_for("listing-writer", "POST", "/listings/7/photos") == [
+        CacheInvalidation(service="search-service", endpoint_prefix="/search")
+    ]
+
+
+def test_exact_endpoint_does_not_match_longer_endpoints():
+    invalidation = CacheInvalidation(service="user-service", endpoint="/users/4")
+
+    assert not "service:user-service:endpoint:/users/42:abc".startswith(invalidation.key_prefix)
+    assert "service:user-service:endpoint:/users/4:abc".startswith(invalidation.key_prefix)
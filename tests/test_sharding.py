@@ -0,0 +1,113 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import redis
+
+from service_client.sharding import HashRing, ShardedRedis
+
+NODES = ["redis://cache-1:6379/0", "redis://cache-2:6379/0", "redis://cache-3:6379/0"]
+
+
+def test_hash_ring_spreads_keys_evenly():
+    ring = HashRing(NODES)
+    keys = [f"service:user-service:endpoint:/users/{i}:digest" for i in range(9000)]
+
+    counts = {node: 0 for node in NODES}
+    for key in keys:
+        counts[ring.get_node(key)] += 1
+
+    assert all(2400 < count < 3600 for count in counts.values())
+
+
+def test_adding_a_node_moves_only_its_share_of_keys():
+    before = HashRing(NODES)
+    after = HashRing(NODES + ["redis://cache-4:6379/0"])
+    keys = [f"key-{i}" for i in range(10000)]
+
+    moved = [key for key in keys if before.get_node(key) != after.get_node(key)]
+
+    assert len(moved) < 0.35 * len(keys)
+    assert all(after.get_node(key) == "redis://cache-4:6379/0" for key in moved)
+
+
+def _sharded_with_mocks():
+    sharded = ShardedRedis(NODES)
+    for url in NODES:
+        sharded.clients[url] = AsyncMock()
+    return sharded
+
+
+@pytest.mark.asyncio
+async def test_mget_treats_failed_shard_as_misses():
+    sharded = _sharded_with_mocks()
+    keys = [f"key-{i}" for i in range(30)]
+    failed = sharded.ring.get_node(keys[0])
+    for url, client in sharded.clients.items():
+        if url == failed:
+            client.mget.side_effect = redis.exceptions.ConnectionError("down")
+        else:
+            client.mget.side_effect = lambda node_keys: [key.encode() for key in node_keys]
+
+    values = await sharded.mget(keys)
+
+    for key, value in zip(keys, values):
+        assert value == (None if sharded.ring.get_node(key) == failed else key.encode())
+
+
+@pytest.mark.asyncio
+async def test_pipeline_routes_commands_and_keeps_order():
+    sharded = _sharded_with_mocks()
+    node_pipes = {}
+    for url, client in sharded.clients.items():
+        pipe = MagicMock()
+        pipe.execute = AsyncMock(side_effect=lambda pipe=pipe: [call.args[0] for call in pipe.unlink.call_args_list])
+        node_pipes[url] = pipe
+        client.pipeline = MagicMock(return_value=MagicMock(
+            __aenter__=AsyncMock(return_value=pipe), __aexit__=AsyncMock(return_value=False)
+        ))
+    keys = [f"key-{i}" for i in range(12)]
+
+    async with sharded.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.unlink(key)
+        results = await pipe.execute()
+
+    assert results == keys
+    for url, node_pipe in node_pipes.items():
+        assert all(sharded.ring.get_node(call.args[0]) == url for call in node_pipe.unlink.call_args_list)
+
+
+def test_shard_connections_time_out():
+    sharded = ShardedRedis(NODES, socket_timeout=0.5, socket_connect_timeout=0.25)
+
+    for client in sharded.clients.values():
+        kwargs = client.connection_pool.connection_kwargs
+        assert (kwargs["socket_timeout"], kwargs["socket_connect_timeout"]) == (0.5, 0.25)
+
+
+@pytest.mark.asyncio
+async def test_unresponsive_shard_is_skipped_during_cooldown():
+    sharded = _sharded_with_mocks()
+    key = "key-1"
+    node = sharded.ring.get_node(key)
+    client = sharded.clients[node]
+    client.get.side_effect = redis.exceptions.TimeoutError("Timeout reading from socket")
+
+    with pytest.raises(redis.exceptions.TimeoutError):
+        await sharded.get(key)
+    assert await sharded.get(key) is None
+    assert await sharded.mget([key]) == [None]
+    async with sharded.pipeline() as pipe:
+        pipe.setex(key, 60, b"value")
+        assert await pipe.execute() == [None]
+    with pytest.raises(redis.exceptions.ConnectionError):
+        await sharded.zrange(key, 0, -1)
+    assert client.get.await_count == 1
+    client.mget.assert_not_awaited()
+    client.pipeline.assert_not_called()
+
+    # Once the cool-down has passed the node is contacted again
+    sharded._down_until[node] = 0
+    client.get.side_effect = None
+    client.get.return_value = b"value"
+    assert await sharded.get(key) == b"value"
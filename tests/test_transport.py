@@ -0,0 +1,229 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from service_client.client import ServiceClient, ServiceClientConfig
+from service_client.exceptions import InvalidConfigurationError, MaxRetriesExceededError, ServiceClientError
+from service_client.transport import (
+    AiohttpTransport, Http2Transport, InMemoryTransport, Transport, TransportType, UnixSocketTransport,
+    create_transport
+)
+
+try:
+    import h2.config as h2_config
+    import h2.connection as h2_connection
+    import h2.events as h2_events
+    import httpx
+except ImportError:
+    httpx = None
+
+requires_http2 = pytest.mark.skipif(httpx is None, reason="httpx[http2] is not installed")
+
+
+@pytest.fixture
+def config():
+    return ServiceClientConfig(gateway_url="http://gateway", service_name="test-service", service_token="token")
+
+
+class H2StubServer:
+    """Minimal h2c server answering every request with its path, after a short delay"""
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.connections = 0
+        self.max_concurrent_streams = 0
+        self._open_streams = 0
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        return f"http://127.0.0.1:{self._server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        conn = h2_connection.H2Connection(config=h2_config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        while True:
+            data = await reader.read(65535)
+            if not data:
+                break
+            for event in conn.receive_data(data):
+                if isinstance(event, h2_events.RequestReceived):
+                    asyncio.ensure_future(self._respond(conn, writer, event))
+            writer.write(conn.data_to_send())
+            await writer.drain()
+        writer.close()
+
+    async def _respond(self, conn, writer, event):
+        self._open_streams += 1
+        self.max_concurrent_streams = max(self.max_concurrent_streams, self._open_streams)
+        await asyncio.sleep(self.delay)
+        self._open_streams -= 1
+        path = dict(event.headers)[b":path"].decode()
+        body = json.dumps({"path": path}).encode()
+        conn.send_headers(event.stream_id, [
+            (":status", "200"), ("content-type", "application/json"), ("content-length", str(len(body)))
+        ])
+        conn.send_data(event.stream_id, body, end_stream=True)
+        writer.write(conn.data_to_send())
+        await writer.drain()
+
+
+def test_incomplete_transport_fails_on_construction():
+    class NoRequests(Transport):
+        pass
+
+    with pytest.raises(TypeError):
+        NoRequests()
+
+
+def test_transport_is_selected_by_config(config):
+    assert config.transport == TransportType.AIOHTTP
+    assert isinstance(create_transport(TransportType.AIOHTTP, config.connection_pool, 30), AiohttpTransport)
+    assert isinstance(
+        create_transport(TransportType.UNIX, config.connection_pool, 30, "/run/gateway.sock"), UnixSocketTransport
+    )
+
+
+@requires_http2
+def test_http2_transport_is_selected_by_config(config):
+    assert isinstance(create_transport(TransportType.HTTP2, config.connection_pool, 30), Http2Transport)
+    # TLS gateways negotiate h2 and can fall back to HTTP/1.1; plain ones use h2c
+    assert not create_transport(TransportType.HTTP2, config.connection_pool, 30, gateway_url="https://gateway").prior_knowledge
+    assert create_transport(TransportType.HTTP2, config.connection_pool, 30, gateway_url="http://gateway").prior_knowledge
+
+
+@requires_http2
+@pytest.mark.asyncio
+async def test_http2_pool_stats_fall_back_to_zeros_on_unknown_pool_layout():
+    transport = Http2Transport()
+    await transport.start()
+    pool = transport.client._transport._pool
+    try:
+        transport.client._transport._pool = object()
+        assert transport.pool_stats() == {"in_use": 0, "idle": 0, "waiting": 0}
+    finally:
+        transport.client._transport._pool = pool
+        await transport.close()
+
+
+@requires_http2
+@pytest.mark.asyncio
+async def test_http2_transport_multiplexes_requests_over_one_connection():
+    server = H2StubServer()
+    gateway_url = await server.start()
+    client = ServiceClient(ServiceClientConfig(
+        gateway_url=gateway_url,
+        service_name="test-service",
+        service_token="token",
+        transport=TransportType.HTTP2,
+    ))
+    await client.start()
+    try:
+        responses = await asyncio.gather(*(
+            client.get("user-service", f"/users/{index}", use_cache=False, use_circuit_breaker=False)
+            for index in range(20)
+        ))
+
+        assert responses == [{"path": f"/gateway/user-service/users/{index}"} for index in range(20)]
+        assert server.connections == 1
+        assert server.max_concurrent_streams > 1
+        assert client.get_connection_pool_stats() == {"in_use": 0, "idle": 1, "waiting": 0}
+    finally:
+        await client.close()
+        await server.stop()
+
+
+@pytest.mark.asyncio
+async def test_in_memory_transport_scripts_latency_and_errors(config):
+    config.retry.initial_delay = 0
+    transport = InMemoryTransport()
+    transport.add_response("/gateway/user-service/users/1", error=aiohttp.ClientConnectionError("reset"))
+    transport.add_response("/gateway/user-service/users/1", {"id": 1}, latency=0.01)
+    client = ServiceClient(config, transport=transport)
+    await client.start()
+    try:
+        assert await client.get("user-service", "/users/1", use_circuit_breaker=False) == {"id": 1}
+        assert [request[:2] for request in transport.requests] == [("GET", "/gateway/user-service/users/1")] * 2
+
+        transport.add_response("/gateway/user-service/users/2", error=aiohttp.ClientConnectionError("reset"))
+        with pytest.raises(MaxRetriesExceededError):
+            await client.get("user-service", "/users/2", use_circuit_breaker=False)
+
+        with pytest.raises(ServiceClientError) as exc_info:
+            await client.get("user-service", "/users/3", use_circuit_breaker=False)
+        assert exc_info.value.error_code == 404
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_unix_socket_transport_reaches_sidecar_gateway(config, tmp_path):
+    socket_path = str(tmp_path / "gateway.sock")
+
+    async def users(request):
+        return web.json_response({"host": request.host})
+
+    app = web.Application()
+    app.router.add_get("/gateway/user-service/users", users)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.UnixSite(runner, socket_path).start()
+
+    config.transport = TransportType.UNIX
+    config.gateway_socket_path = socket_path
+    client = ServiceClient(config)
+    await client.start()
+    try:
+        assert await client.get("user-service", "/users", use_circuit_breaker=False) == {"host": "gateway"}
+        assert client.get_connection_pool_stats()["idle"] == 1
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_unix_gateway_url_routes_requests_health_checks_and_breaker_sync(tmp_path):
+    socket_path = str(tmp_path / "gateway.sock")
+    seen = []
+
+    async def handle(request):
+        seen.append(request.path)
+        if request.path.startswith("/internal/circuit-breaker/status/"):
+            return web.json_response({"state": "CLOSED"})
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_route("*", "/{tail:.*}", handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.UnixSite(runner, socket_path).start()
+
+    config = ServiceClientConfig(gateway_url=f"unix://{socket_path}", service_name="test-service", service_token="token")
+    config.connection_pool.warmup_connections = 2
+    client = ServiceClient(config)
+    await client.start()
+    try:
+        assert isinstance(client.transport, UnixSocketTransport)
+        assert client.get_connection_pool_stats() == {"in_use": 0, "idle": 2, "waiting": 0}
+        assert await client.get("user-service", "/users") == {"ok": True}
+        assert seen == [
+            "/health", "/health", "/internal/circuit-breaker/status/user-service-circuit", "/gateway/user-service/users"
+        ]
+        assert client.metrics.get_metrics()["connections_idle"] == 2
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+def test_unix_gateway_url_needs_an_absolute_socket_path():
+    config = ServiceClientConfig(gateway_url="unix://gateway.sock", service_name="test-service", service_token="token")
+    with pytest.raises(InvalidConfigurationError):
+        ServiceClient(config)
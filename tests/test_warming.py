@@ -0,0 +1,117 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from service_client import cli
+from service_client.cache import CacheConfig
+from service_client.client import ServiceClient, ServiceClientConfig
+from service_client.exceptions import InvalidConfigurationError
+from service_client.transport import AiohttpTransport
+from service_client.warming import HotKeyTracker, WarmKey, load_manifest
+
+
+@pytest.fixture
+def client():
+    client = ServiceClient(ServiceClientConfig(
+        gateway_url="http://fake-gateway.com",
+        service_name="test-service",
+        service_token="test-token",
+        cache=CacheConfig(l1_enabled=True),
+    ))
+    client.transport = AiohttpTransport(MagicMock())
+    return client
+
+
+def test_tracker_keeps_hottest_keys():
+    tracker = HotKeyTracker(capacity=2)
+    for _ in range(3):
+        tracker.record("a", "user-service", "/users", {"page": 1})
+    tracker.record("b", "user-service", "/agents", None)
+    tracker.record("b", "user-service", "/agents", None)
+    for key in ("c", "d", "e"):
+        tracker.record(key, "user-service", f"/{key}", None)
+
+    hottest = tracker.hottest()
+    assert [key.endpoint for key in hottest] == ["/users", "/agents"]
+    assert hottest[0] == WarmKey(service="user-service", endpoint="/users", params={"page": 1}, hits=3)
+
+
+@pytest.mark.asyncio
+async def test_exported_manifest_warms_a_new_client(client, tmp_path):
+    response = MagicMock(status=200, json=AsyncMock(return_value={"data": "ok"}))
+    client.transport.session.request = MagicMock(return_value=MagicMock(
+        __aenter__=AsyncMock(return_value=response), __aexit__=AsyncMock(return_value=False)
+    ))
+    for _ in range(2):
+        await client.get("user-service", "/users", params={"page": 1}, use_cache=False)
+        await client.get("user-service", "/users", params={"page": 1})
+    await client.get("user-service", "/agents")
+    manifest = str(tmp_path / "hot-keys.json")
+
+    exported = client.export_hot_keys(manifest, limit=1)
+
+    assert exported == load_manifest(manifest)
+    assert [(key.endpoint, key.hits) for key in exported] == [("/users", 2)]
+
+    # Warm from an empty cache, as a freshly started client would
+    client.cache.l1.clear()
+    client.transport.session.request.reset_mock()
+    summary = await client.warm_cache([("user-service", "/agents")], manifest=manifest)
+    assert summary == {"warmed": 2, "failed": 0}
+    assert client.transport.session.request.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_bounds_concurrency_and_counts_failures(client):
+    running = 0
+    peak = 0
+
+    async def fetch(**kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if kwargs["endpoint"] == "/users/3":
+            raise RuntimeError("boom")
+        return {"id": kwargs["endpoint"]}
+
+    client._execute_request = fetch
+    client.retry_handler.config.max_attempts = 1
+    keys = [("user-service", f"/users/{index}") for index in range(8)]
+
+    summary = await client.warm_cache(keys, concurrency=3)
+
+    assert summary == {"warmed": 7, "failed": 1}
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_warm_cache_needs_a_cache_tier(client):
+    client.cache.l1 = None
+    client._execute_request = AsyncMock()
+
+    with pytest.raises(InvalidConfigurationError):
+        await client.warm_cache([("user-service", "/users")])
+    client._execute_request.assert_not_awaited()
+
+
+def test_cli_requires_a_tier_and_passes_ttls(monkeypatch, capsys):
+    argv = ["--gateway-url", "http://gateway", "--service-token", "token", "--key", "user-service", "/users"]
+    assert cli.main(argv) == 2
+    assert "--redis-url or --disk-cache-path" in capsys.readouterr().err
+
+    configs = []
+
+    async def warm_cache(self, keys, manifest=None, concurrency=None):
+        configs.append(self.config.cache)
+        return {"warmed": len(keys), "failed": 0}
+
+    monkeypatch.setattr(ServiceClient, "start", AsyncMock())
+    monkeypatch.setattr(ServiceClient, "close", AsyncMock())
+    monkeypatch.setattr(ServiceClient, "warm_cache", warm_cache)
+    monkeypatch.setenv("SERVICE_CLIENT_CACHE_HARD_TTL_SECONDS", "900")
+
+    assert cli.main(argv + ["--disk-cache-path", "/tmp/cache.db", "--soft-ttl-seconds", "300"]) == 0
+    assert (configs[0].soft_ttl_seconds, configs[0].hard_ttl_seconds) == (300, 900)